@@ -16,6 +16,39 @@ def analyze_monthly_trends(filtered_orders):
     return monthly_df
 
 
+TREND_GRANULARITIES = ('day', 'week', 'month')
+# Urutan segment RFM dari nilai terendah ke tertinggi
+RFM_SEGMENT_ORDER = ["lost customers", "Low value customers", "Medium value customer",
+                     "High value customer", "Top customers"]
+
+
+def analyze_trends(filtered_orders, granularity='month'):
+    """Analisis tren orders, GMV, dan AOV per hari/minggu/bulan dari order_purchase_timestamp
+
+    Kolom bucket tetap bernama `order_date` (awal hari/minggu Senin/bulan) agar hasilnya
+    kompatibel dengan `analyze_monthly_trends` dan fungsi plot tren.
+    """
+    if granularity not in TREND_GRANULARITIES:
+        raise ValueError(f"Granularity tidak dikenal: {granularity}. Pilihan: {', '.join(TREND_GRANULARITIES)}")
+    if granularity == 'month':
+        return analyze_monthly_trends(filtered_orders)
+
+    days = filtered_orders['order_purchase_timestamp'].to_numpy().astype('datetime64[D]')
+    if granularity == 'week':
+        # 1970-01-01 adalah hari Kamis: geser agar minggu dimulai hari Senin
+        days = days - ((days.astype(np.int64) + 3) % 7).astype('timedelta64[D]')
+
+    trend_df = filtered_orders.groupby(days.astype('datetime64[ns]'), as_index=True).agg({
+        'order_id': 'nunique',
+        'order_gmv': 'sum'
+    }).rename(columns={'order_id': 'orders', 'order_gmv': 'gmv'}).rename_axis('order_date').reset_index()
+
+    trend_df['aov'] = trend_df['gmv'] / trend_df['orders']
+    trend_df = trend_df.sort_values('order_date')
+
+    return trend_df
+
+
 def analyze_category_performance(filtered_order_items):
     """Analisis kategori produk untuk Pertanyaan 2"""
     category_agg = filtered_order_items.groupby('product_category_en', as_index=False).agg({
@@ -75,11 +108,9 @@ def analyze_rfm(filtered_orders):
         'recency': 'mean'
     }).rename(columns={'customer_unique_id': 'customer_count'})
 
-    segment_order = ["lost customers", "Low value customers", "Medium value customer",
-                     "High value customer", "Top customers"]
     segment_df['customer_segment'] = pd.Categorical(
         segment_df['customer_segment'],
-        categories=segment_order,
+        categories=RFM_SEGMENT_ORDER,
         ordered=True
     )
     segment_df = segment_df.sort_values('customer_segment')
@@ -87,8 +118,13 @@ def analyze_rfm(filtered_orders):
     return rfm_df, segment_df
 
 
-def prepare_geospatial_data(filtered_orders, geolocation_df, sellers_df):
-    """Persiapkan data geospatial untuk Pertanyaan 4"""
+def prepare_geospatial_data(filtered_orders, geolocation_df, sellers_df, active_seller_ids=None):
+    """Persiapkan data geospatial untuk Pertanyaan 4
+
+    Jika `active_seller_ids` diberikan (seller yang menjual item dalam rentang tanggal, lihat
+    `seller_performance.analyze_active_sellers`), supply per kota hanya menghitung seller tersebut
+    sehingga pembilang (orders) dan penyebut (seller) gap ratio memakai rentang yang sama.
+    """
     geolocation_df['geolocation_zip_code_prefix'] = geolocation_df['geolocation_zip_code_prefix'].astype(str)
 
     customer_by_city = filtered_orders.groupby(['customer_city', 'customer_state'], as_index=False).agg({
@@ -115,6 +151,8 @@ def prepare_geospatial_data(filtered_orders, geolocation_df, sellers_df):
         (customer_geo['geolocation_lng'].between(-75, -30))
     ]
 
+    if active_seller_ids is not None:
+        sellers_df = sellers_df[sellers_df['seller_id'].isin(active_seller_ids)].copy()
     sellers_df['seller_zip_code_prefix'] = sellers_df['seller_zip_code_prefix'].astype(str)
     sellers_geo = sellers_df.merge(
         geo_agg,
@@ -192,3 +230,88 @@ def prepare_geospatial_data(filtered_orders, geolocation_df, sellers_df):
 
     return customer_by_city, seller_by_city, customer_geo, gap_df, gap_with_sellers, gap_without_sellers, gap_plot
 
+
+
+def analyze_seller_coverage(filtered_orders, seller_index, zip_centroids, radius_km=50, level='city'):
+    """Cakupan seller berbasis radius untuk setiap kota (level='city') atau zip (level='zip') customer
+
+    Berbeda dengan gap analysis (kecocokan nama kota), supply dihitung sebagai jumlah
+    seller yang centroid zip-nya berada dalam `radius_km` dari titik demand.
+    """
+    from spatial import zip_coordinates
+
+    demand = filtered_orders.assign(
+        customer_zip_code_prefix=filtered_orders['customer_zip_code_prefix'].astype(str)
+    ).groupby(['customer_city', 'customer_state', 'customer_zip_code_prefix'], as_index=False).agg({
+        'order_id': 'nunique',
+        'order_gmv': 'sum'
+    }).rename(columns={'order_id': 'order_count'})
+    demand['geolocation_lat'], demand['geolocation_lng'] = zip_coordinates(demand['customer_zip_code_prefix'], zip_centroids)
+
+    if level == 'city':
+        # Titik demand kota = rata-rata centroid zip berbobot jumlah order
+        located_orders = demand['order_count'].where(demand['geolocation_lat'].notna(), 0)
+        demand = demand.assign(
+            located_orders=located_orders,
+            lat_weighted=demand['geolocation_lat'].fillna(0) * located_orders,
+            lng_weighted=demand['geolocation_lng'].fillna(0) * located_orders
+        ).groupby(['customer_city', 'customer_state'], as_index=False).agg({
+            'order_count': 'sum',
+            'order_gmv': 'sum',
+            'located_orders': 'sum',
+            'lat_weighted': 'sum',
+            'lng_weighted': 'sum'
+        })
+        located_orders = demand['located_orders'].replace(0, np.nan)
+        demand['geolocation_lat'] = demand['lat_weighted'] / located_orders
+        demand['geolocation_lng'] = demand['lng_weighted'] / located_orders
+        demand = demand.drop(columns=['located_orders', 'lat_weighted', 'lng_weighted'])
+
+    demand['sellers_within_radius'] = seller_index.query_radius(
+        demand['geolocation_lat'].values, demand['geolocation_lng'].values, radius_km
+    )
+    nearest_km, _ = seller_index.query_nearest(demand['geolocation_lat'].values, demand['geolocation_lng'].values, k=1)
+    demand['nearest_seller_km'] = nearest_km[:, 0] if nearest_km.shape[1] > 0 else np.nan
+    demand['orders_per_seller_within_radius'] = demand['order_count'] / demand['sellers_within_radius'].replace(0, np.nan)
+
+    coverage_df = demand.sort_values('orders_per_seller_within_radius', ascending=False)
+    return coverage_df
+
+
+def analyze_freight_per_km(filtered_order_items):
+    """Analisis ongkir per km (freight / jarak pengiriman) per kategori produk
+
+    Memakai kolom `shipping_distance_km` yang sudah dihitung saat build snapshot, sehingga
+    per rerun hanya tersisa satu groupby. Rasio dihitung sebagai total freight / total jarak
+    (item tanpa koordinat diabaikan).
+    """
+    located = filtered_order_items[filtered_order_items['shipping_distance_km'].notna()]
+    category_km = located.groupby('product_category_en', as_index=False).agg({
+        'freight_value': 'sum',
+        'shipping_distance_km': ['sum', 'mean'],
+        'order_id': 'count'
+    })
+    category_km.columns = ['product_category_en', 'freight_value', 'distance_km', 'avg_distance_km', 'items']
+    category_km['freight_per_km'] = category_km['freight_value'] / category_km['distance_km'].replace(0, np.nan)
+    category_km = category_km.sort_values('freight_per_km', ascending=False)
+
+    return category_km
+
+
+def analyze_freight_per_km_by_state_pair(filtered_order_items, min_items=30):
+    """Analisis ongkir per km untuk setiap pasangan state seller -> state customer
+
+    Pasangan dengan item kurang dari `min_items` diabaikan agar rasio tidak didominasi noise.
+    """
+    located = filtered_order_items[filtered_order_items['shipping_distance_km'].notna()]
+    state_pair_km = located.groupby(['seller_state', 'customer_state'], as_index=False, observed=True).agg({
+        'freight_value': 'sum',
+        'shipping_distance_km': ['sum', 'mean'],
+        'order_id': 'count'
+    })
+    state_pair_km.columns = ['seller_state', 'customer_state', 'freight_value', 'distance_km', 'avg_distance_km', 'items']
+    state_pair_km = state_pair_km[state_pair_km['items'] >= min_items].copy()
+    state_pair_km['freight_per_km'] = state_pair_km['freight_value'] / state_pair_km['distance_km'].replace(0, np.nan)
+    state_pair_km = state_pair_km.sort_values('freight_per_km', ascending=False)
+
+    return state_pair_km
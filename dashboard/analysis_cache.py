@@ -0,0 +1,254 @@
+"""Cache in-memory hasil analisis per (versi dataset, analisis, rentang tanggal)
+
+Render function dashboard membaca hasil analisis lewat cache ini (bukan lagi lru_cache per
+rerun), sehingga rentang tanggal yang pernah dihitung, baik oleh session mana pun maupun oleh
+precompute spekulatif di background (lihat speculative.py), tidak dihitung ulang. Ukuran entry
+dihitung dengan `resident_bytes`; jika total melebihi budget, entry paling lama tidak dipakai
+dikeluarkan. Hasil spekulatif tidak pernah mengeluarkan entry lain: jika tidak muat, dibuang.
+
+Entry satu versi dataset dikeluarkan bersama dataset-nya (`evict_version`, dipanggil lewat
+listener eviction DatasetRegistry) sehingga budget memori registry tidak dilampaui lewat cache ini.
+
+Hasil di cache dipakai bersama oleh semua session dan thread; perlakukan sebagai read-only.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from dataset_registry import resident_bytes
+
+# Budget default; bisa diubah lewat environment variable DASHBOARD_ANALYSIS_CACHE_MB
+ANALYSIS_CACHE_BUDGET_BYTES = int(os.environ.get('DASHBOARD_ANALYSIS_CACHE_MB', 1024)) * 1024 ** 2
+
+
+def _filtered_orders(data, start_date, end_date, get):
+    orders_df = data['orders_df']
+    return orders_df[
+        (orders_df['order_date'].dt.date >= start_date) &
+        (orders_df['order_date'].dt.date <= end_date)
+    ].copy()
+
+
+def _filtered_order_items(data, start_date, end_date, get):
+    order_items_df = data['order_items_df']
+    return order_items_df[order_items_df['order_id'].isin(get('filtered_orders')['order_id'])].copy()
+
+
+def _trends(granularity):
+    def compute(data, start_date, end_date, get):
+        from analysis import analyze_trends
+
+        return analyze_trends(get('filtered_orders'), granularity)
+    return compute
+
+
+def _monthly_trends(data, start_date, end_date, get):
+    from analysis import analyze_monthly_trends
+
+    return analyze_monthly_trends(get('filtered_orders'))
+
+
+def _category_performance(data, start_date, end_date, get):
+    from analysis import analyze_category_performance
+
+    return analyze_category_performance(get('filtered_order_items'))
+
+
+def _freight_per_km(data, start_date, end_date, get):
+    from analysis import analyze_freight_per_km
+
+    return analyze_freight_per_km(get('filtered_order_items'))
+
+
+def _freight_per_km_state_pair(data, start_date, end_date, get):
+    from analysis import analyze_freight_per_km_by_state_pair
+
+    return analyze_freight_per_km_by_state_pair(get('filtered_order_items'))
+
+
+def _rfm(data, start_date, end_date, get):
+    from analysis import analyze_rfm
+
+    return analyze_rfm(get('filtered_orders'))
+
+
+def _active_sellers(data, start_date, end_date, get):
+    from seller_performance import analyze_active_sellers
+
+    return analyze_active_sellers(data['seller_day_base'], start_date, end_date)
+
+
+def _geospatial(data, start_date, end_date, get):
+    from analysis import prepare_geospatial_data
+
+    # Shallow copy: prepare_geospatial_data menulis ulang kolom zip pada input
+    return prepare_geospatial_data(
+        get('filtered_orders').copy(deep=False), data['geolocation_df'].copy(deep=False),
+        data['sellers_df'].copy(deep=False), active_seller_ids=get('active_sellers')
+    )
+
+
+# nama analisis -> compute(data, start_date, end_date, get); `data` berisi objek dataset
+# (orders_df, order_items_df, geolocation_df, sellers_df, seller_day_base), `get(nama)` mengambil
+# hasil analisis lain untuk rentang yang sama (lewat cache)
+ANALYSES = {
+    'filtered_orders': _filtered_orders,
+    'filtered_order_items': _filtered_order_items,
+    'monthly_trends': _monthly_trends,
+    'trends_day': _trends('day'),
+    'trends_week': _trends('week'),
+    'category_performance': _category_performance,
+    'freight_per_km': _freight_per_km,
+    'freight_per_km_state_pair': _freight_per_km_state_pair,
+    'rfm': _rfm,
+    'active_sellers': _active_sellers,
+    'geospatial': _geospatial,
+}
+
+
+class LazyData(dict):
+    """Mapping `data` untuk ANALYSES yang memuat objek dari `loaders[key]()` saat pertama diakses"""
+
+    def __init__(self, loaders):
+        super().__init__()
+        self.loaders = loaders
+
+    def __missing__(self, key):
+        value = self[key] = self.loaders[key]()
+        return value
+
+    def load_all(self):
+        for key in self.loaders:
+            self[key]
+        return self
+
+
+def analysis_key(dataset_version, name, start_date, end_date):
+    return (dataset_version, name, start_date.isoformat(), end_date.isoformat())
+
+
+class AnalysisCache:
+    """Hasil analisis in-memory dengan eviction LRU di bawah `memory_budget_bytes`
+
+    Statistik (lihat `stats()`): `hits` / `misses` dihitung untuk permintaan foreground tingkat atas
+    saja (bukan lookup dependency di dalam analisis lain, lihat `run_analysis`);
+    `speculative_hits` = entry hasil precompute spekulatif yang kemudian diminta foreground
+    (dihitung sekali per entry).
+    """
+
+    def __init__(self, memory_budget_bytes=ANALYSIS_CACHE_BUDGET_BYTES):
+        self.memory_budget_bytes = memory_budget_bytes
+        # key -> [hasil, bytes, dibuat spekulatif, sudah dipakai foreground]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Satu lock per key: analisis yang sama tidak dihitung paralel (foreground menunggu
+        # precompute yang sedang berjalan alih-alih menghitung ulang)
+        self._build_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.speculative_builds = 0
+        self.speculative_hits = 0
+        self.speculative_dropped = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute, speculative=False, count=True):
+        """Hasil untuk `key`; `compute()` dijalankan sekali jika belum ada di cache
+
+        `count=False` untuk lookup dependency: tidak dihitung di statistik hit/miss.
+        """
+        count = count and not speculative
+        entry = self._lookup(key, count)
+        if entry is not None:
+            return entry[0]
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            entry = self._lookup(key, count)
+            if entry is not None:
+                return entry[0]
+            value = compute()
+            self._put(key, value, resident_bytes(value), speculative, count)
+            return value
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def _lookup(self, key, count):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+                if entry[2] and not entry[3]:
+                    self.speculative_hits += 1
+                entry[3] = True
+            return entry
+
+    def _put(self, key, value, size, speculative, count):
+        with self._lock:
+            if speculative:
+                self.speculative_builds += 1
+                if self._total_bytes() + size > self.memory_budget_bytes:
+                    self.speculative_dropped += 1
+                    return
+            elif count:
+                self.misses += 1
+            self._entries[key] = [value, size, speculative, count]
+            while self._total_bytes() > self.memory_budget_bytes and len(self._entries) > 1:
+                victim = next(iter(self._entries))
+                if victim == key:
+                    break
+                del self._entries[victim]
+                self.evictions += 1
+
+    def _total_bytes(self):
+        return sum(entry[1] for entry in self._entries.values())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def evict_version(self, dataset_version):
+        """Keluarkan semua entry untuk `dataset_version` (dipanggil saat registry mengeluarkan dataset)"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == dataset_version]:
+                del self._entries[key]
+                self.evictions += 1
+            for key in [key for key in self._build_locks if key[0] == dataset_version]:
+                del self._build_locks[key]
+
+    def stats(self):
+        """Ringkasan ukuran dan hit rate cache"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'resident_bytes': self._total_bytes(),
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'speculative_builds': self.speculative_builds,
+                'speculative_hits': self.speculative_hits,
+                'speculative_dropped': self.speculative_dropped,
+                'evictions': self.evictions,
+            }
+
+
+def run_analysis(cache, data, dataset_version, name, start_date, end_date, speculative=False, count=True):
+    """Hasil analisis `name` (lihat ANALYSES) untuk rentang tanggal, lewat `cache`
+
+    Dependency yang diambil lewat `get` tidak dihitung di statistik hit/miss (`count=False`).
+    """
+    def get(dependency):
+        return run_analysis(cache, data, dataset_version, dependency, start_date, end_date, speculative, count=False)
+
+    return cache.get_or_compute(
+        analysis_key(dataset_version, name, start_date, end_date),
+        lambda: ANALYSES[name](data, start_date, end_date, get),
+        speculative=speculative, count=count
+    )
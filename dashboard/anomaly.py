@@ -0,0 +1,291 @@
+"""Deteksi anomali harian orders dan GMV: total, per kategori produk, dan per state customer
+
+Setiap series dibandingkan dengan statistik robust hari yang sama dalam minggu (Senin dengan
+Senin, dst.) dari `window_weeks` minggu sebelumnya: expected = median, skala = 1.4826 x MAD
+(minimal median / sqrt(median orders) dan 10% dari median). Hari ditandai anomali jika
+|z robust| melebihi threshold.
+
+Semua series disimpan sebagai tensor dense (metric x series x hari), sehingga seluruh history
+dinilai sekaligus dengan `sliding_window_view` per hari dalam minggu (`detect_anomalies`).
+`AnomalyDetector` menyimpan window terakhir per series x hari dalam minggu dan memperbaruinya
+setiap kali satu hari baru masuk (`ingest`), dengan hasil yang sama seperti penilaian batch.
+
+Headless (cron), menilai N hari terakhir secara incremental:
+    python dashboard/anomaly.py [n_hari] [--dataset nama] [--json]
+Exit code 1 jika ada anomali pada N hari terakhir.
+"""
+import json
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from seller_performance import EPOCH_DAY, _day_code, _window_days
+
+ANOMALY_METRICS = ['orders', 'gmv']
+ANOMALY_WINDOW_WEEKS = 8
+ANOMALY_THRESHOLD = 4.0
+# Minimal jumlah minggu history (hari yang sama) dan median orders harian agar series dinilai
+ANOMALY_MIN_HISTORY = 4
+ANOMALY_MIN_ORDERS = 5
+MAD_SCALE = 1.4826
+RELATIVE_SCALE_FLOOR = 0.1
+
+
+class DailySeries:
+    """Orders dan GMV harian per series (baris) untuk hari day_min, day_min + 1, ... (kolom)
+
+    `keys` berisi kolom `level` ('total', 'category', 'state') dan `group` per baris.
+    """
+
+    def __init__(self, keys, day_min, orders, gmv):
+        self.keys = keys
+        self.day_min = day_min
+        self.orders = orders
+        self.gmv = gmv
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def n_days(self):
+        return self.orders.shape[1]
+
+    def head(self, n_days):
+        """Series untuk n_days hari pertama (misal history sebelum hari-hari yang di-ingest)"""
+        return DailySeries(self.keys, self.day_min, self.orders[:, :n_days], self.gmv[:, :n_days])
+
+
+def _daily_counts(group_codes, n_groups, day_offset, n_days, gmv, order_codes=None):
+    """Matriks (group x hari) jumlah order dan GMV; order unik per sel jika order_codes diberikan"""
+    cell = group_codes.astype(np.int64) * n_days + day_offset
+    size = n_groups * n_days
+    gmv_matrix = np.bincount(cell, weights=gmv, minlength=size)
+    if order_codes is not None:
+        n_orders = order_codes.max() + 1 if len(order_codes) > 0 else 1
+        cell = np.unique(cell * n_orders + order_codes) // n_orders
+    order_matrix = np.bincount(cell, minlength=size).astype(np.float64)
+    return order_matrix.reshape(n_groups, n_days), gmv_matrix.reshape(n_groups, n_days)
+
+
+def build_daily_series(orders_df, order_items_df):
+    """Bangun DailySeries (total, per state customer, per kategori produk) sekali per dataset"""
+    orders = orders_df.drop_duplicates('order_id')
+    orders = orders[orders['order_purchase_timestamp'].notna()]
+    order_day = _day_code(orders['order_purchase_timestamp'])
+    if len(order_day) == 0:
+        keys = pd.DataFrame({'level': ['total'], 'group': ['Total']})
+        return DailySeries(keys, 0, np.zeros((1, 0)), np.zeros((1, 0)))
+
+    day_min = order_day.min()
+    n_days = order_day.max() - day_min + 1
+    order_gmv = orders['order_gmv'].fillna(0).to_numpy()
+
+    total = _daily_counts(np.zeros(len(orders), dtype=np.int64), 1, order_day - day_min, n_days, order_gmv)
+    state_codes, states = pd.factorize(orders['customer_state'].fillna('unknown'), sort=True)
+    by_state = _daily_counts(state_codes, len(states), order_day - day_min, n_days, order_gmv)
+
+    order_codes = pd.Index(orders['order_id']).get_indexer(order_items_df['order_id'])
+    located = order_codes >= 0
+    items = order_items_df[located]
+    order_codes = order_codes[located]
+    category_codes, categories = pd.factorize(items['product_category_en'].fillna('unknown'), sort=True)
+    by_category = _daily_counts(category_codes, len(categories), order_day[order_codes] - day_min, n_days,
+                                items['item_gmv'].fillna(0).to_numpy(), order_codes)
+
+    keys = pd.DataFrame({
+        'level': ['total'] + ['category'] * len(categories) + ['state'] * len(states),
+        'group': ['Total'] + list(categories) + list(states),
+    })
+    return DailySeries(
+        keys, day_min,
+        np.concatenate([total[0], by_category[0], by_state[0]]),
+        np.concatenate([total[1], by_category[1], by_state[1]]),
+    )
+
+
+def _robust_scores(window, values):
+    """Median, skala robust, jumlah history, dan z robust `values` terhadap `window` (sumbu terakhir)
+
+    NaN pada window = belum ada history.
+    """
+    with warnings.catch_warnings():
+        # Slice tanpa history (semua NaN) menghasilkan NaN, bukan error
+        warnings.simplefilter('ignore', RuntimeWarning)
+        median = np.nanmedian(window, axis=-1)
+        mad = np.nanmedian(np.abs(window - median[..., None]), axis=-1)
+    history = np.count_nonzero(~np.isnan(window), axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Batas bawah skala: noise Poisson dari median orders (metric 0), agar series kecil tidak terlalu sensitif
+        noise_floor = np.maximum(RELATIVE_SCALE_FLOOR, 1 / np.sqrt(median[0]))
+        scale = np.maximum(MAD_SCALE * mad, noise_floor * np.abs(median))
+        z = (values - median) / scale
+    return median, z, history
+
+
+def _flag(median, z, history, threshold, min_history, min_orders):
+    # Series dinilai jika history cukup dan median orders (metric 0) cukup besar; berlaku untuk kedua metric
+    eligible = (history >= min_history) & (median[0] >= min_orders)
+    return eligible & (np.abs(z) > threshold)
+
+
+def _anomalies_frame(keys, days, metric_index, series_index, values, median, z):
+    """DataFrame anomali dari posisi (metric, series) yang ditandai"""
+    anomalies_df = pd.DataFrame({
+        'order_date': EPOCH_DAY + np.asarray(days, dtype=np.int64),
+        'level': keys['level'].to_numpy()[series_index],
+        'group': keys['group'].to_numpy()[series_index],
+        'metric': np.array(ANOMALY_METRICS)[metric_index],
+        'value': values,
+        'expected': median,
+        'z_score': z,
+    })
+    anomalies_df['direction'] = np.where(anomalies_df['z_score'] > 0, 'naik', 'turun')
+    return anomalies_df
+
+
+def detect_anomalies(daily_series, window_weeks=ANOMALY_WINDOW_WEEKS, threshold=ANOMALY_THRESHOLD,
+                     min_history=ANOMALY_MIN_HISTORY, min_orders=ANOMALY_MIN_ORDERS):
+    """Nilai seluruh history semua series sekaligus, kembalikan DataFrame hari anomali
+
+    Kolom: order_date, level, group, metric, value, expected (median), z_score, direction.
+    Urut per tanggal lalu |z_score| terbesar.
+    """
+    values = np.stack([daily_series.orders, daily_series.gmv])
+    n_days = daily_series.n_days
+    median = np.full(values.shape, np.nan)
+    z = np.full(values.shape, np.nan)
+    history = np.zeros(values.shape, dtype=np.int64)
+
+    for offset in range(min(7, n_days)):
+        # Kolom hari dengan hari dalam minggu yang sama; window minggu ke-i = W nilai sebelum minggu ke-i
+        columns = np.arange(offset, n_days, 7)
+        weekday_values = values[:, :, columns]
+        padding = np.full(weekday_values.shape[:2] + (window_weeks,), np.nan)
+        windows = sliding_window_view(np.concatenate([padding, weekday_values], axis=-1), window_weeks, axis=-1)
+        median[:, :, columns], z[:, :, columns], history[:, :, columns] = _robust_scores(
+            windows[:, :, :len(columns)], weekday_values
+        )
+
+    flags = _flag(median, z, history, threshold, min_history, min_orders)
+    metric_index, series_index, day_index = np.nonzero(flags)
+    anomalies_df = _anomalies_frame(
+        daily_series.keys, daily_series.day_min + day_index, metric_index, series_index,
+        values[flags], median[flags], z[flags]
+    )
+    order = np.lexsort((-np.abs(anomalies_df['z_score'].to_numpy()), anomalies_df['order_date'].to_numpy()))
+    return anomalies_df.iloc[order].reset_index(drop=True)
+
+
+class AnomalyDetector:
+    """Window robust bergulir (metric x series x hari dalam minggu x W minggu) yang diperbarui per hari
+
+    Hari kosong di antara dua ingest dianggap hari tanpa order (nilai 0), misalnya saat outage.
+    """
+
+    def __init__(self, keys, window_weeks=ANOMALY_WINDOW_WEEKS, threshold=ANOMALY_THRESHOLD,
+                 min_history=ANOMALY_MIN_HISTORY, min_orders=ANOMALY_MIN_ORDERS):
+        self.keys = keys
+        self.window_weeks = window_weeks
+        self.threshold = threshold
+        self.min_history = min_history
+        self.min_orders = min_orders
+        self.window = np.full((len(ANOMALY_METRICS), len(keys), 7, window_weeks), np.nan)
+        # Posisi tulis berikutnya (ring buffer) per hari dalam minggu
+        self.position = np.zeros(7, dtype=np.int64)
+        self.next_day = None
+
+    @classmethod
+    def from_daily_series(cls, daily_series, **kwargs):
+        """Detector dengan window terisi dari history DailySeries (hari berikutnya siap di-ingest)"""
+        detector = cls(daily_series.keys, **kwargs)
+        values = np.stack([daily_series.orders, daily_series.gmv])
+        for offset in range(min(7, daily_series.n_days)):
+            weekday = (daily_series.day_min + offset + 3) % 7
+            recent = values[:, :, offset::7][:, :, -detector.window_weeks:]
+            detector.window[:, :, weekday, :recent.shape[-1]] = recent
+            detector.position[weekday] = recent.shape[-1] % detector.window_weeks
+        detector.next_day = daily_series.day_min + daily_series.n_days
+        return detector
+
+    def ingest(self, day, orders, gmv):
+        """Nilai satu hari (kode hari, array orders & GMV per series), lalu masukkan ke window
+
+        Returns: DataFrame anomali (format sama dengan `detect_anomalies`) untuk hari tersebut,
+        termasuk hari kosong yang dilewati sejak ingest sebelumnya.
+        """
+        frames = []
+        if self.next_day is not None:
+            for missing_day in range(self.next_day, day):
+                frames.append(self._ingest_day(missing_day, np.zeros((len(ANOMALY_METRICS), len(self.keys)))))
+        frames.append(self._ingest_day(day, np.stack([orders, gmv]).astype(np.float64)))
+        self.next_day = day + 1
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def _ingest_day(self, day, values):
+        weekday = (day + 3) % 7
+        median, z, history = _robust_scores(self.window[:, :, weekday], values)
+        flags = _flag(median, z, history, self.threshold, self.min_history, self.min_orders)
+        metric_index, series_index = np.nonzero(flags)
+        anomalies_df = _anomalies_frame(self.keys, np.full(len(series_index), day), metric_index, series_index,
+                                        values[flags], median[flags], z[flags])
+
+        self.window[:, :, weekday, self.position[weekday]] = values
+        self.position[weekday] = (self.position[weekday] + 1) % self.window_weeks
+        return anomalies_df.iloc[np.argsort(-np.abs(anomalies_df['z_score'].to_numpy()), kind='stable')]
+
+
+def analyze_anomalies(anomalies_df, start_date, end_date, level=None):
+    """Anomali dalam rentang terpilih (aturan awal bulan sama dengan filter sidebar), opsional satu level"""
+    first_day, last_day = _window_days(start_date, end_date)
+    day = _day_code(anomalies_df['order_date'])
+    mask = (day >= first_day) & (day <= last_day)
+    if level is not None:
+        mask &= (anomalies_df['level'] == level).to_numpy()
+    return anomalies_df[mask]
+
+
+def anomaly_buckets(anomalies_df, granularity='day'):
+    """Tanggal anomali dipetakan ke bucket tren (awal hari / minggu Senin / bulan), seperti `analyze_trends`"""
+    day = _day_code(anomalies_df['order_date'])
+    if granularity == 'week':
+        day = day - (day + 3) % 7
+    bucket = pd.DatetimeIndex(EPOCH_DAY + day)
+    if granularity == 'month':
+        bucket = bucket.to_period('M').to_timestamp()
+    return anomalies_df.assign(order_date=bucket)
+
+
+def detect_recent_anomalies(n_days=7, dataset_name=None):
+    """Untuk cron: isi window dari history, lalu ingest `n_days` hari terakhir satu per satu"""
+    from utils import get_dataset, load_orders_data, load_order_items_data
+
+    dataset = get_dataset(dataset_name)
+    daily_series = build_daily_series(load_orders_data(dataset), load_order_items_data(dataset))
+    n_history = max(0, daily_series.n_days - n_days)
+    detector = AnomalyDetector.from_daily_series(daily_series.head(n_history))
+    frames = [
+        detector.ingest(daily_series.day_min + day, daily_series.orders[:, day], daily_series.gmv[:, day])
+        for day in range(n_history, daily_series.n_days)
+    ]
+    return pd.concat(frames, ignore_index=True) if frames else detect_anomalies(daily_series.head(0))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    dataset_name = None
+    if '--dataset' in args:
+        dataset_name = args[args.index('--dataset') + 1]
+        args = args[:args.index('--dataset')] + args[args.index('--dataset') + 2:]
+    positional = [arg for arg in args if not arg.startswith('--')]
+    recent = detect_recent_anomalies(int(positional[0]) if positional else 7, dataset_name)
+
+    if '--json' in args:
+        print(json.dumps(recent.to_dict(orient='records'), indent=2, default=str))
+    elif len(recent) == 0:
+        print("Tidak ada anomali")
+    else:
+        print(recent.to_string(index=False))
+    sys.exit(1 if len(recent) > 0 else 0)
@@ -0,0 +1,411 @@
+"""HTTP JSON API untuk angka di balik dashboard (tren, kategori, segment RFM, gap supply-demand)
+
+Jalankan:
+    python dashboard/api.py [port] [workers] [nama_dataset]
+
+Endpoint (semua GET, parameter opsional `start_date` / `end_date` format YYYY-MM-DD):
+    /api/version                  versi dataset
+    /api/trends                   tren orders/GMV/AOV (`granularity` = day | week | month)
+    /api/categories               agregat kategori + top 10 GMV / volume / freight ratio
+    /api/rfm/segments             ringkasan segment RFM
+    /api/geospatial/gap           gap supply-demand per kota (`limit` = jumlah baris per tabel)
+    /api/export                   download tabel (`table`, `format`, `dataset`; lihat export.py), dikirim per chunk
+
+Dataset dimuat sekali saat server start dan dipakai bersama oleh semua handler yang berjalan
+di thread pool. Response di-cache di memori per (endpoint, parameter). ETag dan Last-Modified
+diturunkan dari versi dataset sehingga client bisa revalidasi (304) tanpa memicu analisis.
+Kecuali /api/export: file export ditulis ke socket per chunk (tanpa Content-Length, koneksi ditutup
+setelah chunk terakhir) sehingga file lengkap tidak pernah ada di memori maupun di response cache.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+import pandas as pd
+
+from analysis import (
+    TREND_GRANULARITIES, analyze_trends, analyze_category_performance, analyze_rfm, prepare_geospatial_data
+)
+from seller_performance import build_seller_day_base, analyze_active_sellers
+from dataset_registry import DatasetRegistry
+
+API_DEFAULT_PORT = 8000
+API_DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+
+
+class ApiError(Exception):
+    """Error request yang dikembalikan ke client sebagai JSON dengan status HTTP tertentu"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiDataset:
+    """Dataset in-memory bersama untuk semua handler (read-only setelah dibuat)"""
+
+    def __init__(self, orders_df, order_items_df, geolocation_df=None, sellers_df=None,
+                 version='dev', last_modified=0.0, name=None):
+        self.name = name
+        self.orders_df = orders_df
+        self.order_items_df = order_items_df
+        self.geolocation_df = geolocation_df
+        self.sellers_df = sellers_df
+        # Aktivitas seller per hari untuk supply gap analysis (seller aktif per rentang tanggal)
+        self.seller_base = build_seller_day_base(order_items_df, orders_df, sellers_df) if sellers_df is not None else None
+        self.version = version
+        self.last_modified = int(last_modified)
+        self.min_date = orders_df['order_date'].min().date()
+        self.max_date = orders_df['order_date'].max().date()
+
+    @classmethod
+    def load(cls, dataset_name=None):
+        """Load dataset dari snapshot (lihat utils.load_snapshot); data geospatial opsional"""
+        from utils import (
+            load_orders_data, load_order_items_data, load_geolocation_data, load_sellers_data,
+            get_dataset, get_dataset_version, get_dataset_last_modified
+        )
+
+        dataset = get_dataset(dataset_name)
+        try:
+            geolocation_df, sellers_df = load_geolocation_data(dataset), load_sellers_data(dataset)
+        except FileNotFoundError:
+            geolocation_df, sellers_df = None, None
+        return cls(load_orders_data(dataset), load_order_items_data(dataset), geolocation_df, sellers_df,
+                   version=get_dataset_version(dataset), last_modified=get_dataset_last_modified(dataset),
+                   name=dataset.name)
+
+    def filter_orders(self, start_date, end_date):
+        """Orders dalam rentang tanggal (sama dengan filter tanggal di sidebar dashboard)"""
+        order_date = self.orders_df['order_date']
+        mask = (order_date >= pd.Timestamp(start_date)) & (order_date < pd.Timestamp(end_date + timedelta(days=1)))
+        return self.orders_df[mask].copy()
+
+
+def _frames_to_json(**frames):
+    """Gabungkan beberapa DataFrame (orient=records) menjadi satu objek JSON tanpa parse ulang"""
+    parts = [f"{json.dumps(name)}:{df.to_json(orient='records', date_format='iso')}" for name, df in frames.items()]
+    return ('{' + ','.join(parts) + '}').encode('utf-8')
+
+
+def _parse_date(params, name, default):
+    value = params.get(name)
+    if not value:
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ApiError(400, f"Parameter {name} harus berformat YYYY-MM-DD, diterima: {value}")
+
+
+def _parse_limit(params):
+    value = params.get('limit')
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ApiError(400, f"Parameter limit harus bilangan bulat positif, diterima: {value}")
+    return int(value)
+
+
+def _date_range(dataset, params):
+    start_date = _parse_date(params, 'start_date', dataset.min_date)
+    end_date = _parse_date(params, 'end_date', dataset.max_date)
+    if start_date > end_date:
+        start_date, end_date = end_date, start_date
+    return start_date, end_date
+
+
+def handle_trends(dataset, params):
+    """Tren orders, GMV, dan AOV (Pertanyaan 1)"""
+    granularity = params.get('granularity') or 'month'
+    if granularity not in TREND_GRANULARITIES:
+        raise ApiError(400, f"Granularity tidak dikenal: {granularity}. Pilihan: {', '.join(TREND_GRANULARITIES)}")
+    filtered_orders = dataset.filter_orders(*_date_range(dataset, params))
+    return _frames_to_json(trends=analyze_trends(filtered_orders, granularity))
+
+
+def handle_categories(dataset, params):
+    """Agregat dan top kategori produk (Pertanyaan 2)"""
+    filtered_orders = dataset.filter_orders(*_date_range(dataset, params))
+    order_items_df = dataset.order_items_df
+    filtered_order_items = order_items_df[order_items_df['order_id'].isin(filtered_orders['order_id'])]
+    category_agg, top_gmv, top_volume, top_freight = analyze_category_performance(filtered_order_items)
+    return _frames_to_json(categories=category_agg, top_gmv=top_gmv, top_volume=top_volume, top_freight=top_freight)
+
+
+def handle_rfm_segments(dataset, params):
+    """Ringkasan segment RFM (Pertanyaan 3)"""
+    filtered_orders = dataset.filter_orders(*_date_range(dataset, params))
+    _, segment_df = analyze_rfm(filtered_orders)
+    return _frames_to_json(segments=segment_df)
+
+
+def handle_geospatial_gap(dataset, params):
+    """Tabel gap supply-demand per kota (Pertanyaan 4)"""
+    if dataset.geolocation_df is None or dataset.sellers_df is None:
+        raise ApiError(503, "Data geolocation/sellers tidak tersedia di folder data/")
+    limit = _parse_limit(params)
+    start_date, end_date = _date_range(dataset, params)
+    filtered_orders = dataset.filter_orders(start_date, end_date)
+    # prepare_geospatial_data menulis ulang kolom zip: beri shallow copy agar data bersama tidak berubah
+    _, _, _, _, gap_with_sellers, gap_without_sellers, _ = prepare_geospatial_data(
+        filtered_orders, dataset.geolocation_df.copy(deep=False), dataset.sellers_df.copy(deep=False),
+        active_seller_ids=analyze_active_sellers(dataset.seller_base, start_date, end_date)
+    )
+    return _frames_to_json(
+        gap_with_sellers=gap_with_sellers.head(limit) if limit else gap_with_sellers,
+        gap_without_sellers=gap_without_sellers.head(limit) if limit else gap_without_sellers,
+    )
+
+
+def handle_version(dataset, params):
+    """Versi dataset dan rentang tanggal yang tersedia"""
+    return json.dumps({
+        'version': dataset.version,
+        'last_modified': formatdate(dataset.last_modified, usegmt=True),
+        'min_date': dataset.min_date.isoformat(),
+        'max_date': dataset.max_date.isoformat(),
+    }).encode('utf-8')
+
+
+def resolve_dataset(dataset, dataset_name, registry=None):
+    """ApiDataset untuk `dataset_name`: dataset server, atau snapshot lain yang dimuat lewat `registry`
+
+    Snapshot lain (lihat `utils.discover_datasets`) disimpan di DatasetRegistry per (nama, versi),
+    sehingga file sumber yang diganti dimuat ulang dan memori dibatasi budget registry.
+    """
+    if not dataset_name or dataset.name is None or dataset_name == dataset.name:
+        return dataset
+    from utils import discover_datasets
+
+    available = discover_datasets()
+    if registry is None or dataset_name not in available:
+        raise ApiError(404, f"Dataset tidak ditemukan: {dataset_name}. Pilihan: {', '.join(available)}")
+    return registry.get(dataset_name, 'api_dataset', lambda snapshot: ApiDataset.load(snapshot.name))
+
+
+def prepare_export(dataset, params, registry=None):
+    """(DataFrame, format, nama file) untuk /api/export; body dikirim streaming oleh handler
+
+    Parameter `dataset` (opsional) memilih snapshot dataset, lihat `resolve_dataset`.
+    """
+    from export import EXPORT_FORMATS, EXPORT_TABLES, build_export_table, export_file_name
+
+    dataset = resolve_dataset(dataset, params.get('dataset'), registry)
+    table = params.get('table')
+    if table not in EXPORT_TABLES:
+        raise ApiError(400, f"Tabel export tidak dikenal: {table}. Pilihan: {', '.join(EXPORT_TABLES)}")
+    export_format = params.get('format') or 'csv.gz'
+    if export_format not in EXPORT_FORMATS:
+        raise ApiError(400, f"Format export tidak dikenal: {export_format}. Pilihan: {', '.join(EXPORT_FORMATS)}")
+    geolocation_df = sellers_df = None
+    if table.startswith('gap_'):
+        if dataset.geolocation_df is None or dataset.sellers_df is None:
+            raise ApiError(503, "Data geolocation/sellers tidak tersedia di folder data/")
+        # prepare_geospatial_data menulis ulang kolom zip: beri shallow copy agar data bersama tidak berubah
+        geolocation_df, sellers_df = dataset.geolocation_df.copy(deep=False), dataset.sellers_df.copy(deep=False)
+
+    start_date, end_date = _date_range(dataset, params)
+    df = build_export_table(table, dataset.orders_df, dataset.order_items_df, start_date, end_date,
+                            geolocation_df, sellers_df, dataset.seller_base)
+    return df, export_format, export_file_name(table, start_date, end_date, export_format)
+
+
+EXPORT_ROUTE = '/api/export'
+EXPORT_PARAMS = ('dataset', 'table', 'format', 'start_date', 'end_date')
+
+
+# path -> (handler, parameter query yang dipakai handler; parameter lain diabaikan untuk key cache)
+API_ROUTES = {
+    '/api/version': (handle_version, ()),
+    '/api/trends': (handle_trends, ('start_date', 'end_date', 'granularity')),
+    '/api/categories': (handle_categories, ('start_date', 'end_date')),
+    '/api/rfm/segments': (handle_rfm_segments, ('start_date', 'end_date')),
+    '/api/geospatial/gap': (handle_geospatial_gap, ('start_date', 'end_date', 'limit')),
+}
+
+
+class ResponseCache:
+    """Cache LRU thread-safe untuk body response (bytes)"""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """Handler GET untuk API_ROUTES; dataset dan cache diambil dari server"""
+
+    server_version = 'DashboardAPI/1.0'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip('/') == EXPORT_ROUTE:
+            query = dict(parse_qsl(url.query))
+            self._send_export({name: query[name] for name in EXPORT_PARAMS if query.get(name)})
+            return
+        route = API_ROUTES.get(url.path.rstrip('/') or '/')
+        if route is None:
+            self._send_json(404, json.dumps({'error': f"Endpoint tidak ditemukan: {url.path}"}).encode('utf-8'))
+            return
+
+        handler, param_names = route
+        query = dict(parse_qsl(url.query))
+        params = {name: query[name] for name in param_names if query.get(name)}
+        dataset = self.server.dataset
+
+        # Key/ETag hanya dari versi dataset + parameter: revalidasi tidak perlu menjalankan analisis
+        cache_key = json.dumps([url.path.rstrip('/'), sorted(params.items())])
+        etag = '"{}-{}"'.format(dataset.version, hashlib.sha1(cache_key.encode('utf-8')).hexdigest()[:16])
+        if self._not_modified(etag, dataset.last_modified):
+            self._send_headers(304, etag, dataset.last_modified)
+            return
+
+        body = self.server.response_cache.get(cache_key)
+        if body is None:
+            try:
+                body = handler(dataset, params)
+            except ApiError as e:
+                self._send_json(e.status, json.dumps({'error': str(e)}).encode('utf-8'))
+                return
+            except Exception as e:
+                self.log_error("Error pada %s: %r", url.path, e)
+                self._send_json(500, json.dumps({'error': f"Error internal: {e}"}).encode('utf-8'))
+                return
+            self.server.response_cache.put(cache_key, body)
+        self._send_json(200, body, etag, dataset.last_modified)
+
+    def _send_export(self, params):
+        """Kirim file export per chunk (lihat export.iter_export_chunks) langsung ke socket"""
+        from export import EXPORT_FORMATS, iter_export_chunks
+
+        try:
+            df, export_format, file_name = prepare_export(self.server.dataset, params, self.server.dataset_registry)
+        except ApiError as e:
+            self._send_json(e.status, json.dumps({'error': str(e)}).encode('utf-8'))
+            return
+        except Exception as e:
+            self.log_error("Error pada %s: %r", EXPORT_ROUTE, e)
+            self._send_json(500, json.dumps({'error': f"Error internal: {e}"}).encode('utf-8'))
+            return
+
+        # Ukuran file belum diketahui: tanpa Content-Length, akhir body ditandai dengan menutup koneksi
+        self.send_response(200)
+        self.send_header('Content-Type', EXPORT_FORMATS[export_format][1])
+        self.send_header('Content-Disposition', f'attachment; filename="{file_name}"')
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for chunk in iter_export_chunks(df, export_format):
+                self.wfile.write(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            # Download dibatalkan client
+            pass
+
+    def _not_modified(self, etag, last_modified):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= last_modified
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_headers(self, status, etag=None, last_modified=None, content_length=0):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(content_length))
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', formatdate(last_modified, usegmt=True))
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+    def _send_json(self, status, body, etag=None, last_modified=None):
+        self._send_headers(status, etag, last_modified, len(body))
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ThreadPoolHTTPServer(HTTPServer):
+    """HTTPServer yang menjalankan setiap request di thread pool berukuran tetap"""
+
+    # Default socketserver (5) terlalu kecil: koneksi yang ditolak saat burst baru dicoba ulang ~1 detik kemudian
+    request_queue_size = 128
+
+    def __init__(self, server_address, dataset, max_workers=API_DEFAULT_WORKERS, verbose=False):
+        super().__init__(server_address, ApiRequestHandler)
+        self.dataset = dataset
+        # Snapshot dataset lain untuk /api/export (dimuat saat diminta, lihat `resolve_dataset`)
+        self.dataset_registry = DatasetRegistry()
+        self.response_cache = ResponseCache()
+        self.verbose = verbose
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='api')
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+def create_server(dataset=None, host='127.0.0.1', port=API_DEFAULT_PORT, max_workers=API_DEFAULT_WORKERS, verbose=False,
+                  dataset_name=None):
+    """Buat server API (port=0 untuk port acak); tanpa `dataset`, dataset `dataset_name` dimuat dari snapshot"""
+    return ThreadPoolHTTPServer((host, port), dataset or ApiDataset.load(dataset_name), max_workers=max_workers,
+                                verbose=verbose)
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else API_DEFAULT_PORT
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else API_DEFAULT_WORKERS
+    server = create_server(port=port, max_workers=workers, verbose=True,
+                           dataset_name=sys.argv[3] if len(sys.argv) > 3 else None)
+    print(f"API berjalan di http://127.0.0.1:{server.server_address[1]} ({workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
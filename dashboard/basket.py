@@ -0,0 +1,117 @@
+"""Market basket analysis level kategori: kategori mana yang dibeli bersama dalam satu order
+
+Order items dipadatkan sekali menjadi matriks incidence sparse (order x kategori, biner) dengan
+baris terurut per bulan pembelian. Co-occurrence kategori untuk satu bulan adalah `X.T @ X`
+(diagonal = jumlah order per kategori); matriks bulanan disimpan sebagai prefix sum sehingga
+co-occurrence untuk rentang tanggal mana pun cukup dihitung dengan satu pengurangan.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from cohort import _month_code
+
+
+class BasketBase:
+    """Prefix sum per bulan: cumulative[i] / order_counts[i] = total co-occurrence / order bulan months[:i]"""
+
+    def __init__(self, categories, months, cumulative, order_counts):
+        self.categories = categories
+        self.months = months
+        self.cumulative = cumulative
+        self.order_counts = order_counts
+
+    def __len__(self):
+        return len(self.categories)
+
+
+def build_basket_base(order_items_df, orders_df):
+    """Bangun BasketBase dari order items (sekali per dataset)"""
+    orders = orders_df.drop_duplicates('order_id')
+    order_month = pd.Series(_month_code(orders['order_purchase_timestamp']), index=orders['order_id'].to_numpy())
+
+    items = order_items_df[['order_id', 'product_category_en']].dropna()
+    row_month = items['order_id'].map(order_month)
+    items = items[row_month.notna().to_numpy()]
+    row_month = row_month.dropna().to_numpy(dtype=np.int64)
+
+    category_codes, categories = pd.factorize(items['product_category_en'], sort=True)
+    order_codes, _ = pd.factorize(items['order_id'])
+    n_orders = order_codes.max() + 1 if len(order_codes) > 0 else 0
+    if n_orders == 0:
+        return BasketBase(pd.Index(categories), np.empty(0, dtype=np.int64),
+                          np.zeros((1, len(categories), len(categories))), np.zeros(1, dtype=np.int64))
+
+    # Incidence biner order x kategori (item duplikat dalam satu order/kategori dihitung sekali)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(order_codes), dtype=np.float64), (order_codes, category_codes)),
+        shape=(n_orders, len(categories))
+    )
+    incidence.sum_duplicates()
+    incidence.data[:] = 1.0
+
+    # Urutkan baris order per bulan agar setiap bulan adalah slice baris yang kontigu
+    month_of_order = np.empty(n_orders, dtype=np.int64)
+    month_of_order[order_codes] = row_month
+    order_by_month = np.argsort(month_of_order, kind='stable')
+    incidence = incidence[order_by_month]
+    month_sorted = month_of_order[order_by_month]
+
+    months = np.unique(month_sorted)
+    bounds = np.searchsorted(month_sorted, np.append(months, months[-1] + 1))
+    cumulative = np.zeros((len(months) + 1, len(categories), len(categories)))
+    for i in range(len(months)):
+        block = incidence[bounds[i]:bounds[i + 1]]
+        cumulative[i + 1] = cumulative[i] + (block.T @ block).toarray()
+
+    order_counts = np.concatenate([[0], np.cumsum(np.diff(bounds))])
+    return BasketBase(pd.Index(categories), months, cumulative, order_counts)
+
+
+def analyze_category_pairs(basket_base, start_date, end_date, min_orders=5):
+    """Support, confidence, dan lift setiap pasangan kategori dalam rentang tanggal terpilih
+
+    Bulan masuk rentang jika tanggal awal bulannya berada di antara start_date dan end_date
+    (sama dengan filter `order_date` di sidebar).
+    Returns: pairs_df (satu baris per pasangan dengan minimal `min_orders` order bersama,
+    urut berdasarkan lift), lift_df (matriks lift kategori x kategori urut berdasarkan jumlah
+    order kategori, NaN jika di bawah `min_orders`), dan jumlah order dalam rentang.
+    """
+    start_date = pd.Timestamp(start_date)
+    end_date = pd.Timestamp(end_date)
+    first_month = _month_code([start_date])[0] + (0 if start_date.day == 1 else 1)
+    last_month = _month_code([end_date])[0]
+
+    lo = np.searchsorted(basket_base.months, first_month, side='left')
+    hi = np.searchsorted(basket_base.months, last_month, side='right')
+    co_occurrence = basket_base.cumulative[max(hi, lo)] - basket_base.cumulative[lo]
+    category_orders = np.diag(co_occurrence)
+
+    n_orders = basket_base.order_counts[max(hi, lo)] - basket_base.order_counts[lo]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        confidence = co_occurrence / category_orders[:, None]
+        lift = co_occurrence * n_orders / np.outer(category_orders, category_orders)
+
+    a, b = np.triu_indices(len(basket_base), k=1)
+    together = co_occurrence[a, b]
+    keep = together >= max(1, min_orders)
+    a, b = a[keep], b[keep]
+
+    categories = basket_base.categories
+    pairs_df = pd.DataFrame({
+        'category_a': categories[a],
+        'category_b': categories[b],
+        'orders_together': together[keep].astype(np.int64),
+        'support': together[keep] / n_orders if n_orders > 0 else np.nan,
+        'confidence_a_to_b': confidence[a, b],
+        'confidence_b_to_a': confidence[b, a],
+        'lift': lift[a, b],
+    }).sort_values(['lift', 'orders_together'], ascending=False).reset_index(drop=True)
+
+    lift_matrix = np.where(co_occurrence >= max(1, min_orders), lift, np.nan)
+    np.fill_diagonal(lift_matrix, np.nan)
+    by_orders = np.argsort(-category_orders, kind='stable')
+    lift_df = pd.DataFrame(lift_matrix[np.ix_(by_orders, by_orders)],
+                           index=categories[by_orders], columns=categories[by_orders])
+    return pairs_df, lift_df, int(n_orders)
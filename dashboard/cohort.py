@@ -0,0 +1,105 @@
+"""Cohort retention analysis berbasis customer_unique_id dan bulan pembelian pertama
+
+Semua bulan direpresentasikan sebagai kode integer (`tahun * 12 + bulan - 1`). Data order
+dipadatkan sekali menjadi baris unik (customer, bulan) sehingga matriks cohort untuk
+rentang tanggal mana pun cukup dihitung dengan `np.bincount`, tanpa pivot_table.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _month_code(timestamps):
+    """Kode bulan integer dari Series/DatetimeIndex timestamp"""
+    timestamps = pd.DatetimeIndex(timestamps)
+    return (timestamps.year * 12 + timestamps.month - 1).to_numpy(dtype=np.int64)
+
+
+def _month_start(month_code):
+    """Timestamp awal bulan dari kode bulan integer"""
+    return pd.Timestamp(year=int(month_code) // 12, month=int(month_code) % 12 + 1, day=1)
+
+
+class CohortBase:
+    """Baris unik (customer, bulan) terurut per bulan, dengan cohort (bulan pembelian pertama) per baris"""
+
+    def __init__(self, month, cohort, orders, gmv):
+        self.month = month
+        self.cohort = cohort
+        self.orders = orders
+        self.gmv = gmv
+
+    def __len__(self):
+        return len(self.month)
+
+
+def build_cohort_base(orders_df):
+    """Bangun CohortBase dari orders enriched (sekali per dataset)"""
+    month = _month_code(orders_df['order_purchase_timestamp'])
+    customer_codes, _ = pd.factorize(orders_df['customer_unique_id'])
+    if len(month) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return CohortBase(empty, empty, empty, np.empty(0))
+
+    month_min = month.min()
+    n_months = month.max() - month_min + 1
+    key = customer_codes.astype(np.int64) * n_months + (month - month_min)
+    unique_keys, inverse = np.unique(key, return_inverse=True)
+    orders = np.bincount(inverse, minlength=len(unique_keys))
+    gmv = np.bincount(inverse, weights=orders_df['order_gmv'].fillna(0).to_numpy(), minlength=len(unique_keys))
+
+    customer = unique_keys // n_months
+    row_month = unique_keys % n_months + month_min
+
+    # unique_keys terurut per (customer, bulan): baris pertama setiap customer adalah bulan pertamanya
+    first_row = np.r_[0, np.flatnonzero(np.diff(customer)) + 1]
+    first_month = np.empty(customer.max() + 1, dtype=np.int64)
+    first_month[customer[first_row]] = row_month[first_row]
+    cohort = first_month[customer]
+
+    by_month = np.argsort(row_month, kind='stable')
+    return CohortBase(row_month[by_month], cohort[by_month], orders[by_month], gmv[by_month])
+
+
+def analyze_cohort_retention(cohort_base, start_date, end_date):
+    """Matriks cohort x bulan sejak pembelian pertama untuk rentang tanggal terpilih
+
+    Bulan masuk rentang jika tanggal awal bulannya berada di antara start_date dan end_date
+    (sama dengan filter `order_date` di sidebar). Hanya cohort yang pembelian pertamanya
+    berada dalam rentang yang dianalisis.
+
+    Returns: customers_df, orders_df, gmv_df, retention_df (index: bulan cohort,
+    kolom: bulan sejak pembelian pertama; retention dalam persen).
+    """
+    start_date = pd.Timestamp(start_date)
+    end_date = pd.Timestamp(end_date)
+    first_month = _month_code([start_date])[0] + (0 if start_date.day == 1 else 1)
+    last_month = _month_code([end_date])[0]
+    n = max(0, last_month - first_month + 1)
+
+    lo = np.searchsorted(cohort_base.month, first_month, side='left')
+    hi = np.searchsorted(cohort_base.month, last_month, side='right')
+    month = cohort_base.month[lo:hi]
+    cohort = cohort_base.cohort[lo:hi]
+    in_window = cohort >= first_month
+
+    cell = (cohort[in_window] - first_month) * n + (month[in_window] - cohort[in_window])
+    size = n * n
+    customers = np.bincount(cell, minlength=size).reshape(n, n)
+    orders = np.bincount(cell, weights=cohort_base.orders[lo:hi][in_window], minlength=size).reshape(n, n)
+    gmv = np.bincount(cell, weights=cohort_base.gmv[lo:hi][in_window], minlength=size).reshape(n, n)
+
+    index = pd.Index([_month_start(first_month + i) for i in range(n)], name='cohort_month')
+    columns = pd.Index(range(n), name='months_since_first_purchase')
+    # Sel di luar rentang (cohort terakhir belum punya bulan ke-k) ditandai NaN, bukan 0
+    observable = np.arange(n)[None, :] <= (n - 1 - np.arange(n))[:, None]
+
+    customers_df = pd.DataFrame(np.where(observable, customers, np.nan), index=index, columns=columns)
+    orders_df = pd.DataFrame(np.where(observable, orders, np.nan), index=index, columns=columns)
+    gmv_df = pd.DataFrame(np.where(observable, gmv, np.nan), index=index, columns=columns)
+
+    cohort_size = customers[:, :1] if n > 0 else np.zeros((0, 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        retention = np.where(observable & (cohort_size > 0), customers / cohort_size * 100, np.nan)
+    retention_df = pd.DataFrame(retention, index=index, columns=columns)
+
+    return customers_df, orders_df, gmv_df, retention_df
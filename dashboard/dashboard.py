@@ -1,15 +1,53 @@
+from functools import lru_cache
+
 import streamlit as st
-from streamlit_folium import st_folium
 
-from utils import load_orders_data, load_order_items_data, load_geolocation_data, load_sellers_data
-from analysis import analyze_monthly_trends, analyze_category_performance, analyze_rfm, prepare_geospatial_data
+from utils import (
+    load_orders_data, load_order_items_data, load_geolocation_data, load_sellers_data, load_zip_centroids,
+    discover_datasets, DEFAULT_DATASET
+)
+from analysis import analyze_seller_coverage
 from visualizations import (
     plot_monthly_trends, plot_aov_trend, plot_top_categories_bar, plot_freight_ratio,
     plot_rfm_top_customers, plot_segment_distribution, plot_segment_pie,
     create_customer_heatmap, create_seller_heatmap,
-    plot_gap_top_cities, plot_gap_no_seller_cities, plot_gap_comparison, plot_gap_categories_distribution
+    plot_gap_top_cities, plot_gap_no_seller_cities, plot_gap_comparison, plot_gap_categories_distribution,
+    plot_coverage_top_cities, plot_nearest_seller_distance, plot_state_pair_heatmap, plot_cohort_heatmap,
+    plot_forecast_movers, plot_top_category_pairs, plot_lift_heatmap, plot_seller_leaderboard, plot_purchase_heatmap,
+    plot_delivery_distribution, plot_delivery_late_rate
+)
+from insights import (
+    generate_trend_insights, generate_category_insights, generate_rfm_insights, generate_geospatial_insights,
+    generate_coverage_insights, generate_freight_distance_insights, generate_cohort_insights,
+    generate_forecast_insights, generate_basket_insights, generate_seller_insights, generate_purchase_pattern_insights,
+    generate_delivery_insights
+)
+from kpi import (
+    summarize_trends, summarize_categories, summarize_rfm, summarize_geospatial, summarize_delivery,
+    GAP_HIGH_THRESHOLD, GAP_VERY_HIGH_THRESHOLD
+)
+from cohort import analyze_cohort_retention
+from lookup import lookup_rfm
+from forecast import analyze_forecast
+from basket import analyze_category_pairs
+from purchase_pattern import analyze_purchase_pattern
+from delivery import (
+    analyze_delivery, delivery_distribution, delivery_group_ranking, MIN_GROUP_ORDERS
+)
+from anomaly import (
+    analyze_anomalies, anomaly_buckets, ANOMALY_THRESHOLD, ANOMALY_WINDOW_WEEKS
+)
+from export import (
+    EXPORT_FORMATS, EXPORT_API_URL, EXPORT_MAX_DOWNLOAD_ROWS, export_to_bytes, export_file_name, export_url
+)
+from seller_performance import analyze_seller_leaderboard, analyze_seller_drilldown
+from figure_cache import FigureCache
+from dataset_registry import DatasetRegistry
+from derived import load_derived
+from analysis_cache import AnalysisCache, LazyData, run_analysis
+from speculative import (
+    SpeculativePrecomputer, DATE_PRESETS, SPECULATIVE_ENABLED, preset_range, speculative_candidates, WINDOW_ANALYSES
 )
-from insights import generate_trend_insights, generate_category_insights, generate_rfm_insights, generate_geospatial_insights
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -19,30 +57,262 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load data dengan caching
-@st.cache_data
+# Data dimuat lazy per dataset ke registry bersama (batas memori total, eviction LRU per dataset)
+@st.cache_resource
+def get_dataset_registry():
+    """Registry dataset in-memory, dipakai bersama oleh semua session"""
+    return DatasetRegistry()
+
+@st.cache_data(ttl=60)
+def discover_datasets_cached():
+    """Nama dataset yang tersedia (dataset bawaan + snapshots/), dicek ulang setiap menit"""
+    return list(discover_datasets())
+
+def load_dataset_object(key, builder):
+    """Objek `key` milik dataset aktif; `builder(dataset)` hanya dijalankan sekali per dataset"""
+    return get_dataset_registry().get(dataset_name, key, builder)
+
 def load_data():
     """Load semua data yang diperlukan"""
-    orders_df = load_orders_data()
-    order_items_df = load_order_items_data()
+    orders_df = load_dataset_object('orders_df', load_orders_data)
+    order_items_df = load_dataset_object('order_items_df', load_order_items_data)
     return orders_df, order_items_df
 
-@st.cache_data
-def load_geolocation_cached():
-    """Load geolocation data dengan caching"""
-    return load_geolocation_data()
-
-@st.cache_data
 def load_sellers_cached():
-    """Load sellers data dengan caching"""
-    return load_sellers_data()
+    """Sellers data (shallow copy: prepare_geospatial_data menulis ulang kolom zip)"""
+    return load_dataset_object('sellers_df', load_sellers_data).copy(deep=False)
+
+def load_derived_cached(name):
+    """Objek turunan `name` (lihat derived.py) dari snapshot di disk, sekali per dataset di registry
+
+    Snapshot yang sama dibuat oleh warmup.py; frame sumber hanya dimuat jika snapshot perlu di-build.
+    """
+    def build(dataset):
+        return load_derived(name, dataset, LazyData({
+            'orders_df': lambda: load_data()[0],
+            'order_items_df': lambda: load_data()[1],
+            'sellers_df': load_sellers_cached,
+            'zip_centroids': lambda: load_dataset_object('zip_centroids', load_zip_centroids),
+        }))
+
+    return load_dataset_object(name, build)
+
+def load_seller_index_cached():
+    """Spatial index seller dan centroid zip, dipakai bersama oleh semua session"""
+    return load_derived_cached('seller_index'), load_dataset_object('zip_centroids', load_zip_centroids)
+
+def load_cohort_base_cached():
+    """Struktur cohort (customer x bulan)"""
+    return load_derived_cached('cohort_base')
+
+def load_lookup_index_cached():
+    """Hash index customer/order untuk fitur pencarian"""
+    return load_derived_cached('lookup_index')
+
+def load_series_tensor_cached():
+    """Tensor series kategori x state (GMV & orders per bulan)"""
+    return load_derived_cached('series_tensor')
+
+def load_basket_base_cached():
+    """Co-occurrence kategori per bulan (matriks sparse order x kategori)"""
+    return load_derived_cached('basket_base')
+
+def load_purchase_pattern_base_cached():
+    """Counter orders/GMV per hari x (hari dalam minggu, jam)"""
+    return load_derived_cached('purchase_pattern_base')
+
+def load_delivery_base_cached():
+    """Histogram lead time pengiriman per hari x (state/kategori, bin)"""
+    return load_derived_cached('delivery_base')
+
+def load_anomalies_cached():
+    """Anomali harian (total, kategori, state) untuk seluruh history"""
+    return load_derived_cached('daily_anomalies')
+
+def load_seller_day_base_cached():
+    """Agregat per seller per hari untuk leaderboard seller"""
+    return load_derived_cached('seller_day_base')
+
+def get_dataset_version_cached(name):
+    """Versi dataset `name` (bagian dari key cache figure/analisis); dicek ulang berkala oleh registry"""
+    return get_dataset_registry().dataset_version(name)
+
+@st.cache_resource
+def get_figure_cache():
+    """Cache artifact render di disk, dipakai bersama semua session dan worker"""
+    return FigureCache()
+
+@st.cache_resource
+def get_analysis_cache():
+    """Cache hasil analisis per rentang tanggal (in-memory), dipakai bersama semua session"""
+    cache = AnalysisCache()
+    # Hasil analisis ikut dilepas saat dataset-nya dikeluarkan dari registry
+    get_dataset_registry().add_eviction_listener(lambda name, version: cache.evict_version(version))
+    return cache
+
+@st.cache_resource
+def get_speculative_precomputer():
+    """Worker background yang mengisi cache analisis untuk view yang kemungkinan diminta berikutnya"""
+    precomputer = SpeculativePrecomputer(get_analysis_cache())
+    # Task antrian memegang DataFrame dataset: batalkan saat dataset dikeluarkan dari registry
+    get_dataset_registry().add_eviction_listener(lambda name, version: precomputer.cancel_version(version))
+    return precomputer
+
+def analysis_data():
+    """Objek dataset aktif yang dibaca oleh analisis di analysis_cache.ANALYSES (dimuat saat dibutuhkan)"""
+    return LazyData({
+        'orders_df': lambda: orders_df,
+        'order_items_df': lambda: order_items_df,
+        'geolocation_df': lambda: load_dataset_object('geolocation_df', load_geolocation_data),
+        'sellers_df': lambda: load_dataset_object('sellers_df', load_sellers_data),
+        'seller_day_base': load_seller_day_base_cached,
+    })
 
-# Load data
+def cached_analysis(name, start_date, end_date):
+    """Hasil analisis `name` untuk rentang tanggal dari cache analisis (dihitung jika belum ada)"""
+    return run_analysis(get_analysis_cache(), analysis_data(), get_dataset_version_cached(dataset_name),
+                        name, start_date, end_date)
+
+def _session_id():
+    """Id session Streamlit aktif (antrian precompute terpisah per session)"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+def schedule_speculative(start_date, end_date):
+    """Jadwalkan precompute kandidat view berikutnya (filter lain/preset) setelah rerun selesai"""
+    if not SPECULATIVE_ENABLED:
+        return
+    analyses = WINDOW_ANALYSES
+    if 'shipping_distance_km' not in order_items_df.columns:
+        analyses = [name for name in analyses if not name.startswith('freight_per_km')]
+    min_date, max_date = orders_df['order_date'].min().date(), orders_df['order_date'].max().date()
+    # Objek dimuat di sini (thread script) agar worker tidak memanggil loader yang membaca dataset aktif global
+    data = analysis_data()
+    data.load_all()
+    get_speculative_precomputer().schedule(
+        _session_id(), data, get_dataset_version_cached(dataset_name),
+        speculative_candidates(start_date, end_date, min_date, max_date, analyses)
+    )
+
+def cached_artifact(artifact_id, params, builder, kind='plotly'):
+    """Ambil artifact render dari cache disk; builder (analisis + render) hanya dijalankan saat miss"""
+    return get_figure_cache().get_or_build(get_dataset_version_cached(dataset_name), artifact_id, params, builder, kind)
+
+def render_metrics(metrics):
+    """Render daftar (label, value) sebagai st.metric dalam satu baris kolom"""
+    for col, (label, value) in zip(st.columns(len(metrics)), metrics):
+        with col:
+            st.metric(label, value)
+
+def render_map(map_html):
+    """Render HTML peta Folium (hasil cache) sebagai iframe statis"""
+    if hasattr(st, 'iframe'):
+        st.iframe(map_html, height=500)
+    else:
+        # Streamlit versi lama belum punya st.iframe
+        import streamlit.components.v1 as components
+
+        components.html(map_html, height=500)
+
+def _deferred_download_supported():
+    """Streamlit versi baru menerima callable sebagai data download_button (dijalankan saat diklik)"""
+    from streamlit.runtime.media_file_manager import MediaFileManager
+
+    return hasattr(MediaFileManager, 'add_deferred')
+
+def render_download(label, table, get_frame, filter_params):
+    """Tombol download data di balik chart
+
+    Jika API dashboard dikonfigurasi (DASHBOARD_API_URL), tombol mengarah ke `/api/export` di api.py
+    yang mengirim file per chunk langsung ke browser, tanpa melewati memori proses Streamlit; API
+    memuat snapshot dataset terpilih sendiri (lihat `api.resolve_dataset`).
+    Tanpa API dipakai st.download_button: Streamlit menyimpan seluruh file di memori (media file
+    manager), sehingga hanya tersedia untuk tabel sampai EXPORT_MAX_DOWNLOAD_ROWS baris.
+    """
+    export_format = st.session_state.get('export_format', 'csv.gz')
+    start_date, end_date = filter_params['start_date'], filter_params['end_date']
+    if EXPORT_API_URL:
+        url = export_url(EXPORT_API_URL, table, start_date, end_date, export_format, dataset_name)
+        if hasattr(st, 'link_button'):
+            st.link_button(f"⬇️ {label}", url)
+        else:
+            st.markdown(f"[⬇️ {label}]({url})")
+        return
+
+    frame = get_frame()
+    if len(frame) > EXPORT_MAX_DOWNLOAD_ROWS:
+        st.caption(
+            f"⬇️ {label}: {len(frame):,} baris, melebihi batas download langsung ({EXPORT_MAX_DOWNLOAD_ROWS:,}). "
+            "Jalankan API (`python dashboard/api.py`) dan set `DASHBOARD_API_URL` untuk download streaming, "
+            "atau gunakan export batch `python dashboard/export.py`."
+        )
+        return
+
+    file_name = export_file_name(table, start_date, end_date, export_format)
+    mime = EXPORT_FORMATS[export_format][1]
+
+    def build_file():
+        return export_to_bytes(frame, export_format)
+
+    if _deferred_download_supported():
+        st.download_button(f"⬇️ {label}", build_file, file_name=file_name, mime=mime,
+                           on_click='ignore', key=f"download_{table}")
+    elif st.button(f"Siapkan {label}", key=f"prepare_{table}"):
+        # Streamlit versi lama: file dibuat hanya setelah user meminta
+        st.download_button(f"⬇️ {label}", build_file(), file_name=file_name, mime=mime, key=f"download_{table}")
+
+def render_dataset_selector():
+    """Pilih snapshot dataset di sidebar (hanya tampil jika ada lebih dari satu dataset)"""
+    names = discover_datasets_cached()
+    if len(names) == 1:
+        return names[0]
+    with st.sidebar:
+        st.subheader("🗂️ Dataset")
+        name = st.selectbox(
+            "Snapshot Dataset",
+            names,
+            index=names.index(DEFAULT_DATASET),
+            key='dataset_name',
+            help="Snapshot dimuat saat pertama dipilih; snapshot yang lama tidak dipakai dikeluarkan dari memori."
+        )
+        st.markdown("---")
+    return name
+
+def render_dataset_memory():
+    """Ringkasan memori registry dataset di sidebar"""
+    stats = get_dataset_registry().stats()
+    with st.sidebar:
+        st.caption(
+            f"Memori dataset: {stats['resident_bytes'] / 1024 ** 2:,.0f} / "
+            f"{stats['memory_budget_bytes'] / 1024 ** 2:,.0f} MB ({', '.join(stats['loaded'])})"
+        )
+        analysis_stats = get_analysis_cache().stats()
+        figure_cache = get_figure_cache()
+        figure_requests = figure_cache.hits + figure_cache.misses
+        st.caption(
+            f"Cache analisis: hit {analysis_stats['hit_rate']:.0%} "
+            f"({analysis_stats['hits']:,}/{analysis_stats['hits'] + analysis_stats['misses']:,}), "
+            f"{analysis_stats['speculative_hits']:,}/{analysis_stats['speculative_builds']:,} hasil precompute terpakai, "
+            f"{analysis_stats['resident_bytes'] / 1024 ** 2:,.0f} MB · "
+            f"Cache figure: hit {figure_cache.hits / figure_requests if figure_requests else 0:.0%} "
+            f"({figure_cache.hits:,}/{figure_requests:,})"
+        )
+
+# Dataset aktif (dipilih di sidebar) dan datanya
+dataset_name = render_dataset_selector()
 orders_df, order_items_df = load_data()
 
 # ============================================
 # SIDEBAR - Filter & Metrics
 # ============================================
+def _apply_date_preset(min_date, max_date):
+    """Callback preset rentang tanggal: isi ulang date_input sesuai preset terpilih"""
+    preset = st.session_state['date_preset']
+    if preset in DATE_PRESETS:
+        st.session_state['date_range'] = preset_range(DATE_PRESETS[preset], min_date, max_date)
+
 def render_sidebar(orders_df):
     """Render sidebar dengan filter dan metrics"""
     with st.sidebar:
@@ -59,12 +329,29 @@ def render_sidebar(orders_df):
         st.subheader("🔍 Filter Data")
         st.caption(f"Data tersedia dari {min_date.strftime('%d %b %Y')} hingga {max_date.strftime('%d %b %Y')}")
 
+        # Rentang disimpan di session state agar bisa diisi dari preset; reset jika batas data berubah (ganti dataset)
+        if st.session_state.get('date_range_bounds') != (min_date, max_date):
+            st.session_state['date_range_bounds'] = (min_date, max_date)
+            st.session_state['date_range'] = (min_date, max_date)
+            st.session_state['date_preset'] = 'Kustom'
+
+        st.selectbox(
+            "Rentang Cepat",
+            ['Kustom'] + list(DATE_PRESETS),
+            key='date_preset',
+            on_change=_apply_date_preset,
+            args=(min_date, max_date),
+            help="Preset rentang dalam bulan penuh (data difilter per bulan order); hasil analisisnya "
+                 "disiapkan di background sehingga cepat dibuka."
+        )
         date_range = st.date_input(
             "Pilih Rentang Tanggal",
-            value=(min_date, max_date),
             min_value=min_date,
             max_value=max_date,
-            help="Pilih rentang tanggal untuk memfilter data. Klik dua kali untuk memilih range."
+            key='date_range',
+            on_change=lambda: st.session_state.update(date_preset='Kustom'),
+            help="Pilih rentang tanggal untuk memfilter data. Klik dua kali untuk memilih range. "
+                 "Data dikelompokkan per bulan: bulan ikut terhitung jika tanggal 1-nya berada di dalam rentang."
         )
 
         if isinstance(date_range, (tuple, list)) and len(date_range) == 2:
@@ -75,63 +362,144 @@ def render_sidebar(orders_df):
             start_date = min_date
             end_date = max_date
 
-        filtered_orders = orders_df[
-            (orders_df['order_date'].dt.date >= start_date) &
-            (orders_df['order_date'].dt.date <= end_date)
-        ].copy()
+        filtered_orders = cached_analysis('filtered_orders', start_date, end_date)
+
+        st.selectbox(
+            "Format Export",
+            list(EXPORT_FORMATS),
+            index=list(EXPORT_FORMATS).index('csv.gz'),
+            key='export_format',
+            help="Format file untuk tombol download data di setiap section."
+        )
 
         return filtered_orders, start_date, end_date
 
 # ============================================
 # PERTANYAAN 1: TREN ORDERS, GMV, DAN AOV
 # ============================================
-def render_question_1(filtered_orders):
+def render_question_1(filtered_orders, start_date, end_date, filter_params):
     """Render visualisasi dan insight untuk Pertanyaan 1"""
     st.header("📊 Pertanyaan 1: Tren Pertumbuhan & Pendapatan (Bulanan)")
 
-    monthly_df = analyze_monthly_trends(filtered_orders)
+    # Analisis dijalankan lazy (lewat cache analisis): hanya saat ada artifact yang belum ada di cache
+    def monthly():
+        return cached_analysis('monthly_trends', start_date, end_date)
 
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Total Orders", f"{monthly_df['orders'].sum():,}")
-    with col2:
-        st.metric("Total GMV", f"R$ {monthly_df['gmv'].sum():,.2f}")
-    with col3:
-        st.metric("Rata-rata AOV", f"R$ {monthly_df['aov'].mean():.2f}")
-    with col4:
-        growth_rate = ((monthly_df['orders'].iloc[-1] / monthly_df['orders'].iloc[0]) ** (1/(len(monthly_df)-1)) - 1) * 100 if len(monthly_df) > 1 else 0
-        st.metric("Pertumbuhan Bulanan", f"{growth_rate:.2f}%")
+    def trends(granularity):
+        return monthly() if granularity == 'month' else cached_analysis(f'trends_{granularity}', start_date, end_date)
+
+    def build_summary():
+        kpi = summarize_trends(monthly())
+        return {
+            'metrics': [
+                ("Total Orders", f"{kpi.total_orders:,}"),
+                ("Total GMV", f"R$ {kpi.total_gmv:,.2f}"),
+                ("Rata-rata AOV", f"R$ {kpi.avg_aov:.2f}"),
+                ("Pertumbuhan Bulanan", f"{kpi.orders_growth_pct:.2f}%"),
+            ],
+            'insights': generate_trend_insights(kpi),
+        }
+
+    summary = cached_artifact('q1_summary', filter_params, build_summary, kind='json')
+    render_metrics(summary['metrics'])
+
+    granularity_options = {'Harian': 'day', 'Mingguan': 'week', 'Bulanan': 'month'}
+    granularity_label = st.radio("Granularitas Tren", list(granularity_options), index=2, horizontal=True)
+    granularity = granularity_options[granularity_label]
+    trend_params = {**filter_params, 'granularity': granularity}
 
-    st.plotly_chart(plot_monthly_trends(monthly_df), use_container_width=True)
-    st.plotly_chart(plot_aov_trend(monthly_df), use_container_width=True)
+    @lru_cache(maxsize=None)
+    def anomalies(level=None):
+        return analyze_anomalies(load_anomalies_cached(), start_date, end_date, level=level)
+
+    # Hari anomali (series total) ditandai pada chart tren; threshold ikut key cache
+    st.plotly_chart(
+        cached_artifact('q1_trends', {**trend_params, 'anomaly_threshold': ANOMALY_THRESHOLD}, lambda: plot_monthly_trends(
+            trends(granularity), granularity, anomalies=anomaly_buckets(anomalies('total'), granularity))),
+        use_container_width=True
+    )
+    st.plotly_chart(
+        cached_artifact('q1_aov', trend_params, lambda: plot_aov_trend(trends(granularity), granularity)),
+        use_container_width=True
+    )
 
     with st.expander("📝 Insight Analisis"):
-        st.markdown(generate_trend_insights(monthly_df))
+        st.markdown(summary['insights'])
+
+    with st.expander("🚨 Anomali Harian Orders & GMV (Total, Kategori, State)"):
+        anomalies_df = anomalies()
+        st.caption(f"Hari dengan |z robust| > {ANOMALY_THRESHOLD:g} dibanding median hari yang sama dalam "
+                   f"{ANOMALY_WINDOW_WEEKS} minggu sebelumnya: {len(anomalies_df):,} anomali pada rentang terpilih.")
+        if len(anomalies_df) > 0:
+            st.dataframe(anomalies_df.sort_values('z_score', key=abs, ascending=False).head(100),
+                         hide_index=True, use_container_width=True)
+
+    render_download("Download Orders Terfilter", 'orders', lambda: filtered_orders, filter_params)
+
+def render_purchase_pattern(start_date, end_date, filter_params):
+    """Render heatmap pola waktu pembelian (hari dalam minggu x jam)"""
+    st.subheader("🕒 Pola Waktu Pembelian (Hari × Jam)")
+
+    @lru_cache(maxsize=None)
+    def purchase_pattern():
+        return analyze_purchase_pattern(load_purchase_pattern_base_cached(), start_date, end_date)
+
+    def build_summary():
+        orders_matrix, gmv_matrix = purchase_pattern()
+        return {
+            'has_orders': bool(orders_matrix.values.sum() > 0),
+            'insights': generate_purchase_pattern_insights(orders_matrix, gmv_matrix),
+        }
+
+    summary = cached_artifact('purchase_pattern_summary', filter_params, build_summary, kind='json')
+    if not summary['has_orders']:
+        st.info("Tidak ada order pada rentang tanggal yang dipilih")
+        return
+
+    metric_options = {"Orders": (0, "Orders", ",.0f"), "GMV (R$)": (1, "R$", ",.2f")}
+    metric = st.radio("Metric Pola Pembelian", list(metric_options), horizontal=True)
+    matrix_position, colorbar_title, value_format = metric_options[metric]
+    st.plotly_chart(
+        cached_artifact('purchase_pattern_heatmap', {**filter_params, 'metric': metric}, lambda: plot_purchase_heatmap(
+            purchase_pattern()[matrix_position], f"Pola Pembelian: {metric} per Hari × Jam", colorbar_title, value_format)),
+        use_container_width=True
+    )
+
+    with st.expander("📝 Insight Pola Pembelian"):
+        st.markdown(summary['insights'])
 
 # ============================================
 # PERTANYAAN 2: TOP KATEGORI & FREIGHT RATIO
 # ============================================
-def render_question_2(filtered_orders, order_items_df):
+def render_question_2(start_date, end_date, filter_params):
     """Render visualisasi dan insight untuk Pertanyaan 2"""
     st.header("📦 Pertanyaan 2: Analisis Kategori Produk")
 
-    filtered_order_items = order_items_df[
-        order_items_df['order_id'].isin(filtered_orders['order_id'])
-    ].copy()
+    def filtered_order_items():
+        return cached_analysis('filtered_order_items', start_date, end_date)
 
-    category_agg, top_gmv, top_volume, top_freight = analyze_category_performance(filtered_order_items)
+    def category_performance():
+        return cached_analysis('category_performance', start_date, end_date)
+
+    def build_freight_chart(top_key, build):
+        # Kolom freight_ratio dalam persen untuk chart freight ratio
+        top_df = category_performance()[top_key].copy()
+        top_df['freight_ratio_pct'] = top_df['freight_ratio'] * 100
+        return build(top_df)
 
     col1, col2 = st.columns(2)
     with col1:
         st.plotly_chart(
-            plot_top_categories_bar(top_gmv, 'gmv', 'product_category_en',
-                                   "Top 10 Kategori berdasarkan GMV", "GMV (R$)", '#72BCD4'),
+            cached_artifact('q2_top_gmv', filter_params, lambda: plot_top_categories_bar(
+                category_performance()[1], 'gmv', 'product_category_en',
+                "Top 10 Kategori berdasarkan GMV", "GMV (R$)", '#72BCD4')),
             use_container_width=True
         )
     with col2:
         st.plotly_chart(
-            plot_top_categories_bar(top_volume, 'orders', 'product_category_en',
-                                   "Top 10 Kategori berdasarkan Volume Order", "Jumlah Order", '#4C9A2A'),
+            cached_artifact('q2_top_volume', filter_params, lambda: plot_top_categories_bar(
+                category_performance()[2], 'orders', 'product_category_en',
+                "Top 10 Kategori berdasarkan Volume Order", "Jumlah Order", '#4C9A2A')),
             use_container_width=True
         )
 
@@ -139,139 +507,391 @@ def render_question_2(filtered_orders, order_items_df):
     col1, col2 = st.columns(2)
 
     with col1:
-        top_gmv_fr = top_gmv.copy()
-        top_gmv_fr['freight_ratio_pct'] = top_gmv_fr['freight_ratio'] * 100
         st.plotly_chart(
-            plot_freight_ratio(top_gmv_fr, "Freight Ratio untuk Top 10 Kategori GMV"),
+            cached_artifact('q2_freight_ratio_top_gmv', filter_params, lambda: build_freight_chart(
+                1, lambda top_df: plot_freight_ratio(top_df, "Freight Ratio untuk Top 10 Kategori GMV"))),
             use_container_width=True
         )
 
     with col2:
-        top_freight_fr = top_freight.copy()
-        top_freight_fr['freight_ratio_pct'] = top_freight_fr['freight_ratio'] * 100
         st.plotly_chart(
-            plot_top_categories_bar(top_freight_fr, 'freight_ratio_pct', 'product_category_en',
-                                   "Top 10 Kategori dengan Freight Ratio Tertinggi", "Freight Ratio (%)", '#FF6B6B'),
+            cached_artifact('q2_top_freight_ratio', filter_params, lambda: build_freight_chart(
+                3, lambda top_df: plot_top_categories_bar(
+                    top_df, 'freight_ratio_pct', 'product_category_en',
+                    "Top 10 Kategori dengan Freight Ratio Tertinggi", "Freight Ratio (%)", '#FF6B6B'))),
             use_container_width=True
         )
 
+    insights = cached_artifact(
+        'q2_insights', filter_params,
+        lambda: generate_category_insights(summarize_categories(*category_performance())), kind='json'
+    )
     with st.expander("📝 Insight Analisis"):
-        st.markdown(generate_category_insights(top_gmv, top_volume, top_freight))
+        st.markdown(insights)
+
+    render_download("Download Order Items Terfilter", 'order_items', filtered_order_items, filter_params)
+
+    render_freight_per_km(start_date, end_date, filter_params)
+
+def render_freight_per_km(start_date, end_date, filter_params):
+    """Render analisis ongkir per km (kategori dan pasangan state)"""
+    st.subheader("🚚 Analisis Freight per Km")
+    if 'shipping_distance_km' not in order_items_df.columns:
+        st.info("Jarak pengiriman belum tersedia. Pastikan sellers_dataset.csv dan geolocation_dataset.csv ada di folder data/")
+        return
+
+    def category_km():
+        return cached_analysis('freight_per_km', start_date, end_date)
+
+    def state_pair_km():
+        return cached_analysis('freight_per_km_state_pair', start_date, end_date)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(
+            cached_artifact('freight_km_top_categories', filter_params, lambda: plot_top_categories_bar(
+                category_km().head(10), 'freight_per_km', 'product_category_en',
+                "Top 10 Kategori berdasarkan Freight per Km", "Freight per Km (R$)", '#F38181')),
+            use_container_width=True
+        )
+    with col2:
+        st.plotly_chart(
+            cached_artifact('freight_km_top_distance', filter_params, lambda: plot_top_categories_bar(
+                category_km().nlargest(10, 'avg_distance_km'), 'avg_distance_km', 'product_category_en',
+                "Top 10 Kategori dengan Jarak Kirim Rata-rata Terjauh", "Jarak (km)", '#AA96DA')),
+            use_container_width=True
+        )
+
+    st.plotly_chart(
+        cached_artifact('freight_km_state_pair', filter_params, lambda: plot_state_pair_heatmap(state_pair_km())),
+        use_container_width=True
+    )
+
+    insights = cached_artifact(
+        'freight_km_insights', filter_params,
+        lambda: generate_freight_distance_insights(category_km(), state_pair_km()), kind='json'
+    )
+    with st.expander("📝 Insight Freight per Km"):
+        st.markdown(insights)
+
+def render_category_pairs(start_date, end_date, filter_params):
+    """Render market basket kategori: pasangan kategori yang sering dibeli dalam satu order"""
+    st.subheader("🛒 Kategori yang Dibeli Bersama (Market Basket)")
+
+    sort_options = {"Lift": 'lift', "Jumlah Order Bersama": 'orders_together'}
+    sort_label = st.radio("Urutkan Pasangan", list(sort_options), horizontal=True)
+    sort_col = sort_options[sort_label]
+
+    @lru_cache(maxsize=None)
+    def category_pairs():
+        return analyze_category_pairs(load_basket_base_cached(), start_date, end_date)
+
+    def build_summary():
+        pairs_df, _, n_orders = category_pairs()
+        return {'has_pairs': len(pairs_df) > 0, 'insights': generate_basket_insights(pairs_df, n_orders)}
+
+    summary = cached_artifact('basket_summary', filter_params, build_summary, kind='json')
+    if not summary['has_pairs']:
+        st.info("Tidak ada pasangan kategori yang cukup sering dibeli bersama pada rentang tanggal yang dipilih")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(
+            cached_artifact('basket_top_pairs', {**filter_params, 'sort': sort_col},
+                            lambda: plot_top_category_pairs(category_pairs()[0], sort_col)),
+            use_container_width=True
+        )
+    with col2:
+        st.plotly_chart(
+            cached_artifact('basket_lift_heatmap', filter_params, lambda: plot_lift_heatmap(category_pairs()[1])),
+            use_container_width=True
+        )
+
+    with st.expander("📝 Insight Market Basket"):
+        st.markdown(summary['insights'])
 
 # ============================================
 # PERTANYAAN 3: RFM ANALYSIS
 # ============================================
-def render_question_3(filtered_orders):
+def render_question_3(start_date, end_date, filter_params):
     """Render visualisasi dan insight untuk Pertanyaan 3"""
     st.header("👥 Pertanyaan 3: RFM Analysis - Segmentasi Pelanggan")
 
-    rfm_df, segment_df = analyze_rfm(filtered_orders)
+    def rfm():
+        return cached_analysis('rfm', start_date, end_date)
 
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Rata-rata Recency", f"{rfm_df['recency'].mean():.1f} hari")
-    with col2:
-        st.metric("Rata-rata Frequency", f"{rfm_df['frequency'].mean():.2f}x")
-    with col3:
-        st.metric("Rata-rata Monetary", f"R$ {rfm_df['monetary'].mean():,.2f}")
+    def build_summary():
+        kpi = summarize_rfm(*rfm())
+        return {
+            'metrics': [
+                ("Rata-rata Recency", f"{kpi.avg_recency:.1f} hari"),
+                ("Rata-rata Frequency", f"{kpi.avg_frequency:.2f}x"),
+                ("Rata-rata Monetary", f"R$ {kpi.avg_monetary:,.2f}"),
+            ],
+            'insights': generate_rfm_insights(kpi),
+        }
+
+    summary = cached_artifact('q3_summary', filter_params, build_summary, kind='json')
+    render_metrics(summary['metrics'])
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        top_recency = rfm_df.nsmallest(5, 'recency')
         st.plotly_chart(
-            plot_rfm_top_customers(top_recency, 'recency', "Top 5 Customers by Recency",
-                                  "Recency (days)", '#72BCD4'),
+            cached_artifact('q3_top_recency', filter_params, lambda: plot_rfm_top_customers(
+                rfm()[0].nsmallest(5, 'recency'), 'recency', "Top 5 Customers by Recency",
+                "Recency (days)", '#72BCD4')),
             use_container_width=True
         )
     with col2:
-        top_frequency = rfm_df.nlargest(5, 'frequency')
         st.plotly_chart(
-            plot_rfm_top_customers(top_frequency, 'frequency', "Top 5 Customers by Frequency",
-                                  "Frequency", '#4C9A2A'),
+            cached_artifact('q3_top_frequency', filter_params, lambda: plot_rfm_top_customers(
+                rfm()[0].nlargest(5, 'frequency'), 'frequency', "Top 5 Customers by Frequency",
+                "Frequency", '#4C9A2A')),
             use_container_width=True
         )
     with col3:
-        top_monetary = rfm_df.nlargest(5, 'monetary')
         st.plotly_chart(
-            plot_rfm_top_customers(top_monetary, 'monetary', "Top 5 Customers by Monetary",
-                                  "Monetary (R$)", '#D36C6C'),
+            cached_artifact('q3_top_monetary', filter_params, lambda: plot_rfm_top_customers(
+                rfm()[0].nlargest(5, 'monetary'), 'monetary', "Top 5 Customers by Monetary",
+                "Monetary (R$)", '#D36C6C')),
             use_container_width=True
         )
 
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(plot_segment_distribution(segment_df), use_container_width=True)
+        st.plotly_chart(
+            cached_artifact('q3_segment_distribution', filter_params, lambda: plot_segment_distribution(rfm()[1])),
+            use_container_width=True
+        )
     with col2:
-        st.plotly_chart(plot_segment_pie(segment_df), use_container_width=True)
+        st.plotly_chart(
+            cached_artifact('q3_segment_pie', filter_params, lambda: plot_segment_pie(rfm()[1])),
+            use_container_width=True
+        )
+
+    with st.expander("📝 Insight Analisis"):
+        st.markdown(summary['insights'])
+
+    render_download("Download Tabel RFM", 'rfm', lambda: rfm()[0], filter_params)
+
+    render_customer_lookup(lambda: rfm()[0])
+
+def render_customer_lookup(get_rfm_df):
+    """Render pencarian customer/order: daftar order, RFM score, dan segment customer
+
+    `get_rfm_df` adalah fungsi (lazy) sehingga RFM hanya dihitung saat ada id yang dicari.
+    """
+    st.subheader("🔎 Cari Customer / Order")
+    query = st.text_input(
+        "Customer Unique ID atau Order ID",
+        placeholder="Paste satu atau beberapa id (pisahkan dengan koma, spasi, atau baris baru)",
+        help="Customer dicari di seluruh data; RFM score dan segment mengikuti rentang tanggal terpilih."
+    )
+    ids = [token for token in query.replace(',', ' ').split() if token]
+    if not ids:
+        return
+
+    lookup_index = load_lookup_index_cached()
+    customer_ids, not_found = lookup_index.resolve_ids(ids)
+    if not_found:
+        st.warning(f"ID tidak ditemukan: {', '.join(not_found)}")
+    if not customer_ids:
+        return
+
+    rfm_rows = lookup_rfm(get_rfm_df(), customer_ids)
+    rfm_columns = ['customer_unique_id', 'customer_segment', 'RFM_score', 'recency', 'frequency', 'monetary']
+    st.markdown("**RFM Customer (rentang tanggal terpilih)**")
+    if len(rfm_rows) > 0:
+        st.dataframe(rfm_rows[rfm_columns], hide_index=True, use_container_width=True)
+    else:
+        st.caption("Customer tidak memiliki order pada rentang tanggal terpilih")
+
+    order_columns = ['customer_unique_id', 'order_id', 'order_purchase_timestamp', 'order_status',
+                     'items_per_order', 'order_gmv', 'customer_city', 'customer_state']
+    customer_orders = lookup_index.lookup_customers(customer_ids)
+    st.markdown(f"**Riwayat Order ({len(customer_orders):,} order)**")
+    st.dataframe(customer_orders[[col for col in order_columns if col in customer_orders.columns]],
+                 hide_index=True, use_container_width=True)
+
+# ============================================
+# COHORT RETENTION
+# ============================================
+def render_cohort_retention(start_date, end_date, filter_params):
+    """Render matriks cohort retention berdasarkan bulan pembelian pertama"""
+    st.header("🔁 Cohort Retention Pelanggan")
+
+    @lru_cache(maxsize=None)
+    def cohort_matrices():
+        return analyze_cohort_retention(load_cohort_base_cached(), start_date, end_date)
+
+    def build_summary():
+        customers_df, _, _, retention_df = cohort_matrices()
+        has_cohorts = len(retention_df) > 0
+        return {
+            'has_cohorts': has_cohorts,
+            'insights': generate_cohort_insights(customers_df, retention_df) if has_cohorts else '',
+        }
+
+    summary = cached_artifact('cohort_summary', filter_params, build_summary, kind='json')
+    if not summary['has_cohorts']:
+        st.info("Tidak ada cohort untuk rentang tanggal yang dipilih")
+        return
+
+    metric = st.radio(
+        "Metric Cohort",
+        ["Retention (%)", "Customers", "Orders", "GMV (R$)"],
+        horizontal=True
+    )
+    # metric -> (posisi matriks pada hasil analyze_cohort_retention, judul colorbar, format nilai)
+    matrices = {
+        "Retention (%)": (3, "%", ".1f"),
+        "Customers": (0, "Customers", ",.0f"),
+        "Orders": (1, "Orders", ",.0f"),
+        "GMV (R$)": (2, "R$", ",.0f"),
+    }
+    matrix_position, colorbar_title, value_format = matrices[metric]
+    st.plotly_chart(
+        cached_artifact('cohort_heatmap', {**filter_params, 'metric': metric}, lambda: plot_cohort_heatmap(
+            cohort_matrices()[matrix_position], f"Cohort Matrix: {metric}", colorbar_title, value_format)),
+        use_container_width=True
+    )
+
+    with st.expander("📝 Insight Analisis"):
+        st.markdown(summary['insights'])
+
+# ============================================
+# FORECAST KATEGORI x STATE
+# ============================================
+def render_forecast(start_date, end_date, filter_params):
+    """Render forecast kuartal berikutnya untuk semua series kategori x state customer"""
+    st.header("🔮 Forecast Kuartal Berikutnya: Kategori × State")
+    st.caption("Model trend + musiman di-fit sekaligus untuk semua kombinasi kategori × state customer "
+               "menggunakan bulan-bulan dalam rentang tanggal terpilih; interval prediksi 90%.")
+
+    metric_options = {"GMV (R$)": 'gmv', "Orders": 'orders'}
+    metric_label = st.radio("Metric Forecast", list(metric_options), horizontal=True)
+    metric = metric_options[metric_label]
+    forecast_params = {**filter_params, 'metric': metric}
+
+    @lru_cache(maxsize=None)
+    def forecast():
+        return analyze_forecast(load_series_tensor_cached(), start_date, end_date, metric=metric)
+
+    def build_summary():
+        forecast_df, forecast_start = forecast()
+        if len(forecast_df) == 0:
+            return {'has_forecast': False, 'insights': generate_forecast_insights(forecast_df, forecast_start, metric_label)}
+        top_movers = forecast_df.head(20).round(2)
+        return {
+            'has_forecast': True,
+            'metrics': [
+                ("Series Di-forecast", f"{len(forecast_df):,}"),
+                ("Periode Forecast", f"{forecast_start.strftime('%b %Y')} + 2 bulan"),
+                (f"Total Forecast {metric_label}", f"{forecast_df['forecast'].sum():,.0f}"),
+                ("Perubahan vs 3 Bulan Terakhir", f"{forecast_df['change'].sum():+,.0f}"),
+            ],
+            'top_movers': top_movers.to_dict('records'),
+            'insights': generate_forecast_insights(forecast_df, forecast_start, metric_label),
+        }
+
+    summary = cached_artifact('forecast_summary', forecast_params, build_summary, kind='json')
+    if not summary['has_forecast']:
+        st.info("Rentang tanggal terlalu pendek untuk forecast (minimal 6 bulan)")
+        return
+
+    render_metrics(summary['metrics'])
+    st.plotly_chart(
+        cached_artifact('forecast_movers', forecast_params,
+                        lambda: plot_forecast_movers(forecast()[0], metric_label, top_n=10)),
+        use_container_width=True
+    )
+
+    with st.expander("📋 Tabel Top 20 Movers"):
+        st.dataframe(summary['top_movers'], hide_index=True, use_container_width=True)
 
     with st.expander("📝 Insight Analisis"):
-        st.markdown(generate_rfm_insights(segment_df))
+        st.markdown(summary['insights'])
 
 # ============================================
 # PERTANYAAN 4: GEOSPATIAL ANALYSIS
 # ============================================
-def render_question_4(filtered_orders):
+def render_question_4(filtered_orders, start_date, end_date, filter_params):
     """Render visualisasi dan insight untuk Pertanyaan 4"""
     st.header("🗺️ Pertanyaan 4: Geospatial Analysis")
+    st.caption("Supply dihitung dari seller aktif: seller yang menjual minimal satu item dalam rentang tanggal terpilih.")
 
     try:
-        geolocation_df = load_geolocation_cached()
-        sellers_df = load_sellers_cached()
+        def geospatial():
+            return cached_analysis('geospatial', start_date, end_date)
 
-        customer_by_city, seller_by_city, customer_geo, gap_df, gap_with_sellers, gap_without_sellers, gap_plot = prepare_geospatial_data(
-            filtered_orders, geolocation_df, sellers_df
-        )
+        @lru_cache(maxsize=None)
+        def geo_kpi():
+            customer_by_city, seller_by_city, _, gap_df, gap_with_sellers, gap_without_sellers, _ = geospatial()
+            return summarize_geospatial(customer_by_city, seller_by_city, gap_df, gap_with_sellers, gap_without_sellers)
 
-        top_cities = customer_by_city.nlargest(10, 'order_count')
-        top_sellers = seller_by_city.nlargest(10, 'seller_count')
+        def build_summary():
+            kpi = geo_kpi()
+            return {
+                'metrics': [
+                    ("Kota dengan Seller", f"{kpi.cities_with_sellers:,}"),
+                    ("Kota Tanpa Seller", f"{kpi.cities_without_sellers:,}"),
+                    ("Rata-rata Gap", f"{kpi.avg_gap:.2f} orders/seller"),
+                    (f"Kota Gap Tinggi (>{GAP_HIGH_THRESHOLD})", f"{kpi.high_gap_cities:,}"),
+                ],
+                'has_no_seller_cities': kpi.cities_without_sellers > 0,
+                'statistics': [
+                    f"**Total {kpi.cities_with_sellers} kota dengan seller dianalisis**",
+                    f"**{kpi.cities_without_sellers} kota tanpa seller (peluang ekspansi)**",
+                ] + ([
+                    f"**Rata-rata gap: {kpi.avg_gap:.2f} orders/seller**",
+                    f"**{kpi.high_gap_cities} kota dengan gap tinggi (>{GAP_HIGH_THRESHOLD})**",
+                    f"**{kpi.very_high_gap_cities} kota dengan gap sangat tinggi (>{GAP_VERY_HIGH_THRESHOLD})**",
+                ] if kpi.cities_with_sellers > 0 else []),
+                'insights': generate_geospatial_insights(kpi),
+            }
+
+        summary = cached_artifact('q4_summary', filter_params, build_summary, kind='json')
 
         col1, col2 = st.columns(2)
         with col1:
             st.plotly_chart(
-                plot_top_categories_bar(top_cities, 'order_count', 'customer_city',
-                                       "Top 10 Kota Customer berdasarkan Order Count", "Jumlah Order", '#72BCD4'),
+                cached_artifact('q4_top_customer_cities', filter_params, lambda: plot_top_categories_bar(
+                    geo_kpi().top_cities, 'order_count', 'customer_city',
+                    "Top 10 Kota Customer berdasarkan Order Count", "Jumlah Order", '#72BCD4')),
                 use_container_width=True
             )
         with col2:
             st.plotly_chart(
-                plot_top_categories_bar(top_sellers, 'seller_count', 'seller_city',
-                                       "Top 10 Kota Seller berdasarkan Jumlah Seller", "Jumlah Seller", '#4C9A2A'),
+                cached_artifact('q4_top_seller_cities', filter_params, lambda: plot_top_categories_bar(
+                    geo_kpi().top_seller_cities, 'seller_count', 'seller_city',
+                    "Top 10 Kota Seller berdasarkan Jumlah Seller Aktif", "Jumlah Seller Aktif", '#4C9A2A')),
                 use_container_width=True
             )
 
         st.subheader("🗺️ Peta Kepadatan Customer Transactions")
-        brazil_map = create_customer_heatmap(customer_geo, customer_by_city)
-        st_folium(brazil_map, width=1200, height=500)
+        render_map(cached_artifact('q4_customer_map', filter_params, lambda: create_customer_heatmap(
+            geospatial()[2], geospatial()[0]), kind='html'))
 
         st.subheader("🗺️ Peta Kepadatan Seller Locations")
-        seller_map = create_seller_heatmap(seller_by_city)
-        st_folium(seller_map, width=1200, height=500)
+        render_map(cached_artifact('q4_seller_map', filter_params, lambda: create_seller_heatmap(geospatial()[1]), kind='html'))
 
         st.subheader("📊 Analisis Gap Supply-Demand")
 
         # Metrics summary
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Kota dengan Seller", f"{len(gap_with_sellers):,}")
-        with col2:
-            st.metric("Kota Tanpa Seller", f"{len(gap_without_sellers):,}")
-        with col3:
-            avg_gap = gap_with_sellers['orders_per_seller'].mean() if len(gap_with_sellers) > 0 else 0
-            st.metric("Rata-rata Gap", f"{avg_gap:.2f} orders/seller")
-        with col4:
-            high_gap_count = len(gap_with_sellers[gap_with_sellers['orders_per_seller'] > 50]) if len(gap_with_sellers) > 0 else 0
-            st.metric("Kota Gap Tinggi (>50)", f"{high_gap_count:,}")
+        render_metrics(summary['metrics'])
 
         # Top 20 Kota dengan Gap Tertinggi
         st.plotly_chart(
-            plot_gap_top_cities(gap_with_sellers, top_n=20),
+            cached_artifact('q4_gap_top_cities', filter_params, lambda: plot_gap_top_cities(geospatial()[4], top_n=20)),
             use_container_width=True
         )
 
         # Top 10 Kota Tanpa Seller
-        if len(gap_without_sellers) > 0:
+        if summary['has_no_seller_cities']:
             st.plotly_chart(
-                plot_gap_no_seller_cities(gap_without_sellers, top_n=10),
+                cached_artifact('q4_gap_no_seller_cities', filter_params,
+                                lambda: plot_gap_no_seller_cities(geospatial()[5], top_n=10)),
                 use_container_width=True
             )
 
@@ -279,55 +899,284 @@ def render_question_4(filtered_orders):
         col1, col2 = st.columns(2)
         with col1:
             st.plotly_chart(
-                plot_gap_comparison(gap_with_sellers, top_n=10),
+                cached_artifact('q4_gap_comparison', filter_params, lambda: plot_gap_comparison(geospatial()[4], top_n=10)),
                 use_container_width=True
             )
         with col2:
             st.plotly_chart(
-                plot_gap_categories_distribution(gap_plot),
+                cached_artifact('q4_gap_categories', filter_params, lambda: plot_gap_categories_distribution(geospatial()[6])),
                 use_container_width=True
             )
 
         # Ringkasan statistik
         with st.expander("📊 Ringkasan Statistik Gap Supply-Demand"):
-            st.write(f"**Total {len(gap_with_sellers)} kota dengan seller dianalisis**")
-            st.write(f"**{len(gap_without_sellers)} kota tanpa seller (peluang ekspansi)**")
-            if len(gap_with_sellers) > 0:
-                st.write(f"**Rata-rata gap: {gap_with_sellers['orders_per_seller'].mean():.2f} orders/seller**")
-                st.write(f"**{len(gap_with_sellers[gap_with_sellers['orders_per_seller'] > 50])} kota dengan gap tinggi (>50)**")
-                st.write(f"**{len(gap_with_sellers[gap_with_sellers['orders_per_seller'] > 100])} kota dengan gap sangat tinggi (>100)**")
+            for line in summary['statistics']:
+                st.write(line)
 
         with st.expander("📝 Insight Analisis"):
-            top_gap = gap_df.nlargest(10, 'gap_ratio')
-            st.markdown(generate_geospatial_insights(top_cities, top_sellers, top_gap))
+            st.markdown(summary['insights'])
+
+        col1, col2 = st.columns(2)
+        with col1:
+            render_download("Download Gap Kota dengan Seller", 'gap_with_sellers', lambda: geospatial()[4], filter_params)
+        with col2:
+            render_download("Download Gap Kota Tanpa Seller", 'gap_without_sellers', lambda: geospatial()[5], filter_params)
+
+        render_seller_coverage(filtered_orders, filter_params)
 
     except Exception as e:
         st.error(f"❌ Error memuat data geolocation: {str(e)}")
         st.info("Pastikan file geolocation_dataset.csv tersedia di folder data/")
 
+def render_seller_coverage(filtered_orders, filter_params):
+    """Render analisis cakupan seller berbasis radius (spatial index)"""
+    st.subheader("📡 Cakupan Seller dalam Radius")
+    st.caption("Supply dihitung dari seller yang berada dalam radius tertentu dari kota customer, "
+               "sehingga seller di kota tetangga (lintas batas kota) ikut terhitung.")
+
+    radius_km = st.slider("Radius (km)", min_value=10, max_value=300, value=50, step=10)
+    coverage_params = {**filter_params, 'radius_km': radius_km}
+
+    @lru_cache(maxsize=None)
+    def coverage():
+        seller_index, zip_centroids = load_seller_index_cached()
+        coverage_df = analyze_seller_coverage(filtered_orders, seller_index, zip_centroids, radius_km=radius_km)
+        return coverage_df, coverage_df[coverage_df['nearest_seller_km'].notna()]
+
+    def build_summary():
+        coverage_df, located = coverage()
+        has_located = len(located) > 0
+        return {
+            'metrics': [
+                (f"Kota Tanpa Seller ≤ {radius_km} km", f"{(located['sellers_within_radius'] == 0).sum():,}"),
+                ("Median Jarak Seller Terdekat", f"{located['nearest_seller_km'].median():,.1f} km" if has_located else "-"),
+                ("Median Orders/Seller (radius)", f"{located['orders_per_seller_within_radius'].median():,.2f}" if has_located else "-"),
+            ],
+            'insights': generate_coverage_insights(coverage_df, radius_km),
+        }
+
+    summary = cached_artifact('coverage_summary', coverage_params, build_summary, kind='json')
+    render_metrics(summary['metrics'])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(
+            cached_artifact('coverage_top_cities', coverage_params,
+                            lambda: plot_coverage_top_cities(coverage()[1], radius_km, top_n=15)),
+            use_container_width=True
+        )
+    with col2:
+        st.plotly_chart(
+            cached_artifact('coverage_nearest_seller', coverage_params,
+                            lambda: plot_nearest_seller_distance(coverage()[1], radius_km, top_n=10)),
+            use_container_width=True
+        )
+
+    with st.expander("📝 Insight Cakupan Seller"):
+        st.markdown(summary['insights'])
+
+# ============================================
+# PERFORMA SELLER
+# ============================================
+def render_seller_leaderboard(start_date, end_date, filter_params):
+    """Render leaderboard top/bottom seller dan drill-down per seller"""
+    st.header("🏪 Performa Seller")
+    st.caption("Seller dengan minimal 5 order dalam rentang tanggal terpilih diranking berdasarkan metric yang dipilih.")
+
+    metric_options = {"GMV (R$)": 'gmv', "Orders": 'orders', "Items": 'items',
+                      "Freight Ratio": 'freight_ratio', "Hari Aktif": 'active_days'}
+    metric_label = st.radio("Ranking Seller Berdasarkan", list(metric_options), horizontal=True)
+    metric = metric_options[metric_label]
+    leaderboard_params = {**filter_params, 'metric': metric}
+    x_title = "Freight Ratio (%)" if metric == 'freight_ratio' else metric_label
+
+    @lru_cache(maxsize=None)
+    def leaderboard():
+        return analyze_seller_leaderboard(load_seller_day_base_cached(), start_date, end_date, metric=metric, k=10)
+
+    def build_summary():
+        top_df, bottom_df, n_ranked = leaderboard()
+        return {
+            'n_ranked': n_ranked,
+            'drilldown_options': [(f"#{rank} {seller_id[:8]} ({city})", seller_id) for rank, seller_id, city in zip(
+                top_df['rank'], top_df['seller_id'], top_df['seller_city'])],
+            'insights': generate_seller_insights(top_df, bottom_df, n_ranked, metric_label),
+        }
+
+    summary = cached_artifact('seller_leaderboard_summary', leaderboard_params, build_summary, kind='json')
+    if summary['n_ranked'] == 0:
+        st.info("Tidak ada seller dengan order yang cukup pada rentang tanggal yang dipilih")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(
+            cached_artifact('seller_top', leaderboard_params, lambda: plot_seller_leaderboard(
+                leaderboard()[0], metric, f'Top 10 Seller berdasarkan {metric_label}', x_title, color='#4C9A2A')),
+            use_container_width=True
+        )
+    with col2:
+        st.plotly_chart(
+            cached_artifact('seller_bottom', leaderboard_params, lambda: plot_seller_leaderboard(
+                leaderboard()[1], metric, f'Bottom 10 Seller berdasarkan {metric_label}', x_title, color='#FF6B6B')),
+            use_container_width=True
+        )
+
+    with st.expander("📝 Insight Performa Seller"):
+        st.markdown(summary['insights'])
+
+    # Drill-down: tren harian satu seller dari leaderboard atau seller_id yang diketik
+    options = dict(summary['drilldown_options'])
+    selected = st.selectbox("Drill-down Seller", list(options))
+    typed_id = st.text_input("Atau masukkan Seller ID", placeholder="seller_id lengkap").strip()
+    seller_id = typed_id or options[selected]
+
+    trend_df = analyze_seller_drilldown(load_seller_day_base_cached(), seller_id, start_date, end_date)
+    if len(trend_df) == 0:
+        st.warning(f"Seller {seller_id} tidak memiliki order pada rentang tanggal terpilih")
+        return
+
+    render_metrics([
+        ("GMV Seller", f"R$ {trend_df['gmv'].sum():,.2f}"),
+        ("Orders", f"{trend_df['orders'].sum():,}"),
+        ("Hari Aktif", f"{len(trend_df):,}"),
+        ("Rata-rata Orders/Hari Aktif", f"{trend_df['orders'].mean():,.2f}"),
+    ])
+
+    def build_trend_chart():
+        fig = plot_monthly_trends(trend_df, granularity='day')
+        fig.update_layout(title=f"Tren Harian Seller {seller_id[:8]}: Orders & GMV")
+        return fig
+
+    st.plotly_chart(
+        cached_artifact('seller_drilldown', {**filter_params, 'seller_id': seller_id}, build_trend_chart),
+        use_container_width=True
+    )
+
+def render_delivery_performance(start_date, end_date, filter_params):
+    """Render distribusi lead time pengiriman dan rasio keterlambatan per state customer / kategori"""
+    st.header("⏱️ Performa Pengiriman (Lead Time)")
+    if 'delivery_days' not in orders_df.columns:
+        st.info("Timestamp tahapan order (approval, kurir, diterima, estimasi) tidak tersedia pada dataset ini")
+        return
+    st.caption("Lead time dan rasio terlambat dihitung dari order yang sudah diterima customer; "
+               "persentil dihitung dari histogram per hari (resolusi 1 jam untuk approval, 6 jam untuk tahap lain).")
+
+    @lru_cache(maxsize=None)
+    def delivery_stats():
+        return analyze_delivery(load_delivery_base_cached(), start_date, end_date)
+
+    @lru_cache(maxsize=None)
+    def ranking(level):
+        return delivery_group_ranking(delivery_stats(), level)
+
+    def build_summary():
+        kpi = summarize_delivery(delivery_stats(), ranking('state'), ranking('category'))
+        return {
+            'delivered_orders': kpi.delivered_orders,
+            'metrics': [
+                ("Order Terkirim", f"{kpi.delivered_orders:,}"),
+                ("Median Lead Time", f"{kpi.median_days:.1f} hari"),
+                ("P90 Lead Time", f"{kpi.p90_days:.1f} hari"),
+                ("Order Terlambat", f"{kpi.late_rate:.1%}"),
+            ],
+            'insights': generate_delivery_insights(kpi),
+        }
+
+    summary = cached_artifact('delivery_summary', filter_params, build_summary, kind='json')
+    if summary['delivered_orders'] == 0:
+        st.info("Tidak ada order terkirim pada rentang tanggal yang dipilih")
+        return
+    render_metrics(summary['metrics'])
+
+    metric_options = {"Total (Beli → Diterima)": 'delivery_days', "Approval": 'approval_days',
+                      "Approval → Kurir": 'carrier_days', "Kurir → Customer": 'customer_days',
+                      "Selisih vs Estimasi": 'delivery_delay_days'}
+    group_options = {"State Customer": 'state', "Kategori": 'category'}
+    col1, col2 = st.columns(2)
+    with col1:
+        metric_label = st.radio("Distribusi Lead Time", list(metric_options), horizontal=True)
+        metric = metric_options[metric_label]
+
+        def build_distribution_chart():
+            total = delivery_stats().iloc[0]
+            return plot_delivery_distribution(
+                delivery_distribution(load_delivery_base_cached(), start_date, end_date, metric),
+                f"Distribusi Lead Time: {metric_label}", "Hari",
+                percentiles=[("Median", total[f'{metric}_p50']), ("P90", total[f'{metric}_p90'])]
+            )
+
+        st.plotly_chart(
+            cached_artifact('delivery_distribution', {**filter_params, 'metric': metric}, build_distribution_chart),
+            use_container_width=True
+        )
+    with col2:
+        group_label = st.radio("Rasio Terlambat per", list(group_options), horizontal=True)
+        level = group_options[group_label]
+        st.plotly_chart(
+            cached_artifact('delivery_late_rate', {**filter_params, 'level': level}, lambda: plot_delivery_late_rate(
+                ranking(level), f"Top 15 {group_label} dengan Order Terlambat Tertinggi (min. {MIN_GROUP_ORDERS} order)",
+                group_label)),
+            use_container_width=True
+        )
+
+    with st.expander("📝 Insight Performa Pengiriman"):
+        st.markdown(summary['insights'])
+
+    with st.expander("📋 Statistik Lead Time per State & Kategori"):
+        stats_df = delivery_stats()
+        st.dataframe(stats_df[stats_df['orders'] > 0], hide_index=True, use_container_width=True)
+
 # ============================================
 # MAIN DASHBOARD
 # ============================================
-def main():
-    """Main function untuk menjalankan dashboard"""
-    filtered_orders, _, _ = render_sidebar(orders_df)
+def render_page():
+    """Render seluruh halaman, kembalikan rentang tanggal terpilih"""
+    filtered_orders, start_date, end_date = render_sidebar(orders_df)
+    # State filter yang menjadi bagian dari key cache figure
+    filter_params = {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()}
 
     st.title("📈 Dashboard Analisis E-Commerce Public Dataset (Brazilian E-Commerce Public Dataset by Olist)")
     st.markdown("Visualization & Explanatory Analysis untuk 4 Pertanyaan Bisnis")
     st.markdown("---")
 
-    render_question_1(filtered_orders)
+    render_question_1(filtered_orders, start_date, end_date, filter_params)
+    render_purchase_pattern(start_date, end_date, filter_params)
+    st.markdown("---")
+
+    render_question_2(start_date, end_date, filter_params)
+    render_category_pairs(start_date, end_date, filter_params)
+    st.markdown("---")
+
+    render_question_3(start_date, end_date, filter_params)
+    st.markdown("---")
+
+    render_cohort_retention(start_date, end_date, filter_params)
     st.markdown("---")
 
-    render_question_2(filtered_orders, order_items_df)
+    render_forecast(start_date, end_date, filter_params)
     st.markdown("---")
 
-    render_question_3(filtered_orders)
+    render_question_4(filtered_orders, start_date, end_date, filter_params)
     st.markdown("---")
 
-    render_question_4(filtered_orders)
+    render_delivery_performance(start_date, end_date, filter_params)
     st.markdown("---")
 
+    render_seller_leaderboard(start_date, end_date, filter_params)
+    st.markdown("---")
+
+    render_dataset_memory()
+    return start_date, end_date
+
+
+def main():
+    """Main function untuk menjalankan dashboard"""
+    # Precompute spekulatif di background ditahan selama rerun ini berjalan
+    with get_speculative_precomputer().foreground():
+        start_date, end_date = render_page()
+    schedule_speculative(start_date, end_date)
+
 
 # Jalankan dashboard
 main()
@@ -0,0 +1,173 @@
+"""Registry dataset in-memory: beberapa snapshot dataset dimuat lazy dengan batas memori total
+
+Setiap dataset (lihat `utils.discover_datasets`) punya entry berisi objek-objek yang sudah
+dimuat untuk dataset tersebut: DataFrame hasil snapshot (orders, order items, ...) maupun
+struktur turunan (cohort base, index, tensor). Ukuran resident setiap objek dihitung saat
+dimasukkan. Jika total melebihi budget, dataset yang paling lama tidak dipakai dikeluarkan
+seluruhnya (semua objeknya), kecuali dataset yang sedang diminta. File sumber yang diganti di
+tempat terdeteksi lewat versi dataset, sehingga salinan lama di-build ulang dan dilepas.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils import get_dataset, get_dataset_version
+
+# Budget default; bisa diubah lewat environment variable DASHBOARD_MEMORY_BUDGET_MB
+DATASET_MEMORY_BUDGET_BYTES = int(os.environ.get('DASHBOARD_MEMORY_BUDGET_MB', 4096)) * 1024 ** 2
+# Interval (detik) cek ulang fingerprint file sumber; bisa diubah lewat DASHBOARD_VERSION_CHECK_S
+VERSION_CHECK_INTERVAL_S = float(os.environ.get('DASHBOARD_VERSION_CHECK_S', 5))
+
+
+def resident_bytes(obj, _seen=None):
+    """Perkiraan ukuran memori objek: DataFrame/Series (deep), array numpy, dan isi container/atribut"""
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(resident_bytes(value, _seen) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(resident_bytes(value, _seen) for value in obj)
+    if hasattr(obj, '__dict__'):
+        return resident_bytes(vars(obj), _seen)
+    return 0
+
+
+class DatasetRegistry:
+    """Objek per versi dataset dengan eviction LRU (per dataset) di bawah `memory_budget_bytes`
+
+    Entry di-key dengan (nama dataset, versi) (lihat `utils.get_dataset_version`); versi dicek
+    ulang paling sering setiap `version_check_interval_s` detik. Jika file sumber diganti, versi
+    baru dimuat ulang saat diminta dan entry versi lama langsung dikeluarkan. Listener eviction
+    (`add_eviction_listener`) dipanggil dengan (nama dataset, versi) setiap kali entry dikeluarkan,
+    agar cache turunan (hasil analisis, antrian precompute) ikut melepas referensinya.
+    """
+
+    def __init__(self, memory_budget_bytes=DATASET_MEMORY_BUDGET_BYTES,
+                 version_check_interval_s=VERSION_CHECK_INTERVAL_S):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.version_check_interval_s = version_check_interval_s
+        # (nama dataset, versi) -> {key: (objek, bytes)}, urutan = urutan terakhir dipakai
+        self._entries = OrderedDict()
+        # nama dataset -> (versi, waktu cek terakhir)
+        self._versions = {}
+        self._lock = threading.Lock()
+        # Satu lock per (dataset, versi, key): build yang sama tidak dijalankan paralel oleh beberapa session
+        self._build_locks = {}
+        self._listeners = []
+        self.evictions = 0
+
+    def add_eviction_listener(self, callback):
+        """Daftarkan `callback(dataset_name, version)` yang dipanggil setelah entry dikeluarkan"""
+        self._listeners.append(callback)
+
+    def dataset_version(self, dataset_name):
+        """Versi dataset saat ini; file sumber di-stat ulang jika cek terakhir lebih lama dari interval"""
+        now = time.monotonic()
+        with self._lock:
+            known = self._versions.get(dataset_name)
+        if known is not None and now - known[1] < self.version_check_interval_s:
+            return known[0]
+
+        version = get_dataset_version(get_dataset(dataset_name))
+        with self._lock:
+            self._versions[dataset_name] = (version, now)
+            # Versi lama tidak akan diminta lagi: lepas memorinya sekarang, tidak menunggu LRU
+            evicted = [entry_key for entry_key in self._entries
+                       if entry_key[0] == dataset_name and entry_key[1] != version]
+            for entry_key in evicted:
+                del self._entries[entry_key]
+                self.evictions += 1
+        self._notify(evicted)
+        return version
+
+    def get(self, dataset_name, key, builder):
+        """Objek `key` milik versi terbaru dataset; `builder(dataset)` dijalankan sekali per versi"""
+        entry_key = (dataset_name, self.dataset_version(dataset_name))
+        cached = self._lookup(entry_key, key)
+        if cached is not None:
+            return cached[0]
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(entry_key + (key,), threading.Lock())
+        with build_lock:
+            cached = self._lookup(entry_key, key)
+            if cached is not None:
+                return cached[0]
+            obj = builder(get_dataset(dataset_name))
+            self._put(entry_key, key, obj, resident_bytes(obj))
+            return obj
+
+    def _lookup(self, entry_key, key):
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None or key not in entry:
+                return None
+            self._entries.move_to_end(entry_key)
+            return entry[key]
+
+    def _put(self, entry_key, key, obj, size):
+        with self._lock:
+            known = self._versions.get(entry_key[0])
+            if known is not None and known[0] != entry_key[1]:
+                # File sumber diganti selama build: hasil versi lama dipakai pemanggil tapi tidak disimpan
+                return
+            self._entries.setdefault(entry_key, {})[key] = (obj, size)
+            self._entries.move_to_end(entry_key)
+            evicted = self._evict(keep=entry_key)
+        self._notify(evicted)
+
+    def _evict(self, keep):
+        # Dipanggil dengan self._lock dipegang; kembalikan entry key yang dikeluarkan
+        evicted = []
+        while self._total_bytes() > self.memory_budget_bytes:
+            victim = next((entry_key for entry_key in self._entries if entry_key != keep), None)
+            if victim is None:
+                break
+            del self._entries[victim]
+            self.evictions += 1
+            evicted.append(victim)
+        return evicted
+
+    def _notify(self, evicted):
+        # Dipanggil tanpa lock: listener boleh mengakses cache lain
+        for dataset_name, version in evicted:
+            for callback in self._listeners:
+                callback(dataset_name, version)
+
+    def _total_bytes(self):
+        return sum(size for entry in self._entries.values() for _, size in entry.values())
+
+    def evict(self, dataset_name):
+        """Keluarkan semua objek dataset (semua versi) dari memori"""
+        with self._lock:
+            evicted = [entry_key for entry_key in self._entries if entry_key[0] == dataset_name]
+            for entry_key in evicted:
+                del self._entries[entry_key]
+            self._versions.pop(dataset_name, None)
+        self._notify(evicted)
+
+    def stats(self):
+        """Ringkasan: dataset yang dimuat (urutan LRU -> MRU) dan ukuran per dataset dalam bytes"""
+        with self._lock:
+            loaded = {}
+            for (name, _), entry in self._entries.items():
+                loaded[name] = loaded.pop(name, 0) + sum(size for _, size in entry.values())
+            return {
+                'loaded': loaded,
+                'resident_bytes': sum(loaded.values()),
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,188 @@
+"""Performa pengiriman: distribusi lead time dan rasio keterlambatan per state customer dan kategori
+
+Lead time per order (lihat `enrichment.add_delivery_lead_times`) dipadatkan sekali menjadi
+histogram bin tetap per hari pembelian: untuk setiap metric, matriks sparse (hari, kelompok x bin)
+dengan kelompok = semua order, setiap `customer_state`, dan setiap kategori produk (order dihitung
+sekali per kategori yang ada di order tersebut). Statistik untuk rentang tanggal mana pun
+(persentil, rata-rata, rasio terlambat) dihitung dari histogram gabungan baris hari dalam rentang,
+tanpa mengurutkan lead time setiap order. Persentil diambil dari bin yang memuat rank persentil
+(interpolasi linear di dalam bin), sehingga selisihnya terhadap lead time order pada rank tersebut
+maksimal satu lebar bin; rata-rata dan rasio terlambat eksak.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from seller_performance import _day_code, _window_days
+
+# metric -> (batas bawah, batas atas, lebar bin) dalam hari; nilai di luar rentang masuk bin pertama/terakhir
+DELIVERY_METRICS = {
+    'approval_days': (0.0, 15.0, 1 / 24),
+    'carrier_days': (-5.0, 60.0, 0.25),
+    'customer_days': (-5.0, 90.0, 0.25),
+    'delivery_days': (0.0, 120.0, 0.25),
+    'delivery_delay_days': (-60.0, 60.0, 0.25),
+}
+DELIVERY_PERCENTILES = [0.5, 0.9]
+# Kelompok dengan order terkirim lebih sedikit dari ini tidak ditampilkan di ranking keterlambatan
+MIN_GROUP_ORDERS = 30
+TOTAL_GROUP = ('total', 'Semua')
+
+
+def metric_bins(metric):
+    """(batas bawah, lebar bin, jumlah bin) untuk `metric`"""
+    lo, hi, width = DELIVERY_METRICS[metric]
+    return lo, width, int(round((hi - lo) / width))
+
+
+class DeliveryBase:
+    """Histogram lead time per hari pembelian (baris, terurut) x (kelompok, bin) per metric
+
+    - `groups`: list (level, nama) dengan level 'total', 'state', atau 'category'
+    - `histograms[metric]`: csr_matrix (hari, kelompok * jumlah bin), berisi jumlah order
+    - `sums[metric]`: array (hari, kelompok) jumlah nilai metric (untuk rata-rata eksak)
+    - `late` / `delivered`: array (hari, kelompok) order terlambat / order dengan delay diketahui
+    """
+
+    def __init__(self, days, groups, histograms, sums, late, delivered):
+        self.days = days
+        self.groups = groups
+        self.histograms = histograms
+        self.sums = sums
+        self.late = late
+        self.delivered = delivered
+
+    def __len__(self):
+        return len(self.days)
+
+
+def build_delivery_base(orders_df, order_items_df):
+    """Bangun DeliveryBase dari orders dan order items (sekali per dataset)"""
+    orders = orders_df.drop_duplicates('order_id')
+    orders = orders[orders['order_purchase_timestamp'].notna()]
+    if 'delivery_days' not in orders.columns:
+        from enrichment import add_delivery_lead_times
+
+        orders = add_delivery_lead_times(orders)
+
+    days, day_index = np.unique(_day_code(pd.DatetimeIndex(orders['order_purchase_timestamp'])), return_inverse=True)
+    n_orders = len(orders)
+
+    # Keanggotaan (order, kelompok): semua order, state customer, dan kategori unik per order
+    state_codes, states = pd.factorize(orders['customer_state'].astype(str), sort=True)
+    order_position = pd.Series(np.arange(n_orders), index=orders['order_id'].to_numpy())
+    items = order_items_df[['order_id', 'product_category_en']].dropna().drop_duplicates()
+    item_order = items['order_id'].map(order_position)
+    items = items[item_order.notna().to_numpy()]
+    item_order = item_order.dropna().to_numpy(dtype=np.int64)
+    category_codes, categories = pd.factorize(items['product_category_en'], sort=True)
+
+    groups = [TOTAL_GROUP] + [('state', state) for state in states] + [('category', cat) for cat in categories]
+    member_order = np.concatenate([np.arange(n_orders), np.arange(n_orders), item_order])
+    member_group = np.concatenate([
+        np.zeros(n_orders, dtype=np.int64), 1 + state_codes, 1 + len(states) + category_codes
+    ])
+    n_days, n_groups = len(days), len(groups)
+    member_day = day_index[member_order]
+    cell = member_day * n_groups + member_group
+
+    def per_day_group(weights=None):
+        counts = np.bincount(cell, weights=weights, minlength=n_days * n_groups)
+        return counts.reshape(n_days, n_groups)
+
+    histograms, sums = {}, {}
+    for metric in DELIVERY_METRICS:
+        lo, width, n_bins = metric_bins(metric)
+        values = orders[metric].to_numpy(dtype=np.float64)[member_order]
+        valid = ~np.isnan(values)
+        bins = np.clip(np.floor((values[valid] - lo) / width), 0, n_bins - 1).astype(np.int64)
+        histograms[metric] = sparse.csr_matrix(
+            (np.ones(len(bins), dtype=np.int32), (member_day[valid], member_group[valid] * n_bins + bins)),
+            shape=(n_days, n_groups * n_bins)
+        )
+        sums[metric] = per_day_group(np.where(valid, values, 0.0))
+
+    delay_known = ~np.isnan(orders['delivery_delay_days'].to_numpy(dtype=np.float64))[member_order]
+    late = per_day_group(orders['is_late'].to_numpy(dtype=np.float64)[member_order]).astype(np.int32)
+    delivered = per_day_group(delay_known.astype(np.float64)).astype(np.int32)
+    return DeliveryBase(days, groups, histograms, sums, late, delivered)
+
+
+def _day_slice(delivery_base, start_date, end_date):
+    # Bulan masuk rentang jika tanggal awal bulannya berada di antara start_date dan end_date
+    # (sama dengan filter `order_date` di sidebar)
+    first_day, last_day = _window_days(start_date, end_date)
+    lo = np.searchsorted(delivery_base.days, first_day, side='left')
+    hi = max(lo, np.searchsorted(delivery_base.days, last_day, side='right'))
+    return slice(lo, hi)
+
+
+def merged_histogram(delivery_base, metric, start_date, end_date):
+    """Histogram gabungan (kelompok x bin) `metric` untuk rentang tanggal"""
+    _, _, n_bins = metric_bins(metric)
+    rows = delivery_base.histograms[metric][_day_slice(delivery_base, start_date, end_date)]
+    return np.asarray(rows.sum(axis=0), dtype=np.int64).reshape(len(delivery_base.groups), n_bins)
+
+
+def histogram_percentiles(counts, lo, width, q):
+    """Persentil `q` (0-1) per baris histogram `counts` (kelompok x bin), interpolasi linear dalam bin
+
+    NaN untuk kelompok tanpa data.
+    """
+    total = counts.sum(axis=1)
+    cumulative = np.cumsum(counts, axis=1)
+    target = q * total
+    # Bin pertama dengan jumlah kumulatif >= target
+    index = np.minimum((cumulative < target[:, None]).sum(axis=1), counts.shape[1] - 1)
+    rows = np.arange(len(counts))
+    before = np.where(index > 0, cumulative[rows, np.maximum(index - 1, 0)], 0)
+    within = counts[rows, index]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = np.where(within > 0, (target - before) / within, 0.0)
+        return np.where(total > 0, lo + (index + fraction) * width, np.nan)
+
+
+def analyze_delivery(delivery_base, start_date, end_date):
+    """Statistik pengiriman per kelompok (semua order, state customer, kategori) dalam rentang terpilih
+
+    Kolom: level, group, orders (order terkirim), late_orders, late_rate, lalu untuk setiap metric
+    di DELIVERY_METRICS: `<metric>_mean`, `<metric>_p50`, `<metric>_p90`.
+    """
+    window = _day_slice(delivery_base, start_date, end_date)
+    levels, names = zip(*delivery_base.groups)
+    delivered = delivery_base.delivered[window].sum(axis=0)
+    late = delivery_base.late[window].sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stats = {
+            'level': list(levels),
+            'group': list(names),
+            'orders': delivered,
+            'late_orders': late,
+            'late_rate': np.where(delivered > 0, late / delivered, np.nan),
+        }
+        for metric in DELIVERY_METRICS:
+            lo, width, _ = metric_bins(metric)
+            counts = merged_histogram(delivery_base, metric, start_date, end_date)
+            n_values = counts.sum(axis=1)
+            stats[f'{metric}_mean'] = np.where(
+                n_values > 0, delivery_base.sums[metric][window].sum(axis=0) / n_values, np.nan)
+            for q in DELIVERY_PERCENTILES:
+                stats[f'{metric}_p{int(q * 100)}'] = histogram_percentiles(counts, lo, width, q)
+    return pd.DataFrame(stats)
+
+
+def delivery_distribution(delivery_base, start_date, end_date, metric='delivery_days', group=TOTAL_GROUP):
+    """Distribusi `metric` satu kelompok: DataFrame (days = batas bawah bin, orders), bin kosong di ujung dibuang"""
+    lo, width, n_bins = metric_bins(metric)
+    counts = merged_histogram(delivery_base, metric, start_date, end_date)[delivery_base.groups.index(group)]
+    nonzero = np.flatnonzero(counts)
+    if len(nonzero) == 0:
+        return pd.DataFrame({'days': pd.Series(dtype=np.float64), 'orders': pd.Series(dtype=np.int64)})
+    window = slice(nonzero[0], nonzero[-1] + 1)
+    return pd.DataFrame({'days': lo + np.arange(n_bins)[window] * width, 'orders': counts[window]})
+
+
+def delivery_group_ranking(delivery_stats, level, min_orders=MIN_GROUP_ORDERS, top_n=15):
+    """Kelompok `level` dengan rasio keterlambatan tertinggi (minimal `min_orders` order terkirim)"""
+    groups = delivery_stats[(delivery_stats['level'] == level) & (delivery_stats['orders'] >= min_orders)]
+    return groups.sort_values(['late_rate', 'orders'], ascending=[False, False]).head(top_n)
@@ -0,0 +1,103 @@
+"""Objek turunan per dataset (index dan pre-aggregate) yang disimpan sebagai snapshot di disk
+
+Warm-up (warmup.py) dan dashboard membaca objek yang sama lewat `load_derived`, sehingga
+index yang di-build saat warm-up dipakai ulang oleh proses Streamlit (dan sebaliknya).
+Snapshot di-build ulang jika salah satu file sumber dataset berubah (lihat `utils.load_snapshot`).
+"""
+import os
+
+from utils import load_snapshot
+
+
+def _seller_index(data):
+    from spatial import build_seller_spatial_index
+
+    return build_seller_spatial_index(data['sellers_df'], data['zip_centroids'])
+
+
+def _cohort_base(data):
+    from cohort import build_cohort_base
+
+    return build_cohort_base(data['orders_df'])
+
+
+def _lookup_index(data):
+    from lookup import OrderLookupIndex
+
+    return OrderLookupIndex(data['orders_df'])
+
+
+def _series_tensor(data):
+    from forecast import build_series_tensor
+
+    return build_series_tensor(data['order_items_df'], data['orders_df'])
+
+
+def _basket_base(data):
+    from basket import build_basket_base
+
+    return build_basket_base(data['order_items_df'], data['orders_df'])
+
+
+def _purchase_pattern_base(data):
+    from purchase_pattern import build_purchase_pattern_base
+
+    return build_purchase_pattern_base(data['orders_df'])
+
+
+def _daily_anomalies(data):
+    from anomaly import build_daily_series, detect_anomalies
+
+    return detect_anomalies(build_daily_series(data['orders_df'], data['order_items_df']))
+
+
+def _delivery_base(data):
+    from delivery import build_delivery_base
+
+    return build_delivery_base(data['orders_df'], data['order_items_df'])
+
+
+def _seller_day_base(data):
+    from seller_performance import build_seller_day_base
+
+    return build_seller_day_base(data['order_items_df'], data['orders_df'], data['sellers_df'])
+
+
+def _daily_anomalies_version():
+    # Hasil deteksi bergantung pada parameter modul anomaly: ganti parameter = build ulang
+    from anomaly import ANOMALY_THRESHOLD, ANOMALY_WINDOW_WEEKS, ANOMALY_MIN_HISTORY, ANOMALY_MIN_ORDERS
+
+    return 1, ANOMALY_THRESHOLD, ANOMALY_WINDOW_WEEKS, ANOMALY_MIN_HISTORY, ANOMALY_MIN_ORDERS
+
+
+# nama objek -> (build(data), versi); `data` berisi orders_df, order_items_df, sellers_df, zip_centroids
+# (hanya diakses saat snapshot perlu di-build, sehingga bisa berupa LazyData). Versi (int, atau fungsi
+# yang mengembalikan versi) ikut di fingerprint snapshot: naikkan setiap kali builder atau class objek
+# berubah agar snapshot hasil kode lama tidak dimuat lagi setelah deploy.
+DERIVED_OBJECTS = {
+    'seller_index': (_seller_index, 1),
+    'cohort_base': (_cohort_base, 1),
+    'lookup_index': (_lookup_index, 1),
+    'series_tensor': (_series_tensor, 1),
+    'basket_base': (_basket_base, 1),
+    'purchase_pattern_base': (_purchase_pattern_base, 1),
+    'daily_anomalies': (_daily_anomalies, _daily_anomalies_version),
+    'delivery_base': (_delivery_base, 1),
+    'seller_day_base': (_seller_day_base, 1),
+}
+
+
+def derived_version(name):
+    """Versi objek turunan `name` untuk fingerprint snapshot"""
+    version = DERIVED_OBJECTS[name][1]
+    return version() if callable(version) else version
+
+
+def load_derived(name, dataset, data):
+    """Objek turunan `name` untuk `dataset` dari snapshot; di-build dari `data` jika belum ada / usang
+
+    Snapshot usang jika file sumber berubah atau versi objek (DERIVED_OBJECTS) dinaikkan.
+    """
+    builder = DERIVED_OBJECTS[name][0]
+    source_paths = [path for path in dataset.source_files if os.path.exists(path)]
+    return load_snapshot(name, source_paths, lambda: builder(data), dataset.cache_dir, version=derived_version(name))
@@ -0,0 +1,251 @@
+"""Differential test: reference path (`reference.py`) vs engine alternatif pada dataset sintetis
+
+Untuk setiap skala dataset (lihat `synthetic.py`) dibuat beberapa rentang tanggal acak
+(ditambah rentang penuh, rentang satu bulan, dan rentang tanpa order). Setiap fungsi analisis
+dijalankan dengan reference path dan semua engine yang terdaftar untuk fungsi tersebut pada
+input yang sama, lalu hasilnya dibandingkan per DataFrame dengan toleransi numerik. Laporan berisi speedup
+(waktu reference / waktu engine) dan deviasi relatif terbesar per fungsi dan engine.
+
+Jalankan:
+    python dashboard/differential.py                       # skala default
+    python dashboard/differential.py 20000,200000 --windows 8 --json
+
+Exit code 1 jika ada engine yang hasilnya berbeda dari reference.
+Engine baru didaftarkan dengan decorator `@engine(nama_fungsi, nama_engine)`.
+"""
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+import reference
+
+DIFF_SCALES = [2_000, 20_000, 200_000]
+DIFF_WINDOWS = 6
+DIFF_RTOL = 1e-7
+DIFF_ATOL = 1e-6
+
+# nama fungsi -> (fungsi reference, kolom kunci per DataFrame hasil untuk menyejajarkan baris)
+REFERENCE_FUNCTIONS = {
+    'analyze_monthly_trends': (reference.analyze_monthly_trends, [['order_date']]),
+    'analyze_category_performance': (reference.analyze_category_performance, [['product_category_en']] * 4),
+    'analyze_rfm': (reference.analyze_rfm, [['customer_unique_id'], ['customer_segment']]),
+    'prepare_geospatial_data': (reference.prepare_geospatial_data, [
+        ['customer_city', 'customer_state'], ['seller_city', 'seller_state'], ['order_id'],
+        ['customer_city', 'customer_state'], ['customer_city', 'customer_state'],
+        ['customer_city', 'customer_state'], ['customer_city', 'customer_state'],
+    ]),
+}
+
+# nama fungsi -> {nama engine: fungsi dengan signature yang sama dengan reference}
+ENGINES = {name: {} for name in REFERENCE_FUNCTIONS}
+
+
+def engine(function_name, name):
+    """Decorator untuk mendaftarkan engine alternatif untuk salah satu fungsi di REFERENCE_FUNCTIONS"""
+    def register(func):
+        ENGINES[function_name][name] = func
+        return func
+    return register
+
+
+def _register_analysis_engines():
+    # Engine default: kode live di analysis.py, agar optimasi di sana selalu dicek terhadap reference
+    import analysis
+
+    for function_name in REFERENCE_FUNCTIONS:
+        ENGINES[function_name].setdefault('analysis', getattr(analysis, function_name))
+
+
+def random_windows(orders_df, n_windows, rng):
+    """Rentang (start_date, end_date) acak dalam rentang data, plus rentang penuh, satu bulan, dan kosong"""
+    min_date = orders_df['order_date'].min().date()
+    max_date = orders_df['order_purchase_timestamp'].max().date()
+    total_days = (max_date - min_date).days
+    one_month = pd.Timedelta(days=30).to_pytimedelta()
+    windows = [(min_date, max_date), (min_date, min_date + one_month),
+               (max_date + pd.Timedelta(days=1).to_pytimedelta(), max_date + one_month)]
+    for _ in range(max(0, n_windows - len(windows))):
+        start_offset, end_offset = np.sort(rng.integers(0, total_days + 1, size=2))
+        windows.append((min_date + pd.Timedelta(days=int(start_offset)).to_pytimedelta(),
+                        min_date + pd.Timedelta(days=int(end_offset)).to_pytimedelta()))
+    return windows
+
+
+def build_cases(dataset, start_date, end_date, use_active_sellers=False):
+    """Argumen setiap fungsi untuk satu rentang (filter sama dengan sidebar dashboard)"""
+    orders_df = dataset['orders_enriched']
+    order_items_df = dataset['order_items_products']
+    filtered_orders = orders_df[
+        (orders_df['order_date'].dt.date >= start_date) &
+        (orders_df['order_date'].dt.date <= end_date)
+    ].copy()
+    filtered_order_items = order_items_df[order_items_df['order_id'].isin(filtered_orders['order_id'])]
+    active_seller_ids = filtered_order_items['seller_id'].unique() if use_active_sellers else None
+    return {
+        'analyze_monthly_trends': (filtered_orders,),
+        'analyze_category_performance': (filtered_order_items,),
+        'analyze_rfm': (filtered_orders,),
+        'prepare_geospatial_data': (filtered_orders, dataset['geolocation_dataset'], dataset['sellers_dataset'],
+                                    active_seller_ids),
+    }
+
+
+def _copy_args(args):
+    # prepare_geospatial_data mengubah kolom input (astype str), jadi setiap run dapat salinan sendiri
+    return tuple(arg.copy() if isinstance(arg, pd.DataFrame) else arg for arg in args)
+
+
+def _run(func, args, repeat):
+    """(waktu terbaik dalam detik, hasil, exception) dari beberapa run dengan input yang sama"""
+    import time
+
+    best, result = None, None
+    for _ in range(repeat):
+        run_args = _copy_args(args)
+        start = time.perf_counter()
+        try:
+            result = func(*run_args)
+        except Exception as exc:
+            return None, None, exc
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result, None
+
+
+def _as_frames(result):
+    return list(result) if isinstance(result, tuple) else [result]
+
+
+def compare_frames(expected, actual, keys, rtol=DIFF_RTOL, atol=DIFF_ATOL):
+    """Bandingkan dua DataFrame setelah diurutkan berdasarkan `keys`
+
+    Returns: (deviasi relatif terbesar pada kolom numerik, daftar perbedaan). Urutan baris
+    tidak dibandingkan (ties pada sort/nlargest boleh berbeda urutan), isi baris dibandingkan.
+    """
+    problems = []
+    if list(expected.columns) != list(actual.columns):
+        return np.inf, [f"kolom berbeda: {list(expected.columns)} vs {list(actual.columns)}"]
+    if len(expected) != len(actual):
+        return np.inf, [f"jumlah baris berbeda: {len(expected)} vs {len(actual)}"]
+
+    keys = [key for key in keys if key in expected.columns]
+    if keys:
+        expected = expected.sort_values(keys, kind='stable')
+        actual = actual.sort_values(keys, kind='stable')
+    expected = expected.reset_index(drop=True)
+    actual = actual.reset_index(drop=True)
+
+    worst = 0.0
+    for col in expected.columns:
+        left, right = expected[col], actual[col]
+        numeric = pd.api.types.is_numeric_dtype(left) and pd.api.types.is_numeric_dtype(right)
+        if numeric and not pd.api.types.is_bool_dtype(left):
+            a = left.to_numpy(dtype=np.float64)
+            b = right.to_numpy(dtype=np.float64)
+            both_nan = np.isnan(a) & np.isnan(b)
+            with np.errstate(invalid='ignore'):
+                deviation = np.where(both_nan, 0.0, np.abs(a - b) / np.maximum(np.abs(a), atol))
+            deviation = np.nan_to_num(deviation, nan=np.inf)
+            col_worst = float(deviation.max()) if len(deviation) else 0.0
+            worst = max(worst, col_worst)
+            if not np.all(both_nan | np.isclose(a, b, rtol=rtol, atol=atol)):
+                problems.append(f"{col}: deviasi relatif maksimum {col_worst:.3g}")
+        else:
+            mismatch = ~((left.astype(str) == right.astype(str)).to_numpy() | (left.isna() & right.isna()).to_numpy())
+            if mismatch.any():
+                row = int(np.flatnonzero(mismatch)[0])
+                problems.append(f"{col}: {int(mismatch.sum())} nilai berbeda (baris {row}: {left.iloc[row]!r} vs {right.iloc[row]!r})")
+                worst = np.inf
+    return worst, problems
+
+
+def compare_results(function_name, expected, actual, rtol=DIFF_RTOL, atol=DIFF_ATOL):
+    """Bandingkan hasil lengkap (tuple DataFrame) satu fungsi, kembalikan (deviasi terbesar, perbedaan)"""
+    _, frame_keys = REFERENCE_FUNCTIONS[function_name]
+    expected, actual = _as_frames(expected), _as_frames(actual)
+    if len(expected) != len(actual):
+        return np.inf, [f"jumlah output berbeda: {len(expected)} vs {len(actual)}"]
+
+    worst, problems = 0.0, []
+    for position, (left, right, keys) in enumerate(zip(expected, actual, frame_keys)):
+        frame_worst, frame_problems = compare_frames(left, right, keys, rtol, atol)
+        worst = max(worst, frame_worst)
+        problems.extend(f"output[{position}] {problem}" for problem in frame_problems)
+    return worst, problems
+
+
+def run_differential(scales=None, n_windows=DIFF_WINDOWS, seed=42, repeat=3, rtol=DIFF_RTOL, atol=DIFF_ATOL):
+    """Jalankan reference vs semua engine terdaftar, kembalikan list baris laporan (dict)"""
+    from synthetic import generate_dataset
+
+    _register_analysis_engines()
+    report = []
+    for n_orders in scales or DIFF_SCALES:
+        dataset = generate_dataset(
+            n_orders=n_orders, n_sellers=max(50, n_orders // 30), n_zip_prefixes=max(500, min(15_000, n_orders // 5)),
+            seed=seed
+        )
+        rng = np.random.default_rng(seed + n_orders)
+        stats = {}
+        for window_index, (start_date, end_date) in enumerate(random_windows(dataset['orders_enriched'], n_windows, rng)):
+            cases = build_cases(dataset, start_date, end_date, use_active_sellers=window_index % 2 == 1)
+            for function_name, (reference_func, _) in REFERENCE_FUNCTIONS.items():
+                reference_s, expected, reference_exc = _run(reference_func, cases[function_name], repeat)
+                for engine_name, engine_func in ENGINES[function_name].items():
+                    row = stats.setdefault((function_name, engine_name), {
+                        'n_orders': n_orders, 'function': function_name, 'engine': engine_name,
+                        'cases': 0, 'mismatches': 0, 'worst_deviation': 0.0,
+                        'reference_s': 0.0, 'engine_s': 0.0, 'problems': [],
+                    })
+                    row['cases'] += 1
+                    engine_s, actual, engine_exc = _run(engine_func, cases[function_name], repeat)
+                    window = f"{start_date}..{end_date}"
+                    if reference_exc is not None or engine_exc is not None:
+                        # Keduanya harus gagal dengan jenis exception yang sama
+                        if type(reference_exc) is not type(engine_exc):
+                            row['mismatches'] += 1
+                            row['worst_deviation'] = np.inf
+                            row['problems'].append(f"{window}: exception {reference_exc!r} vs {engine_exc!r}")
+                        continue
+                    worst, problems = compare_results(function_name, expected, actual, rtol, atol)
+                    row['worst_deviation'] = max(row['worst_deviation'], worst)
+                    row['reference_s'] += reference_s
+                    row['engine_s'] += engine_s
+                    if problems:
+                        row['mismatches'] += 1
+                        row['problems'].extend(f"{window}: {problem}" for problem in problems)
+
+        for row in stats.values():
+            row['speedup'] = row['reference_s'] / row['engine_s'] if row['engine_s'] > 0 else np.nan
+            report.append(row)
+    return report
+
+
+def main(argv):
+    as_json = '--json' in argv
+    n_windows = DIFF_WINDOWS
+    if '--windows' in argv:
+        n_windows = int(argv[argv.index('--windows') + 1])
+        argv = argv[:argv.index('--windows')] + argv[argv.index('--windows') + 2:]
+    positional = [arg for arg in argv if not arg.startswith('--')]
+    scales = [int(value) for value in positional[0].split(',')] if positional else None
+
+    report = run_differential(scales, n_windows)
+    if as_json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print(f"{'n_orders':>9}  {'function':<30} {'engine':<12} {'cases':>5} {'diff':>5} "
+              f"{'worst_dev':>10} {'ref_s':>9} {'engine_s':>9} {'speedup':>8}")
+        for row in report:
+            print(f"{row['n_orders']:>9}  {row['function']:<30} {row['engine']:<12} {row['cases']:>5} "
+                  f"{row['mismatches']:>5} {row['worst_deviation']:>10.2e} {row['reference_s']:>9.4f} "
+                  f"{row['engine_s']:>9.4f} {row['speedup']:>7.2f}x")
+            for problem in row['problems'][:5]:
+                print(f"           ! {problem}")
+    return 1 if any(row['mismatches'] for row in report) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
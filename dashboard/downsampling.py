@@ -0,0 +1,71 @@
+"""Downsampling time series di server sebelum dikirim ke browser
+
+Dua algoritma yang mempertahankan bentuk kurva:
+- LTTB (Largest-Triangle-Three-Buckets): memilih satu titik per bucket yang membentuk
+  segitiga terbesar dengan titik terpilih sebelumnya dan rata-rata bucket berikutnya.
+- Min/max bucketing: menyimpan titik minimum dan maksimum setiap bucket (spike tidak hilang).
+"""
+import numpy as np
+
+
+def _as_float(values):
+    """Konversi array (termasuk datetime64) ke float64 untuk perhitungan luas segitiga"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return values.astype(np.float64)
+
+
+def lttb_indices(x, y, max_points):
+    """Index titik terpilih LTTB (termasuk titik pertama dan terakhir), terurut naik"""
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = _as_float(x)
+    y = np.nan_to_num(_as_float(y))
+    # Bucket ke-i mencakup [edges[i], edges[i + 1]); titik pertama dan terakhir selalu dipilih
+    every = (n - 2) / (max_points - 2)
+    edges = np.floor(np.arange(max_points - 1) * every).astype(np.int64) + 1
+    edges = np.append(edges, n)
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, max_points):
+    """Index titik min dan max per bucket (maksimal `max_points` titik), terurut naik"""
+    n = len(y)
+    n_buckets = max_points // 2
+    if max_points >= n or n_buckets < 1:
+        return np.arange(n)
+
+    y = np.nan_to_num(_as_float(y))
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    # Urutkan per (bucket, nilai): elemen pertama/terakhir tiap bucket adalah min/max
+    order = np.lexsort((y, bucket))
+    selected = np.concatenate([order[edges[:-1]], order[edges[1:] - 1]])
+    return np.unique(selected)
+
+
+def downsample(x, y, max_points, method='lttb'):
+    """Downsample pasangan (x, y) ke maksimal `max_points` titik"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if method == 'minmax':
+        selected = minmax_indices(y, max_points)
+    else:
+        selected = lttb_indices(x, y, max_points)
+    return x[selected], y[selected]
@@ -0,0 +1,86 @@
+"""Enrichment data saat build snapshot (dijalankan sekali, bukan setiap rerun dashboard)"""
+import numpy as np
+import pandas as pd
+
+from spatial import haversine_km
+
+
+def add_shipping_distance(order_items_df, orders_df, sellers_df, zip_centroids, chunk_size=1_000_000):
+    """Tambahkan jarak pengiriman seller -> customer per order item
+
+    Kolom baru:
+    - `seller_state`, `customer_state`: state asal dan tujuan pengiriman
+    - `shipping_distance_km`: jarak great-circle antar centroid zip seller dan customer
+      (NaN jika salah satu zip tidak punya koordinat)
+
+    Lookup zip -> posisi centroid dilakukan sekali dengan hash index, kemudian jarak
+    dihitung vectorized per chunk agar memori sementara tetap terbatas untuk jutaan item.
+    """
+    order_items_df = order_items_df.copy()
+
+    sellers = sellers_df.drop_duplicates('seller_id').set_index('seller_id')
+    orders = orders_df.drop_duplicates('order_id').set_index('order_id')
+
+    seller_zip = order_items_df['seller_id'].map(sellers['seller_zip_code_prefix'].astype(str))
+    customer_zip = order_items_df['order_id'].map(orders['customer_zip_code_prefix'].astype(str))
+    order_items_df['seller_state'] = order_items_df['seller_id'].map(sellers['seller_state']).astype('category')
+    order_items_df['customer_state'] = order_items_df['order_id'].map(orders['customer_state']).astype('category')
+
+    centroid_index = pd.Index(zip_centroids['geolocation_zip_code_prefix'].astype(str))
+    centroid_lat = zip_centroids['geolocation_lat'].to_numpy()
+    centroid_lng = zip_centroids['geolocation_lng'].to_numpy()
+    seller_pos = centroid_index.get_indexer(seller_zip)
+    customer_pos = centroid_index.get_indexer(customer_zip)
+
+    distance = np.full(len(order_items_df), np.nan, dtype=np.float32)
+    for start in range(0, len(order_items_df), chunk_size):
+        end = start + chunk_size
+        s_pos = seller_pos[start:end]
+        c_pos = customer_pos[start:end]
+        located = (s_pos >= 0) & (c_pos >= 0)
+        distance[start:end][located] = haversine_km(
+            centroid_lat[s_pos[located]], centroid_lng[s_pos[located]],
+            centroid_lat[c_pos[located]], centroid_lng[c_pos[located]]
+        )
+
+    order_items_df['shipping_distance_km'] = distance
+    return order_items_df
+
+
+# Kolom timestamp tahapan order, urut dari pembelian sampai diterima customer
+DELIVERY_TIMESTAMP_COLUMNS = [
+    'order_purchase_timestamp', 'order_approved_at', 'order_delivered_carrier_date',
+    'order_delivered_customer_date', 'order_estimated_delivery_date',
+]
+
+
+def add_delivery_lead_times(orders_df):
+    """Tambahkan kolom lead time pengiriman per order (dalam hari, float32)
+
+    Kolom baru:
+    - `approval_days`: pembelian -> approval
+    - `carrier_days`: approval -> diserahkan ke kurir
+    - `customer_days`: kurir -> diterima customer
+    - `delivery_days`: pembelian -> diterima customer (total)
+    - `delivery_delay_days`: diterima customer - estimasi pengiriman (positif = terlambat)
+    - `is_late`: diterima setelah estimasi (False untuk order yang belum diterima)
+
+    NaN jika salah satu timestamp tahapan kosong (misal order belum dikirim / dibatalkan).
+    """
+    orders_df = orders_df.copy()
+    timestamps = {}
+    for col in DELIVERY_TIMESTAMP_COLUMNS:
+        orders_df[col] = pd.to_datetime(orders_df[col], errors='coerce')
+        timestamps[col] = orders_df[col].to_numpy(dtype='datetime64[ns]')
+
+    def days_between(start_col, end_col):
+        delta = timestamps[end_col] - timestamps[start_col]
+        return (delta / np.timedelta64(1, 'D')).astype(np.float32)
+
+    orders_df['approval_days'] = days_between('order_purchase_timestamp', 'order_approved_at')
+    orders_df['carrier_days'] = days_between('order_approved_at', 'order_delivered_carrier_date')
+    orders_df['customer_days'] = days_between('order_delivered_carrier_date', 'order_delivered_customer_date')
+    orders_df['delivery_days'] = days_between('order_purchase_timestamp', 'order_delivered_customer_date')
+    orders_df['delivery_delay_days'] = days_between('order_estimated_delivery_date', 'order_delivered_customer_date')
+    orders_df['is_late'] = orders_df['delivery_delay_days'].to_numpy() > 0
+    return orders_df
@@ -0,0 +1,187 @@
+"""Export data di balik chart (orders, order items, RFM, tabel gap) sebagai CSV, CSV gzip, atau Parquet
+
+Data ditulis per chunk baris: setiap chunk di-serialize (dan dikompresi) lalu langsung
+diteruskan ke file/stream tujuan, sehingga output lengkap tidak pernah dibentuk sebagai satu
+string/bytes di memori. Dashboard mengarahkan tombol download ke endpoint `/api/export` (api.py)
+yang menulis chunk langsung ke socket; tanpa API, st.download_button dipakai untuk tabel sampai
+EXPORT_MAX_DOWNLOAD_ROWS baris karena Streamlit menyimpan seluruh file download di memori.
+
+Batch (tanpa Streamlit):
+    python dashboard/export.py <table[,table...]> <start_date> <end_date> [format] [output_dir]
+    python dashboard/export.py orders,rfm 2017-01-01 2017-12-31 csv.gz exports/
+"""
+import io
+import os
+import sys
+import zlib
+
+import pandas as pd
+
+EXPORT_CHUNK_ROWS = 50_000
+# format -> (ekstensi file, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+EXPORT_TABLES = ['orders', 'order_items', 'rfm', 'gap_with_sellers', 'gap_without_sellers']
+PARQUET_COMPRESSION = 'zstd'
+# URL dasar API (api.py) untuk download streaming dari dashboard, misal http://localhost:8000; kosong = tidak dipakai
+EXPORT_API_URL = os.environ.get('DASHBOARD_API_URL', '').rstrip('/')
+# Batas baris st.download_button (seluruh file disimpan di memori Streamlit) jika API tidak dipakai
+EXPORT_MAX_DOWNLOAD_ROWS = int(os.environ.get('DASHBOARD_EXPORT_MAX_ROWS', 200_000))
+
+
+class _ChunkSink(io.RawIOBase):
+    """File-like write-only untuk ParquetWriter: bytes yang ditulis diambil per chunk dengan `drain()`"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _iter_parquet_chunks(df, chunk_rows):
+    """Parquet dengan satu row group per chunk; bytes dikirim setiap kali row group selesai ditulis"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    schema = pa.Schema.from_pandas(df.iloc[:chunk_rows], preserve_index=False)
+    with pq.ParquetWriter(sink, schema, compression=PARQUET_COMPRESSION) as writer:
+        for start in range(0, len(df), chunk_rows):
+            writer.write_table(pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_export_chunks(df, export_format='csv', chunk_rows=EXPORT_CHUNK_ROWS):
+    """Generator bytes output `df` dalam format `export_format`, diproses `chunk_rows` baris per langkah"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Format export tidak dikenal: {export_format}. Pilihan: {', '.join(EXPORT_FORMATS)}")
+    if export_format == 'parquet':
+        yield from (chunk for chunk in _iter_parquet_chunks(df, chunk_rows) if chunk)
+        return
+
+    # wbits=31: stream deflate dengan header/trailer gzip
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if export_format == 'csv.gz' else None
+    # range minimal satu langkah agar DataFrame kosong tetap menghasilkan baris header
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode('utf-8')
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def write_export(df, output, export_format='csv', chunk_rows=EXPORT_CHUNK_ROWS):
+    """Tulis `df` ke `output` (path atau file biner) secara streaming, kembalikan jumlah bytes"""
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, 'wb') as f:
+            return write_export(df, f, export_format, chunk_rows)
+
+    written = 0
+    for chunk in iter_export_chunks(df, export_format, chunk_rows):
+        output.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def export_to_bytes(df, export_format='csv', chunk_rows=EXPORT_CHUNK_ROWS):
+    """Seluruh export `df` sebagai bytes di memori (data st.download_button); ukuran `df` dibatasi pemanggil"""
+    return b''.join(iter_export_chunks(df, export_format, chunk_rows))
+
+
+def export_url(api_url, table, start_date, end_date, export_format, dataset_name=None):
+    """URL endpoint download streaming `/api/export` (lihat api.py) untuk tabel dan rentang tanggal"""
+    from urllib.parse import urlencode
+
+    params = {'table': table, 'start_date': str(start_date), 'end_date': str(end_date), 'format': export_format}
+    if dataset_name:
+        params['dataset'] = dataset_name
+    return f"{api_url}/api/export?{urlencode(params)}"
+
+
+def export_file_name(table, start_date, end_date, export_format):
+    """Nama file export, misal `orders_2017-01-01_2017-12-31.csv.gz`"""
+    return f"{table}_{start_date}_{end_date}{EXPORT_FORMATS[export_format][0]}"
+
+
+def build_export_table(table, orders_df, order_items_df, start_date, end_date,
+                       geolocation_df=None, sellers_df=None, seller_base=None):
+    """DataFrame `table` untuk rentang tanggal (sama dengan filter sidebar dashboard)"""
+    from analysis import analyze_rfm, prepare_geospatial_data
+
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Tabel export tidak dikenal: {table}. Pilihan: {', '.join(EXPORT_TABLES)}")
+    filtered_orders = orders_df[
+        (orders_df['order_date'].dt.date >= start_date) &
+        (orders_df['order_date'].dt.date <= end_date)
+    ].copy()
+    if table == 'orders':
+        return filtered_orders
+    if table == 'order_items':
+        return order_items_df[order_items_df['order_id'].isin(filtered_orders['order_id'])]
+    if table == 'rfm':
+        return analyze_rfm(filtered_orders)[0]
+
+    from seller_performance import analyze_active_sellers
+
+    active_seller_ids = analyze_active_sellers(seller_base, start_date, end_date) if seller_base is not None else None
+    _, _, _, _, gap_with_sellers, gap_without_sellers, _ = prepare_geospatial_data(
+        filtered_orders, geolocation_df, sellers_df, active_seller_ids=active_seller_ids
+    )
+    return gap_with_sellers if table == 'gap_with_sellers' else gap_without_sellers
+
+
+def export_selection(tables, start_date, end_date, output_dir, export_format='csv.gz', chunk_rows=EXPORT_CHUNK_ROWS,
+                     dataset_name=None):
+    """Export batch beberapa tabel untuk satu rentang tanggal ke `output_dir`, kembalikan {table: path}"""
+    from utils import load_orders_data, load_order_items_data, load_geolocation_data, load_sellers_data, get_dataset
+    from seller_performance import build_seller_day_base
+
+    dataset = get_dataset(dataset_name)
+    start_date, end_date = pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date()
+    orders_df, order_items_df = load_orders_data(dataset), load_order_items_data(dataset)
+    geolocation_df = sellers_df = seller_base = None
+    if any(table.startswith('gap_') for table in tables):
+        geolocation_df, sellers_df = load_geolocation_data(dataset), load_sellers_data(dataset)
+        seller_base = build_seller_day_base(order_items_df, orders_df, sellers_df)
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    for table in tables:
+        df = build_export_table(table, orders_df, order_items_df, start_date, end_date,
+                                geolocation_df, sellers_df, seller_base)
+        path = os.path.join(output_dir, export_file_name(table, start_date, end_date, export_format))
+        write_export(df, path, export_format, chunk_rows)
+        paths[table] = path
+    return paths
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 4:
+        print(__doc__)
+        sys.exit(1)
+    export_format = sys.argv[4] if len(sys.argv) > 4 else 'csv.gz'
+    output_dir = sys.argv[5] if len(sys.argv) > 5 else 'exports'
+    for table, path in export_selection(sys.argv[1].split(','), sys.argv[2], sys.argv[3], output_dir, export_format).items():
+        print(f"{table:<20} {os.path.getsize(path) / 1024 ** 2:>10.2f} MB  {path}")
@@ -0,0 +1,164 @@
+"""Cache artifact hasil render (figure Plotly, HTML peta Folium, ringkasan JSON) di disk
+
+Key artifact = hash dari (versi skema cache, versi kode, versi dataset, id artifact, parameter termasuk
+state filter). Versi kode = hash isi modul dashboard (*.py), sehingga deploy yang mengubah analisis,
+chart, atau insight otomatis tidak menyajikan artifact hasil kode lama.
+Cache disimpan sebagai file di CACHE_DIR sehingga tetap ada setelah proses restart dan
+bisa dipakai bersama oleh beberapa worker. Ukuran total dibatasi `max_bytes`; jika
+terlampaui, artifact yang paling lama tidak dipakai (mtime terlama) dihapus lebih dulu. Total ukuran
+dilacak per proses (dihitung sekali saat cache dibuat lalu ditambah setiap `put`); folder hanya
+di-scan ulang saat total tersebut melebihi `max_bytes`, lalu dikosongkan sampai
+FIGURE_CACHE_EVICT_TO x `max_bytes`.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from utils import CACHE_DIR
+
+FIGURE_CACHE_DIR = os.path.join(CACHE_DIR, 'figures')
+FIGURE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Eviksi menghapus sampai total <= fraksi ini dari max_bytes, agar scan folder tidak terjadi di setiap put
+FIGURE_CACHE_EVICT_TO = 0.9
+# Naikkan jika format artifact di cache berubah (serialize/deserialize); perubahan kode analisis/chart/
+# insight sudah tercakup oleh versi kode (lihat `code_version`)
+FIGURE_CACHE_SCHEMA = 1
+
+# Ekstensi file dan (serialize, deserialize) per jenis artifact
+ARTIFACT_KINDS = {
+    'plotly': '.json',
+    'html': '.html',
+    'json': '.json',
+}
+
+
+def code_version(source_dir=os.path.dirname(os.path.abspath(__file__))):
+    """Hash isi semua modul Python dashboard: berubah setiap kali kode yang membangun artifact berubah"""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(source_dir)):
+        if name.endswith('.py'):
+            digest.update(name.encode('utf-8'))
+            with open(os.path.join(source_dir, name), 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _serialize(kind, artifact):
+    if kind == 'plotly':
+        return artifact.to_json()
+    if kind == 'html':
+        # Objek folium.Map dirender ke HTML standalone
+        return artifact if isinstance(artifact, str) else artifact.get_root().render()
+    return json.dumps(artifact, default=str)
+
+
+def _deserialize(kind, payload):
+    if kind == 'plotly':
+        import plotly.io as pio
+        return pio.from_json(payload, skip_invalid=True)
+    if kind == 'html':
+        return payload
+    return json.loads(payload)
+
+
+class FigureCache:
+    """Cache artifact render di disk dengan eviksi LRU berbasis ukuran"""
+
+    def __init__(self, cache_dir=FIGURE_CACHE_DIR, max_bytes=FIGURE_CACHE_MAX_BYTES, version=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = code_version() if version is None else version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Total ukuran artifact di cache_dir (perkiraan per proses, disinkronkan ulang oleh `evict`)
+        self._size = self._scan()[1]
+
+    def _path(self, dataset_version, artifact_id, params, kind):
+        key = json.dumps([FIGURE_CACHE_SCHEMA, self.version, dataset_version, artifact_id, kind, params],
+                         sort_keys=True, default=str)
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{artifact_id}-{digest[:32]}{ARTIFACT_KINDS[kind]}")
+
+    def get(self, dataset_version, artifact_id, params, kind='plotly'):
+        """Artifact dari cache, atau None jika belum ada"""
+        path = self._path(dataset_version, artifact_id, params, kind)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = f.read()
+            os.utime(path)  # tandai baru dipakai untuk urutan eviksi LRU
+        except OSError:
+            return None
+        return _deserialize(kind, payload)
+
+    def put(self, dataset_version, artifact_id, params, artifact, kind='plotly'):
+        """Simpan artifact (write atomik) lalu jalankan eviksi jika total ukuran melebihi batas"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(dataset_version, artifact_id, params, kind)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(_serialize(kind, artifact))
+        size = os.path.getsize(tmp_path)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._size += size - replaced
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def get_or_build(self, dataset_version, artifact_id, params, builder, kind='plotly'):
+        """Ambil artifact dari cache; jika miss, jalankan builder (analisis + render) lalu simpan
+
+        Hasil selalu dikembalikan dalam bentuk yang sama dengan hasil deserialize cache
+        (misal HTML string untuk peta) agar pemanggil tidak perlu membedakan hit/miss.
+        """
+        artifact = self.get(dataset_version, artifact_id, params, kind)
+        if artifact is not None:
+            self.hits += 1
+            return artifact
+
+        self.misses += 1
+        artifact = builder()
+        self.put(dataset_version, artifact_id, params, artifact, kind)
+        return _serialize(kind, artifact) if kind == 'html' else artifact
+
+    def _scan(self):
+        """(list (mtime, bytes, path) artifact di cache_dir, total bytes)"""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.tmp'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        except OSError:
+            pass
+        return entries, total
+
+    def evict(self):
+        """Jika total ukuran > max_bytes, hapus artifact paling lama tidak dipakai sampai <= batas eviksi"""
+        entries, total = self._scan()
+        if total > self.max_bytes:
+            target = self.max_bytes * FIGURE_CACHE_EVICT_TO
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # sudah dihapus worker lain
+                total -= size
+                if total <= target:
+                    break
+        with self._lock:
+            # Sinkronkan dengan isi folder (termasuk artifact yang ditulis / dihapus worker lain)
+            self._size = total
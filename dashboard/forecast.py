@@ -0,0 +1,154 @@
+"""Forecast GMV/orders bulanan untuk semua series kategori x state customer sekaligus
+
+Order items dipadatkan sekali menjadi tensor dense (series x bulan) untuk GMV dan jumlah order.
+Semua series berbagi sumbu waktu yang sama sehingga design matrix model (level + trend linear
++ musiman Fourier 12 bulan) juga sama: koefisien seluruh series cukup dihitung dengan satu
+`np.linalg.lstsq` dengan banyak right-hand side, tanpa loop per series.
+"""
+import numpy as np
+import pandas as pd
+
+from cohort import _month_code, _month_start
+
+FORECAST_HORIZON = 3
+SEASONAL_PERIOD = 12
+# Minimal jumlah bulan history agar komponen musiman ikut di-fit
+MIN_MONTHS_SEASONAL = 15
+INTERVAL_Z = 1.645  # interval prediksi 90%
+
+
+class SeriesTensor:
+    """Tensor (series x bulan) GMV dan jumlah order per kombinasi kategori x state customer"""
+
+    def __init__(self, keys, months, gmv, orders):
+        self.keys = keys
+        self.months = months
+        self.gmv = gmv
+        self.orders = orders
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def build_series_tensor(order_items_df, orders_df):
+    """Bangun SeriesTensor dari order items (sekali per dataset)
+
+    `customer_state` diambil dari order items jika sudah di-enrich (lihat enrichment.py),
+    jika belum di-join dari orders berdasarkan order_id.
+    """
+    orders = orders_df.drop_duplicates('order_id').set_index('order_id')
+    order_codes = pd.Index(orders.index).get_indexer(order_items_df['order_id'])
+    located = order_codes >= 0
+    items = order_items_df[located]
+    order_codes = order_codes[located]
+
+    if 'customer_state' in items.columns:
+        customer_state = items['customer_state'].astype(str).to_numpy()
+    else:
+        customer_state = orders['customer_state'].to_numpy()[order_codes]
+    month = _month_code(orders['order_purchase_timestamp'])[order_codes]
+
+    series_codes, keys = pd.MultiIndex.from_arrays(
+        [items['product_category_en'].fillna('unknown').to_numpy(), customer_state]
+    ).factorize()
+    keys = keys.to_frame(index=False, name=['product_category_en', 'customer_state'])
+    if len(month) == 0:
+        empty = np.zeros((len(keys), 0))
+        return SeriesTensor(keys, np.empty(0, dtype=np.int64), empty, empty)
+
+    month_min = month.min()
+    n_months = month.max() - month_min + 1
+    cell = series_codes.astype(np.int64) * n_months + (month - month_min)
+    size = len(keys) * n_months
+    gmv = np.bincount(cell, weights=items['item_gmv'].fillna(0).to_numpy(), minlength=size)
+
+    # Jumlah order = order unik per (series, bulan); satu order bisa punya beberapa item di series yang sama
+    unique_cells = np.unique(cell * len(orders) + order_codes) // len(orders)
+    orders_count = np.bincount(unique_cells, minlength=size).astype(np.float64)
+
+    months = np.arange(month_min, month_min + n_months)
+    return SeriesTensor(keys, months, gmv.reshape(len(keys), n_months), orders_count.reshape(len(keys), n_months))
+
+
+def _design_matrix(t, seasonal):
+    """Kolom: level, trend linear, dan (opsional) sin/cos musiman 12 bulan"""
+    columns = [np.ones_like(t), t]
+    if seasonal:
+        angle = 2 * np.pi * t / SEASONAL_PERIOD
+        columns += [np.sin(angle), np.cos(angle)]
+    return np.column_stack(columns)
+
+
+def fit_forecast(y, horizon=FORECAST_HORIZON, z=INTERVAL_Z):
+    """Fit model trend + musiman ke semua baris `y` (series x bulan) sekaligus
+
+    Returns: dict berisi forecast per bulan (series x horizon), total horizon beserta batas
+    bawah/atas interval prediksi, dan jumlah parameter model.
+    """
+    n_series, n_months = y.shape
+    seasonal = n_months >= MIN_MONTHS_SEASONAL
+    t = np.arange(n_months, dtype=np.float64)
+    x = _design_matrix(t, seasonal)
+    x_future = _design_matrix(np.arange(n_months, n_months + horizon, dtype=np.float64), seasonal)
+    n_params = x.shape[1]
+
+    # Satu solve untuk semua series: y.T berukuran (bulan x series)
+    coef, _, _, _ = np.linalg.lstsq(x, y.T, rcond=None)
+    residuals = y.T - x @ coef
+    dof = max(1, n_months - n_params)
+    sigma2 = (residuals ** 2).sum(axis=0) / dof
+
+    forecast = (x_future @ coef).T
+    xtx_inv = np.linalg.pinv(x.T @ x)
+    # Varians total horizon: error h bulan (diasumsikan independen) + ketidakpastian koefisien
+    a = x_future.sum(axis=0)
+    total_var = sigma2 * (horizon + a @ xtx_inv @ a)
+    total = forecast.sum(axis=1)
+    margin = z * np.sqrt(total_var)
+
+    return {
+        'forecast': np.clip(forecast, 0, None),
+        'total': np.clip(total, 0, None),
+        'lower': np.clip(total - margin, 0, None),
+        'upper': np.clip(total + margin, 0, None),
+        'n_params': n_params,
+    }
+
+
+def analyze_forecast(series_tensor, start_date, end_date, metric='gmv', horizon=FORECAST_HORIZON, min_history_total=0):
+    """Forecast `horizon` bulan setelah rentang terpilih untuk semua series kategori x state
+
+    Bulan masuk history jika tanggal awal bulannya berada di antara start_date dan end_date
+    (sama dengan filter `order_date` di sidebar dan cohort retention).
+    Returns: forecast_df per series (urut berdasarkan perubahan absolut terbesar) dengan kolom
+    `last_period` (total `horizon` bulan terakhir), `forecast`, `forecast_lower`,
+    `forecast_upper`, `change`, `change_pct`; dan bulan pertama periode forecast.
+    """
+    start_date = pd.Timestamp(start_date)
+    end_date = pd.Timestamp(end_date)
+    first_month = _month_code([start_date])[0] + (0 if start_date.day == 1 else 1)
+    last_month = _month_code([end_date])[0]
+
+    values = series_tensor.gmv if metric == 'gmv' else series_tensor.orders
+    window = (series_tensor.months >= first_month) & (series_tensor.months <= last_month)
+    y = values[:, window]
+    columns = ['product_category_en', 'customer_state', 'last_period', 'forecast',
+               'forecast_lower', 'forecast_upper', 'change', 'change_pct']
+    if y.shape[1] < 2 * horizon or len(y) == 0:
+        return pd.DataFrame(columns=columns), None
+
+    # Series yang tidak punya transaksi sama sekali dalam rentang tidak perlu di-fit
+    history_total = y.sum(axis=1)
+    active = history_total > max(0, min_history_total)
+    result = fit_forecast(y[active], horizon=horizon)
+
+    forecast_df = series_tensor.keys[active].reset_index(drop=True)
+    forecast_df['last_period'] = y[active][:, -horizon:].sum(axis=1)
+    forecast_df['forecast'] = result['total']
+    forecast_df['forecast_lower'] = result['lower']
+    forecast_df['forecast_upper'] = result['upper']
+    forecast_df['change'] = forecast_df['forecast'] - forecast_df['last_period']
+    forecast_df['change_pct'] = forecast_df['change'] / forecast_df['last_period'].replace(0, np.nan) * 100
+    forecast_df = forecast_df.reindex(forecast_df['change'].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+    return forecast_df, _month_start(last_month + 1)
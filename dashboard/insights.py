@@ -2,113 +2,260 @@
 import pandas as pd
 
 
-def generate_trend_insights(monthly_df):
-    """Generate insight text untuk tren bulanan"""
-    if len(monthly_df) <= 1:
+def generate_trend_insights(trend_summary):
+    """Generate insight text untuk tren bulanan (dari `kpi.TrendSummary`)"""
+    if trend_summary.n_periods <= 1:
         return "**Temuan Utama:**\n- Data tidak cukup untuk analisis tren (minimal 2 bulan diperlukan)"
 
-    orders_growth = ((monthly_df['orders'].iloc[-1] / monthly_df['orders'].iloc[0]) ** (1/(len(monthly_df)-1)) - 1) * 100
-    gmv_growth = ((monthly_df['gmv'].iloc[-1] / monthly_df['gmv'].iloc[0]) ** (1/(len(monthly_df)-1)) - 1) * 100
-    peak_month = monthly_df.loc[monthly_df['gmv'].idxmax()]
-    peak_month_name = peak_month['order_date'].strftime('%B %Y')
-    first_aov = monthly_df['aov'].iloc[0]
-    last_aov = monthly_df['aov'].iloc[-1]
-    aov_change = ((last_aov - first_aov) / first_aov) * 100
-    highest_volume_month = monthly_df.loc[monthly_df['orders'].idxmax()]
-
+    s = trend_summary
     return f"""
     **Temuan Utama:**
-    - Platform menunjukkan pertumbuhan dengan pertumbuhan rata-rata bulanan **{orders_growth:.2f}% untuk Orders dan {gmv_growth:.2f}% untuk GMV**
-    - AOV {'turun' if aov_change < 0 else 'naik'} {abs(aov_change):.1f}% (R$ {first_aov:.2f} → R$ {last_aov:.2f})
-    - **{peak_month_name}** adalah bulan puncak dengan {peak_month['orders']:,.0f} orders dan GMV R$ {peak_month['gmv']:,.2f}
-    - Terdapat trade-off antara volume orders dan AOV - bulan dengan volume tertinggi ({highest_volume_month['orders']:,.0f} orders) memiliki AOV R$ {highest_volume_month['aov']:.2f}
+    - Platform menunjukkan pertumbuhan dengan pertumbuhan rata-rata bulanan **{s.orders_growth_pct:.2f}% untuk Orders dan {s.gmv_growth_pct:.2f}% untuk GMV**
+    - AOV {'turun' if s.aov_change_pct < 0 else 'naik'} {abs(s.aov_change_pct):.1f}% (R$ {s.first_aov:.2f} → R$ {s.last_aov:.2f})
+    - **{s.peak_gmv_month.strftime('%B %Y')}** adalah bulan puncak dengan {s.peak_gmv_orders:,.0f} orders dan GMV R$ {s.peak_gmv_value:,.2f}
+    - Terdapat trade-off antara volume orders dan AOV - bulan dengan volume tertinggi ({s.peak_volume_orders:,.0f} orders) memiliki AOV R$ {s.peak_volume_aov:.2f}
     """
 
 
-def generate_category_insights(top_gmv, top_volume, top_freight):
-    """Generate insight text untuk analisis kategori"""
-    if len(top_gmv) == 0:
+def generate_category_insights(category_summary):
+    """Generate insight text untuk analisis kategori (dari `kpi.CategorySummary`)"""
+    if category_summary.top_gmv_category is None:
         return "**Temuan Utama:**\n- Tidak ada data kategori untuk rentang tanggal yang dipilih"
 
-    top_gmv_cat = top_gmv.iloc[0]['product_category_en']
-    top_gmv_value = top_gmv.iloc[0]['gmv']
-    top_gmv_fr_sorted = top_gmv.sort_values('freight_ratio')
-    lowest_fr_cat = top_gmv_fr_sorted.iloc[0]['product_category_en']
-    lowest_fr_value = top_gmv_fr_sorted.iloc[0]['freight_ratio'] * 100
-    top_vol_cat = top_volume.iloc[0]['product_category_en'] if len(top_volume) > 0 else "N/A"
-    high_fr_cats = top_freight[top_freight['freight_ratio'] > 0.3]
-    high_fr_list = ""
-    if len(high_fr_cats) > 0:
-        high_fr_list = ", ".join([f"{row['product_category_en']} ({row['freight_ratio']*100:.2f}%)"
-                                 for idx, row in high_fr_cats.head(3).iterrows()])
-    top_5_vol = set(top_volume.head(5)['product_category_en'])
-    top_5_gmv = set(top_gmv.head(5)['product_category_en'])
-    overlap_count = len(top_5_vol.intersection(top_5_gmv))
+    s = category_summary
+    high_fr_list = ", ".join(f"{category} ({ratio*100:.2f}%)" for category, ratio in s.high_freight_categories)
 
     return f"""
     **Temuan Utama:**
-    - **Pilar bisnis**: {top_gmv_cat} (GMV tertinggi: R$ {top_gmv_value:,.2f}), {lowest_fr_cat} (FR terendah: {lowest_fr_value:.2f}%), {top_vol_cat} (volume tertinggi)
+    - **Pilar bisnis**: {s.top_gmv_category} (GMV tertinggi: R$ {s.top_gmv_value:,.2f}), {s.lowest_freight_category} (FR terendah: {s.lowest_freight_ratio * 100:.2f}%), {s.top_volume_category} (volume tertinggi)
     - Kategori dengan FR > 30%: {high_fr_list if high_fr_list else "Tidak ada kategori dengan FR > 30%"} - berpotensi menurunkan konversi
-    - Korelasi positif: {overlap_count} dari 5 kategori top volume juga masuk top 5 GMV
+    - Korelasi positif: {s.top5_overlap} dari 5 kategori top volume juga masuk top 5 GMV
     - Kategori dengan freight ratio tinggi perlu evaluasi strategi pricing/logistik
     """
 
 
-def generate_rfm_insights(segment_df):
-    """Generate insight text untuk RFM analysis"""
-    if len(segment_df) == 0:
+def generate_rfm_insights(rfm_summary):
+    """Generate insight text untuk RFM analysis (dari `kpi.RfmSummary`)"""
+    if rfm_summary.n_customers == 0:
         return "**Temuan Utama:**\n- Tidak ada data customer untuk rentang tanggal yang dipilih"
 
-    total_customers = segment_df['customer_count'].sum()
-    segment_df['percentage'] = (segment_df['customer_count'] / total_customers) * 100
-
-    low_value_seg = segment_df[segment_df['customer_segment'] == 'Low value customers']
-    low_value_pct = low_value_seg['percentage'].values[0] if len(low_value_seg) > 0 else 0
-    lost_seg = segment_df[segment_df['customer_segment'] == 'lost customers']
-    lost_pct = lost_seg['percentage'].values[0] if len(lost_seg) > 0 else 0
-    low_lost_total = low_value_pct + lost_pct
-
-    top_seg = segment_df[segment_df['customer_segment'] == 'Top customers']
-    top_pct = top_seg['percentage'].values[0] if len(top_seg) > 0 else 0
-    high_seg = segment_df[segment_df['customer_segment'] == 'High value customer']
-    high_pct = high_seg['percentage'].values[0] if len(high_seg) > 0 else 0
-    premium_total = top_pct + high_pct
-
-    medium_seg = segment_df[segment_df['customer_segment'] == 'Medium value customer']
-    medium_pct = medium_seg['percentage'].values[0] if len(medium_seg) > 0 else 0
+    low_value_pct = rfm_summary.pct('Low value customers')
+    lost_pct = rfm_summary.pct('lost customers')
+    top_pct = rfm_summary.pct('Top customers')
+    high_pct = rfm_summary.pct('High value customer')
+    medium_pct = rfm_summary.pct('Medium value customer')
 
     return f"""
     **Temuan Utama:**
-    - **{low_lost_total:.1f}% pelanggan** di segment Low value ({low_value_pct:.1f}%) dan Lost customers ({lost_pct:.1f}%)
-    - Hanya **{premium_total:.1f}% pelanggan** di segment premium (Top: {top_pct:.1f}%, High: {high_pct:.1f}%) namun sangat berharga
+    - **{low_value_pct + lost_pct:.1f}% pelanggan** di segment Low value ({low_value_pct:.1f}%) dan Lost customers ({lost_pct:.1f}%)
+    - Hanya **{top_pct + high_pct:.1f}% pelanggan** di segment premium (Top: {top_pct:.1f}%, High: {high_pct:.1f}%) namun sangat berharga
     - Medium value customers ({medium_pct:.1f}%) memiliki potensi untuk ditingkatkan ke premium
     - Perlu strategi reaktivasi untuk Lost customers dan peningkatan nilai untuk Low value customers
     """
 
 
-def generate_geospatial_insights(top_cities, top_sellers, top_gap):
-    """Generate insight text untuk geospatial analysis"""
-    if len(top_cities) == 0 or len(top_sellers) == 0 or len(top_gap) == 0:
+def generate_geospatial_insights(geo_summary):
+    """Generate insight text untuk geospatial analysis (dari `kpi.GeospatialSummary`)"""
+    if not geo_summary.has_data:
         return "**Temuan Utama:**\n- Tidak ada data geospatial yang cukup untuk rentang tanggal yang dipilih"
 
-    top_customer_city = top_cities.iloc[0]
-    top_customer_name = f"{top_customer_city['customer_city']} ({top_customer_city['customer_state']})"
-    top_customer_orders = top_customer_city['order_count']
-    top_seller_city = top_sellers.iloc[0]
-    top_seller_name = f"{top_seller_city['seller_city']} ({top_seller_city['seller_state']})"
-    top_seller_count = top_seller_city['seller_count']
-    top_gap_city = top_gap.iloc[0]
-    top_gap_name = f"{top_gap_city['customer_city']} ({top_gap_city['customer_state']})"
-    top_gap_ratio = top_gap_city['gap_ratio']
-    top_gap_orders = top_gap_city['order_count']
-    top_gap_sellers = top_gap_city['seller_count']
-    top_customer_in_sellers = top_cities.iloc[0]['customer_city'] in top_sellers['seller_city'].values
+    s = geo_summary
+    top_customer_city = s.top_cities.iloc[0]
+    top_seller_city = s.top_seller_cities.iloc[0]
+    top_customer_in_sellers = top_customer_city['customer_city'] in s.top_seller_cities['seller_city'].values
 
     return f"""
     **Temuan Utama:**
-    - **{top_customer_name}**: Pasar terbesar ({top_customer_orders:,.0f} orders) dan {'juga' if top_customer_in_sellers else 'bukan'} pusat supply utama
-    - **{top_seller_name}**: Pusat supply utama dengan {top_seller_count:,.0f} sellers
-    - **{top_gap_name}**: Gap supply-demand tertinggi - **{top_gap_ratio:.1f} orders/seller** ({top_gap_orders:,.0f} orders / {top_gap_sellers:.0f} sellers)
+    - **{top_customer_city['customer_city']} ({top_customer_city['customer_state']})**: Pasar terbesar ({top_customer_city['order_count']:,.0f} orders) dan {'juga' if top_customer_in_sellers else 'bukan'} pusat supply utama
+    - **{top_seller_city['seller_city']} ({top_seller_city['seller_state']})**: Pusat supply utama dengan {top_seller_city['seller_count']:,.0f} sellers
+    - **{s.top_gap_city} ({s.top_gap_state})**: Gap supply-demand tertinggi - **{s.top_gap_ratio:.1f} orders/seller** ({s.top_gap_orders:,.0f} orders / {s.top_gap_sellers:.0f} sellers)
     - Area dengan gap sangat tinggi menunjukkan peluang ekspansi seller yang besar
     """
 
+
+
+def generate_coverage_insights(coverage_df, radius_km):
+    """Generate insight text untuk cakupan seller berbasis radius"""
+    located = coverage_df[coverage_df['nearest_seller_km'].notna()]
+    if len(located) == 0:
+        return "**Temuan Utama:**\n- Tidak ada data lokasi customer yang cukup untuk rentang tanggal yang dipilih"
+
+    total_orders = located['order_count'].sum()
+    uncovered = located[located['sellers_within_radius'] == 0]
+    uncovered_pct = uncovered['order_count'].sum() / total_orders * 100 if total_orders > 0 else 0
+    weighted_nearest = (located['nearest_seller_km'] * located['order_count']).sum() / total_orders if total_orders > 0 else 0
+    covered = located[located['sellers_within_radius'] > 0]
+    top_gap = covered.nlargest(1, 'orders_per_seller_within_radius')
+
+    top_gap_text = ""
+    if len(top_gap) > 0:
+        row = top_gap.iloc[0]
+        top_gap_text = (f"\n    - **{row['customer_city']} ({row['customer_state']})**: gap radius tertinggi - "
+                        f"**{row['orders_per_seller_within_radius']:.1f} orders/seller** dengan {row['sellers_within_radius']:,.0f} seller dalam {radius_km} km")
+
+    return f"""
+    **Temuan Utama:**
+    - **{uncovered_pct:.1f}% order** berasal dari {len(uncovered):,} kota tanpa seller dalam radius {radius_km} km
+    - Rata-rata jarak order ke seller terdekat (berbobot order): **{weighted_nearest:,.1f} km**{top_gap_text}
+    - Kota dengan demand tinggi namun seller terdekat jauh adalah kandidat utama rekrutmen seller lokal
+    """
+
+
+def generate_freight_distance_insights(category_km, state_pair_km):
+    """Generate insight text untuk analisis freight per km"""
+    if len(category_km) == 0:
+        return "**Temuan Utama:**\n- Tidak ada data jarak pengiriman untuk rentang tanggal yang dipilih"
+
+    total_freight = category_km['freight_value'].sum()
+    total_distance = category_km['distance_km'].sum()
+    overall_per_km = total_freight / total_distance if total_distance > 0 else 0
+    highest = category_km.iloc[0]
+    lowest = category_km.dropna(subset=['freight_per_km']).iloc[-1]
+    farthest = category_km.nlargest(1, 'avg_distance_km').iloc[0]
+
+    state_pair_text = ""
+    if len(state_pair_km) > 0:
+        top_pair = state_pair_km.iloc[0]
+        state_pair_text = (f"\n    - Rute termahal per km: **{top_pair['seller_state']} → {top_pair['customer_state']}** "
+                           f"(R$ {top_pair['freight_per_km']:.4f}/km, rata-rata {top_pair['avg_distance_km']:,.0f} km)")
+
+    return f"""
+    **Temuan Utama:**
+    - Rata-rata ongkir keseluruhan: **R$ {overall_per_km:.4f}/km**
+    - **{highest['product_category_en']}** memiliki ongkir per km tertinggi (R$ {highest['freight_per_km']:.4f}/km), **{lowest['product_category_en']}** terendah (R$ {lowest['freight_per_km']:.4f}/km)
+    - **{farthest['product_category_en']}** dikirim paling jauh (rata-rata {farthest['avg_distance_km']:,.0f} km per item){state_pair_text}
+    - Kategori dengan ongkir per km tinggi kemungkinan dipengaruhi berat/dimensi produk, bukan hanya jarak
+    """
+
+
+def generate_cohort_insights(customers_df, retention_df):
+    """Generate insight text untuk cohort retention"""
+    if len(retention_df) < 2:
+        return "**Temuan Utama:**\n- Data tidak cukup untuk analisis cohort (minimal 2 bulan diperlukan)"
+
+    total_new = customers_df[0].sum()
+    month_1 = retention_df[1].dropna()
+    # Rata-rata retention M+1 berbobot ukuran cohort
+    weights = customers_df.loc[month_1.index, 0]
+    avg_month_1 = (month_1 * weights).sum() / weights.sum() if weights.sum() > 0 else 0
+    best_cohort = month_1.idxmax() if len(month_1) > 0 else None
+    repeat_customers = customers_df.iloc[:, 1:].sum().sum()
+    largest_cohort = customers_df[0].idxmax()
+
+    best_text = f"**{best_cohort.strftime('%B %Y')}** ({month_1.max():.2f}%)" if best_cohort is not None else "-"
+    return f"""
+    **Temuan Utama:**
+    - **{total_new:,.0f} pelanggan baru** dalam rentang terpilih; cohort terbesar adalah **{largest_cohort.strftime('%B %Y')}** ({customers_df[0].max():,.0f} pelanggan)
+    - Rata-rata retention bulan ke-1 (M+1) hanya **{avg_month_1:.2f}%** - mayoritas pelanggan hanya belanja sekali
+    - Cohort dengan retention M+1 terbaik: {best_text}
+    - Total {repeat_customers:,.0f} kunjungan ulang (customer-bulan) setelah bulan pertama - program retensi/loyalty berpotensi besar
+    """
+
+
+def generate_purchase_pattern_insights(orders_matrix, gmv_matrix):
+    """Generate insight text untuk pola waktu pembelian (hari x jam)"""
+    total_orders = orders_matrix.values.sum()
+    if total_orders == 0:
+        return "**Temuan Utama:**\n- Tidak ada order pada rentang tanggal yang dipilih"
+
+    peak_day, peak_hour = orders_matrix.stack().idxmax()
+    orders_by_day = orders_matrix.sum(axis=1)
+    orders_by_hour = orders_matrix.sum(axis=0)
+    gmv_by_hour = gmv_matrix.sum(axis=0)
+    busiest_hour = orders_by_hour.idxmax()
+    weekend_pct = orders_by_day[['Sabtu', 'Minggu']].sum() / total_orders * 100
+    night_pct = orders_by_hour.loc[0:5].sum() / total_orders * 100
+    aov_by_hour = gmv_by_hour / orders_by_hour.replace(0, float('nan'))
+    best_aov_hour = aov_by_hour.idxmax()
+
+    return f"""
+    **Temuan Utama:**
+    - Waktu tersibuk: **{peak_day} pukul {peak_hour:02d}:00** ({orders_matrix.loc[peak_day, peak_hour]:,.0f} orders); hari tersibuk **{orders_by_day.idxmax()}**, hari tersepi **{orders_by_day.idxmin()}**
+    - Jam tersibuk secara keseluruhan: **{busiest_hour:02d}:00** ({orders_by_hour[busiest_hour] / total_orders:.1%} orders); hanya {night_pct:.1f}% order terjadi pukul 00:00-05:59
+    - Akhir pekan (Sabtu-Minggu) menyumbang {weekend_pct:.1f}% orders
+    - AOV tertinggi pada pukul **{best_aov_hour:02d}:00** (R$ {aov_by_hour[best_aov_hour]:,.2f}) - jadwalkan kampanye/push notification mendekati jam-jam puncak
+    """
+
+
+def generate_delivery_insights(delivery_summary):
+    """Generate insight text untuk performa pengiriman (dari `kpi.DeliverySummary`)"""
+    s = delivery_summary
+    if s.delivered_orders == 0:
+        return "**Temuan Utama:**\n- Tidak ada order terkirim pada rentang tanggal yang dipilih"
+
+    stages = {'approval': s.median_approval_days, 'approval ke kurir': s.median_carrier_days,
+              'kurir ke customer': s.median_customer_days}
+    slowest = max(stages, key=stages.get)
+    lines = [
+        f"- Median lead time pembelian sampai diterima **{s.median_days:.1f} hari** (P90: {s.p90_days:.1f} hari); "
+        f"{s.late_rate:.1%} dari {s.delivered_orders:,} order terkirim melewati estimasi",
+        f"- Median per tahap: approval {s.median_approval_days * 24:.1f} jam, ke kurir {s.median_carrier_days:.1f} hari, "
+        f"kurir sampai customer {s.median_customer_days:.1f} hari - tahap terlama: **{slowest}**",
+        f"- Median order tiba {abs(s.median_delay_days):.1f} hari "
+        f"{'sebelum' if s.median_delay_days <= 0 else 'setelah'} estimasi pengiriman",
+    ]
+    if s.worst_state is not None:
+        state, rate, orders = s.worst_state
+        lines.append(f"- State dengan rasio terlambat tertinggi: **{state}** ({rate:.1%} dari {orders:,} order)")
+    if s.worst_category is not None:
+        category, rate, orders = s.worst_category
+        lines.append(f"- Kategori dengan rasio terlambat tertinggi: **{category}** ({rate:.1%} dari {orders:,} order) "
+                     f"- prioritas evaluasi seller dan rute pengiriman")
+    return "\n    **Temuan Utama:**\n    " + "\n    ".join(lines) + "\n    "
+
+
+def generate_forecast_insights(forecast_df, forecast_start, value_label):
+    """Generate insight text untuk forecast kategori x state"""
+    if len(forecast_df) == 0:
+        return "**Temuan Utama:**\n- Data tidak cukup untuk forecast (minimal 6 bulan history diperlukan)"
+
+    total_last = forecast_df['last_period'].sum()
+    total_forecast = forecast_df['forecast'].sum()
+    total_change = (total_forecast - total_last) / total_last * 100 if total_last > 0 else 0
+    top_gainer = forecast_df.nlargest(1, 'change').iloc[0]
+    top_decliner = forecast_df.nsmallest(1, 'change').iloc[0]
+    # Series yang seluruh interval prediksinya di atas/bawah periode terakhir
+    confident_up = (forecast_df['forecast_lower'] > forecast_df['last_period']).sum()
+    confident_down = (forecast_df['forecast_upper'] < forecast_df['last_period']).sum()
+
+    return f"""
+    **Temuan Utama:**
+    - Forecast total {value_label} kuartal mulai **{forecast_start.strftime('%B %Y')}**: {total_forecast:,.0f} ({'naik' if total_change >= 0 else 'turun'} {abs(total_change):.1f}% vs 3 bulan terakhir) dari {len(forecast_df):,} series kategori × state
+    - Kenaikan terbesar: **{top_gainer['product_category_en']} ({top_gainer['customer_state']})** +{top_gainer['change']:,.0f}; penurunan terbesar: **{top_decliner['product_category_en']} ({top_decliner['customer_state']})** {top_decliner['change']:,.0f}
+    - {confident_up:,} series diprediksi naik dan {confident_down:,} series turun dengan interval 90% yang tidak mencakup nilai periode terakhir
+    - Model sederhana (trend + musiman) - gunakan sebagai sinyal prioritas stok/kampanye, bukan angka target
+    """
+
+
+def generate_basket_insights(pairs_df, n_orders):
+    """Generate insight text untuk market basket kategori"""
+    if len(pairs_df) == 0:
+        return "**Temuan Utama:**\n- Tidak ada pasangan kategori yang cukup sering dibeli bersama pada rentang tanggal yang dipilih"
+
+    top_lift = pairs_df.iloc[0]
+    top_count = pairs_df.nlargest(1, 'orders_together').iloc[0]
+    strong_pairs = (pairs_df['lift'] > 1).sum()
+
+    return f"""
+    **Temuan Utama:**
+    - Dari {n_orders:,} order, pasangan dengan lift tertinggi adalah **{top_lift['category_a']} + {top_lift['category_b']}** (lift {top_lift['lift']:.2f}, {top_lift['orders_together']:,} order bersama)
+    - Pasangan paling sering: **{top_count['category_a']} + {top_count['category_b']}** ({top_count['orders_together']:,} order, support {top_count['support']:.3%})
+    - {strong_pairs:,} dari {len(pairs_df):,} pasangan memiliki lift > 1 (dibeli bersama lebih sering dari kebetulan) - kandidat bundling dan rekomendasi cross-sell
+    """
+
+
+def generate_seller_insights(top_df, bottom_df, n_ranked, metric_label):
+    """Generate insight text untuk leaderboard seller"""
+    if len(top_df) == 0:
+        return "**Temuan Utama:**\n- Tidak ada seller dengan order yang cukup pada rentang tanggal yang dipilih"
+
+    best = top_df.iloc[0]
+    worst = bottom_df.iloc[0]
+
+    return f"""
+    **Temuan Utama:**
+    - {n_ranked:,} seller aktif diranking; seller teratas berdasarkan {metric_label}: **{best['seller_id'][:8]}** ({best['seller_city']}, {best['seller_state']}) dengan GMV R$ {best['gmv']:,.2f} dari {best['orders']:,} order
+    - Top {len(top_df)} seller rata-rata aktif {top_df['active_days'].mean():,.0f} hari vs {bottom_df['active_days'].mean():,.0f} hari untuk bottom {len(bottom_df)}
+    - Freight ratio median top {len(top_df)}: {top_df['freight_ratio'].median():.1%} vs bottom {len(bottom_df)}: {bottom_df['freight_ratio'].median():.1%}
+    - Seller terbawah: **{worst['seller_id'][:8]}** ({worst['seller_city']}, {worst['seller_state']}) - kandidat pendampingan atau evaluasi listing
+    """
@@ -0,0 +1,242 @@
+"""Ringkasan KPI immutable per analisis, dibaca oleh widget st.metric dan fungsi insights
+
+Setiap `summarize_*` membaca hasil analisis (lihat analysis.py) sekali: kolom yang dibutuhkan
+diambil sebagai array numpy lalu semua KPI, threshold, dan baris teratas dihitung dalam satu
+langkah. Dashboard dan `generate_*_insights` hanya membaca field ringkasan, tidak lagi
+menghitung ulang statistik yang sama dari DataFrame.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from analysis import RFM_SEGMENT_ORDER
+
+# Threshold orders/seller untuk kota dengan gap supply-demand tinggi / sangat tinggi
+GAP_HIGH_THRESHOLD = 50
+GAP_VERY_HIGH_THRESHOLD = 100
+# Kategori dengan freight ratio di atas nilai ini ditandai di insight kategori
+HIGH_FREIGHT_RATIO = 0.3
+
+
+def _mean(values):
+    # Mean tanpa RuntimeWarning untuk array kosong (hasil NaN, sama dengan pandas)
+    return float(values.mean()) if len(values) else float('nan')
+
+
+@dataclass(frozen=True)
+class TrendSummary:
+    """KPI tren bulanan (Pertanyaan 1)"""
+    n_periods: int
+    total_orders: int
+    total_gmv: float
+    avg_aov: float
+    orders_growth_pct: float
+    gmv_growth_pct: float
+    first_aov: float
+    last_aov: float
+    aov_change_pct: float
+    peak_gmv_month: pd.Timestamp = None
+    peak_gmv_orders: float = 0.0
+    peak_gmv_value: float = 0.0
+    peak_volume_orders: float = 0.0
+    peak_volume_aov: float = 0.0
+
+
+def summarize_trends(monthly_df):
+    """TrendSummary dari hasil `analyze_monthly_trends` (terurut per bulan)
+
+    Pertumbuhan = rata-rata pertumbuhan bulanan majemuk antara bulan pertama dan terakhir
+    (0 jika kurang dari 2 bulan).
+    """
+    orders = monthly_df['orders'].to_numpy()
+    gmv = monthly_df['gmv'].to_numpy(dtype=np.float64)
+    aov = monthly_df['aov'].to_numpy(dtype=np.float64)
+    n_periods = len(monthly_df)
+    if n_periods <= 1:
+        first_aov = float(aov[0]) if n_periods else float('nan')
+        return TrendSummary(
+            n_periods=n_periods, total_orders=int(orders.sum()), total_gmv=float(gmv.sum()), avg_aov=_mean(aov),
+            orders_growth_pct=0.0, gmv_growth_pct=0.0, first_aov=first_aov, last_aov=first_aov, aov_change_pct=0.0,
+        )
+
+    exponent = 1 / (n_periods - 1)
+    peak_gmv = int(gmv.argmax())
+    peak_volume = int(orders.argmax())
+    return TrendSummary(
+        n_periods=n_periods,
+        total_orders=int(orders.sum()),
+        total_gmv=float(gmv.sum()),
+        avg_aov=_mean(aov),
+        orders_growth_pct=float(((orders[-1] / orders[0]) ** exponent - 1) * 100),
+        gmv_growth_pct=float(((gmv[-1] / gmv[0]) ** exponent - 1) * 100),
+        first_aov=float(aov[0]),
+        last_aov=float(aov[-1]),
+        aov_change_pct=float((aov[-1] - aov[0]) / aov[0] * 100),
+        peak_gmv_month=monthly_df['order_date'].iloc[peak_gmv],
+        peak_gmv_orders=float(orders[peak_gmv]),
+        peak_gmv_value=float(gmv[peak_gmv]),
+        peak_volume_orders=float(orders[peak_volume]),
+        peak_volume_aov=float(aov[peak_volume]),
+    )
+
+
+@dataclass(frozen=True)
+class CategorySummary:
+    """KPI kategori produk (Pertanyaan 2)"""
+    n_categories: int
+    top_gmv_category: str = None
+    top_gmv_value: float = 0.0
+    lowest_freight_category: str = None
+    lowest_freight_ratio: float = 0.0
+    top_volume_category: str = "N/A"
+    # (kategori, freight ratio) maksimal 3 kategori dengan freight ratio > HIGH_FREIGHT_RATIO
+    high_freight_categories: tuple = ()
+    top5_overlap: int = 0
+
+
+def summarize_categories(category_agg, top_gmv, top_volume, top_freight):
+    """CategorySummary dari hasil `analyze_category_performance`"""
+    if len(top_gmv) == 0:
+        return CategorySummary(len(category_agg))
+
+    gmv_categories = top_gmv['product_category_en'].to_numpy()
+    gmv_freight = top_gmv['freight_ratio'].to_numpy(dtype=np.float64)
+    lowest = int(gmv_freight.argmin())
+    volume_categories = top_volume['product_category_en'].to_numpy()
+    freight_categories = top_freight['product_category_en'].to_numpy()
+    freight_ratio = top_freight['freight_ratio'].to_numpy(dtype=np.float64)
+    high = np.flatnonzero(freight_ratio > HIGH_FREIGHT_RATIO)[:3]
+
+    return CategorySummary(
+        n_categories=len(category_agg),
+        top_gmv_category=gmv_categories[0],
+        top_gmv_value=float(top_gmv['gmv'].iloc[0]),
+        lowest_freight_category=gmv_categories[lowest],
+        lowest_freight_ratio=float(gmv_freight[lowest]),
+        top_volume_category=volume_categories[0] if len(volume_categories) > 0 else "N/A",
+        high_freight_categories=tuple((freight_categories[i], float(freight_ratio[i])) for i in high),
+        top5_overlap=len(set(volume_categories[:5]) & set(gmv_categories[:5])),
+    )
+
+
+@dataclass(frozen=True)
+class RfmSummary:
+    """KPI RFM dan persentase customer per segment (Pertanyaan 3)"""
+    n_customers: int
+    avg_recency: float
+    avg_frequency: float
+    avg_monetary: float
+    # (segment, persentase customer) dengan urutan RFM_SEGMENT_ORDER, termasuk segment kosong (0%)
+    segment_pct: tuple = ()
+
+    def pct(self, segment):
+        """Persentase customer pada `segment` (0 jika segment tidak ada)"""
+        return dict(self.segment_pct).get(segment, 0.0)
+
+
+def summarize_rfm(rfm_df, segment_df):
+    """RfmSummary dari hasil `analyze_rfm` (segment_df tidak diubah)"""
+    counts = segment_df.set_index(segment_df['customer_segment'].astype(str))['customer_count']
+    counts = counts.reindex(RFM_SEGMENT_ORDER, fill_value=0).to_numpy(dtype=np.float64)
+    total = counts.sum()
+    pct = counts / total * 100 if total > 0 else np.zeros(len(counts))
+
+    return RfmSummary(
+        n_customers=len(rfm_df),
+        avg_recency=_mean(rfm_df['recency'].to_numpy(dtype=np.float64)),
+        avg_frequency=_mean(rfm_df['frequency'].to_numpy(dtype=np.float64)),
+        avg_monetary=_mean(rfm_df['monetary'].to_numpy(dtype=np.float64)),
+        segment_pct=tuple(zip(RFM_SEGMENT_ORDER, pct.tolist())),
+    )
+
+
+@dataclass(frozen=True)
+class GeospatialSummary:
+    """KPI gap supply-demand per kota (Pertanyaan 4)
+
+    `top_cities` / `top_seller_cities` (10 kota teratas) dipakai bersama oleh chart dan insight;
+    perlakukan sebagai read-only.
+    """
+    cities_with_sellers: int
+    cities_without_sellers: int
+    avg_gap: float
+    high_gap_cities: int
+    very_high_gap_cities: int
+    top_cities: pd.DataFrame
+    top_seller_cities: pd.DataFrame
+    top_gap_city: str = None
+    top_gap_state: str = None
+    top_gap_ratio: float = 0.0
+    top_gap_orders: float = 0.0
+    top_gap_sellers: float = 0.0
+
+    @property
+    def has_data(self):
+        return len(self.top_cities) > 0 and len(self.top_seller_cities) > 0 and self.top_gap_city is not None
+
+
+def summarize_geospatial(customer_by_city, seller_by_city, gap_df, gap_with_sellers, gap_without_sellers):
+    """GeospatialSummary dari hasil `prepare_geospatial_data`"""
+    orders_per_seller = gap_with_sellers['orders_per_seller'].to_numpy(dtype=np.float64)
+    summary = dict(
+        cities_with_sellers=len(gap_with_sellers),
+        cities_without_sellers=len(gap_without_sellers),
+        avg_gap=_mean(orders_per_seller) if len(orders_per_seller) else 0.0,
+        high_gap_cities=int(np.count_nonzero(orders_per_seller > GAP_HIGH_THRESHOLD)),
+        very_high_gap_cities=int(np.count_nonzero(orders_per_seller > GAP_VERY_HIGH_THRESHOLD)),
+        top_cities=customer_by_city.nlargest(10, 'order_count'),
+        top_seller_cities=seller_by_city.nlargest(10, 'seller_count'),
+    )
+    if len(gap_df) > 0:
+        top_gap = gap_df.iloc[int(gap_df['gap_ratio'].to_numpy().argmax())]
+        summary.update(
+            top_gap_city=top_gap['customer_city'],
+            top_gap_state=top_gap['customer_state'],
+            top_gap_ratio=float(top_gap['gap_ratio']),
+            top_gap_orders=float(top_gap['order_count']),
+            top_gap_sellers=float(top_gap['seller_count']),
+        )
+    return GeospatialSummary(**summary)
+
+
+@dataclass(frozen=True)
+class DeliverySummary:
+    """KPI performa pengiriman (lead time dan keterlambatan)"""
+    delivered_orders: int
+    late_orders: int
+    late_rate: float
+    median_days: float
+    p90_days: float
+    median_approval_days: float
+    median_carrier_days: float
+    median_customer_days: float
+    median_delay_days: float
+    # (nama, rasio terlambat, order terkirim) kelompok dengan rasio terlambat tertinggi
+    worst_state: tuple = None
+    worst_category: tuple = None
+
+
+def summarize_delivery(delivery_stats, state_ranking, category_ranking):
+    """DeliverySummary dari hasil `analyze_delivery` dan `delivery_group_ranking` (state, kategori)"""
+    total = delivery_stats.iloc[0]
+
+    def worst(ranking):
+        if len(ranking) == 0:
+            return None
+        row = ranking.iloc[0]
+        return row['group'], float(row['late_rate']), int(row['orders'])
+
+    return DeliverySummary(
+        delivered_orders=int(total['orders']),
+        late_orders=int(total['late_orders']),
+        late_rate=float(total['late_rate']),
+        median_days=float(total['delivery_days_p50']),
+        p90_days=float(total['delivery_days_p90']),
+        median_approval_days=float(total['approval_days_p50']),
+        median_carrier_days=float(total['carrier_days_p50']),
+        median_customer_days=float(total['customer_days_p50']),
+        median_delay_days=float(total['delivery_delay_days_p50']),
+        worst_state=worst(state_ranking),
+        worst_category=worst(category_ranking),
+    )
@@ -0,0 +1,232 @@
+"""Load test dashboard: N user simultan menjalankan dashboard.py secara headless (Streamlit AppTest)
+
+Jalankan:
+    python dashboard/loadtest.py [n_orders] [users] [--json]
+    python dashboard/loadtest.py 200000 1,2,4,8
+
+Dataset sintetis (lihat `synthetic.py`) ditulis ke folder sementara bersama salinan modul
+dashboard, lalu semua session dijalankan di satu proses worker terpisah. Seperti satu replica
+Streamlit, session-session tersebut berbagi cache proses (`st.cache_data`, `st.cache_resource`)
+dan cache figure di disk. Tidak ada koneksi jaringan.
+
+Setiap user menjalankan skenario interaksi (lihat USER_SCRIPTS) di thread sendiri. Setiap
+interaksi widget = satu rerun script. Membuka expander dan scroll ke peta tidak memicu rerun
+di Streamlit (semua section, termasuk peta, sudah dirender di setiap rerun), jadi biayanya
+sudah termasuk dalam latensi rerun.
+"""
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+DASHBOARD_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_USERS = [1, 2, 4, 8]
+RERUN_TIMEOUT_S = 600
+
+
+def _widget(at, kind, label):
+    """Widget AppTest berdasarkan jenis (radio, slider, ...) dan label"""
+    return next(widget for widget in getattr(at, kind) if widget.label == label)
+
+
+def _change_date_range(at, rng, context):
+    """Pilih rentang tanggal acak (minimal 3 bulan) di sidebar"""
+    date_input = _widget(at.sidebar, 'date_input', "Pilih Rentang Tanggal")
+    min_date, max_date = context['date_bounds']
+    total_days = (max_date - min_date).days
+    start_offset = rng.randint(0, max(0, total_days - 90))
+    end_offset = rng.randint(min(total_days, start_offset + 90), total_days)
+    date_input.set_value((min_date + timedelta(days=start_offset), min_date + timedelta(days=end_offset)))
+
+
+def _change_granularity(at, rng, context):
+    _widget(at, 'radio', "Granularitas Tren").set_value(rng.choice(['Harian', 'Mingguan', 'Bulanan']))
+
+
+def _change_cohort_metric(at, rng, context):
+    _widget(at, 'radio', "Metric Cohort").set_value(rng.choice(["Retention (%)", "Customers", "Orders", "GMV (R$)"]))
+
+
+def _change_radius(at, rng, context):
+    _widget(at, 'slider', "Radius (km)").set_value(rng.choice(range(10, 301, 10)))
+
+
+def _search_customer(at, rng, context):
+    _widget(at, 'text_input', "Customer Unique ID atau Order ID").set_value(rng.choice(context['order_ids']))
+
+
+# Skenario interaksi user: daftar aksi, setiap aksi diikuti satu rerun
+USER_SCRIPTS = {
+    'explorer': [_change_date_range, _change_granularity, _change_cohort_metric, _change_radius, _change_date_range],
+    'analyst': [_change_granularity, _change_granularity, _search_customer, _change_date_range, _search_customer],
+    'geo': [_change_date_range, _change_radius, _change_radius, _change_radius],
+}
+
+
+def _rss_bytes():
+    """Resident set size proses saat ini (Linux: /proc, lainnya: puncak RSS)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _run_session(script_path, script, seed, sample_order_ids, latencies, errors, sessions):
+    """Satu user: load dashboard lalu jalankan aksi-aksi script, catat latensi setiap rerun
+
+    Session yang selesai masuk ke `sessions`. Exception di thread session (misal widget tidak
+    ditemukan karena label berubah) dicatat di `errors`, bukan hilang bersama stderr worker.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    try:
+        rng = random.Random(seed)
+        at = AppTest.from_file(script_path, default_timeout=RERUN_TIMEOUT_S)
+        start = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - start)
+
+        # Batas tanggal = nilai default date_input (seluruh rentang data)
+        context = {
+            'date_bounds': tuple(_widget(at.sidebar, 'date_input', "Pilih Rentang Tanggal").value),
+            'order_ids': sample_order_ids,
+        }
+
+        for action in script:
+            action(at, rng, context)
+            start = time.perf_counter()
+            at.run()
+            latencies.append(time.perf_counter() - start)
+    except Exception as e:
+        # Lokasi ikut dicatat: sebagian exception (misal StopIteration dari `_widget`) tanpa pesan
+        frame = traceback.extract_tb(e.__traceback__)[-1]
+        errors.append(f"{type(e).__name__} di {frame.name} (baris {frame.lineno}): {e}")
+        return
+
+    errors.extend(exception.message for exception in at.exception)
+    sessions.append(at)
+
+
+def run_load_test(script_path, users=DEFAULT_USERS, sample_order_ids=(), seed=0):
+    """Jalankan load test untuk setiap jumlah user di `users`, kembalikan list hasil per N
+
+    Harus dijalankan dari folder berisi modul dashboard yang ingin diuji (lihat `main`).
+    """
+    import numpy as np
+
+    # Session pertama mengisi cache proses dan cache figure (setara warm-up setelah deploy)
+    warmup_latencies, warmup_errors = [], []
+    _run_session(script_path, [], seed, list(sample_order_ids), warmup_latencies, warmup_errors, [])
+
+    results = []
+    script_names = list(USER_SCRIPTS)
+    for n_users in users:
+        latencies, errors, sessions = [], [], []
+        rss_before = _rss_bytes()
+        threads = [
+            threading.Thread(target=_run_session, args=(
+                script_path, USER_SCRIPTS[script_names[i % len(script_names)]], seed + n_users * 1000 + i,
+                list(sample_order_ids), latencies, errors, sessions
+            ))
+            for i in range(n_users)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        rss_after = _rss_bytes()
+
+        latencies = np.array(latencies)
+        results.append({
+            'users': n_users,
+            'sessions_completed': len(sessions),
+            'reruns': len(latencies),
+            'throughput_rps': len(latencies) / elapsed,
+            'p50_s': float(np.percentile(latencies, 50)) if len(latencies) else float('nan'),
+            'p95_s': float(np.percentile(latencies, 95)) if len(latencies) else float('nan'),
+            'p99_s': float(np.percentile(latencies, 99)) if len(latencies) else float('nan'),
+            'rss_mb': rss_after / 1024 ** 2,
+            # Session masih hidup (list `sessions`) saat RSS diukur
+            'mem_per_session_mb': max(0, rss_after - rss_before) / 1024 ** 2 / max(len(sessions), 1),
+            'errors': len(errors) + len(warmup_errors),
+            'error_messages': sorted(set(errors + warmup_errors)),
+        })
+        del sessions
+    return results
+
+
+def _prepare_workspace(n_orders):
+    """Folder sementara berisi dataset sintetis dan salinan modul dashboard"""
+    from synthetic import write_dataset
+
+    root = tempfile.mkdtemp(prefix='dashboard_loadtest_')
+    dataset = write_dataset(root, n_orders=n_orders)
+    for filename in os.listdir(DASHBOARD_DIR):
+        if filename.endswith('.py'):
+            shutil.copy(os.path.join(DASHBOARD_DIR, filename), os.path.join(root, 'dashboard', filename))
+    sample_order_ids = dataset['orders_enriched']['order_id'].sample(50, random_state=0).tolist()
+    return root, sample_order_ids
+
+
+def main(argv):
+    as_json = '--json' in argv
+    args = [arg for arg in argv if not arg.startswith('--')]
+    n_orders = int(args[0]) if len(args) > 0 else 100_000
+    users = [int(n) for n in args[1].split(',')] if len(args) > 1 else DEFAULT_USERS
+
+    root, sample_order_ids = _prepare_workspace(n_orders)
+    try:
+        # Worker dijalankan dari salinan modul agar `import utils` dst. membaca dataset sintetis
+        worker_dir = os.path.join(root, 'dashboard')
+        output = subprocess.run(
+            [sys.executable, os.path.join(worker_dir, 'loadtest.py'), '--worker', json.dumps({
+                'users': users, 'sample_order_ids': sample_order_ids
+            })],
+            cwd=worker_dir, capture_output=True, text=True, check=True
+        ).stdout
+        results = json.loads(output.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if as_json:
+        print(json.dumps({'n_orders': n_orders, 'results': results}, indent=2))
+    else:
+        print(f"n_orders={n_orders:,}")
+        columns = ['users', 'sessions_completed', 'reruns', 'throughput_rps', 'p50_s', 'p95_s', 'p99_s', 'rss_mb', 'mem_per_session_mb', 'errors']
+        print(' '.join(f"{column:>18}" for column in columns))
+        for row in results:
+            print(' '.join(f"{row[column]:>18.3f}" if isinstance(row[column], float) else f"{row[column]:>18}"
+                           for column in columns))
+        for message in sorted({message for row in results for message in row['error_messages']}):
+            print(f"error: {message}")
+    return 1 if any(row['errors'] or row['sessions_completed'] < row['users'] for row in results) else 0
+
+
+def _worker(config):
+    """Entry point proses worker (dipanggil oleh `main` dari folder salinan)"""
+    import logging
+
+    # AppTest mencetak warning "missing ScriptRunContext" untuk setiap thread session
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    config = json.loads(config)
+    script_path = os.path.join(DASHBOARD_DIR, 'dashboard.py')
+    results = run_load_test(script_path, config['users'], config['sample_order_ids'])
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--worker':
+        _worker(sys.argv[2])
+    else:
+        sys.exit(main(sys.argv[1:]))
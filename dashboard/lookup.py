@@ -0,0 +1,89 @@
+"""Index lookup customer dan order untuk pencarian cepat di dashboard
+
+Orders disalin sekali dalam urutan customer sehingga semua order milik satu customer
+berada pada range baris kontigu. Hash index (pandas Index) memetakan
+`customer_unique_id` ke range tersebut dan `order_id` ke posisi barisnya, jadi lookup
+tidak perlu scan `orders_df`.
+"""
+import numpy as np
+import pandas as pd
+
+
+class OrderLookupIndex:
+    """Hash index customer_unique_id / order_id -> range baris pada salinan orders terurut per customer"""
+
+    def __init__(self, orders_df):
+        codes, customer_ids = pd.factorize(orders_df['customer_unique_id'])
+        row_order = np.lexsort((orders_df['order_purchase_timestamp'].to_numpy(), codes))
+        sorted_codes = codes[row_order]
+
+        self.orders = orders_df.iloc[row_order].reset_index(drop=True)
+        self.row_customer = sorted_codes
+        self.customer_index = pd.Index(customer_ids)
+        self.customer_start = np.searchsorted(sorted_codes, np.arange(len(customer_ids)), side='left')
+        self.customer_end = np.searchsorted(sorted_codes, np.arange(len(customer_ids)), side='right')
+        self.order_index = pd.Index(self.orders['order_id'])
+
+        # Paksa pembuatan hash table sekarang (pandas membangunnya lazy saat lookup pertama)
+        self.customer_index.get_indexer(customer_ids[:1])
+        self.order_index.get_indexer(self.orders['order_id'].iloc[:1])
+
+    def __len__(self):
+        return len(self.customer_index)
+
+    def customer_of_order(self, order_id):
+        """customer_unique_id pemilik order_id, atau None jika tidak ditemukan"""
+        try:
+            position = self.order_index.get_loc(order_id)
+        except KeyError:
+            return None
+        return self.customer_index[self.row_customer[position]]
+
+    def lookup_customer(self, customer_id):
+        """Semua order milik satu customer (urut waktu pembelian), DataFrame kosong jika tidak ditemukan"""
+        try:
+            code = self.customer_index.get_loc(customer_id)
+        except KeyError:
+            return self.orders.iloc[0:0]
+        return self.orders.iloc[self.customer_start[code]:self.customer_end[code]]
+
+    def lookup_customers(self, customer_ids):
+        """Batch lookup: order milik banyak customer sekaligus (id yang tidak ditemukan diabaikan)"""
+        codes = self.customer_index.get_indexer(pd.Index(customer_ids))
+        codes = codes[codes >= 0]
+        starts = self.customer_start[codes]
+        counts = self.customer_end[codes] - starts
+        rows = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return self.orders.iloc[rows]
+
+    def resolve_ids(self, ids):
+        """Petakan daftar id (customer_unique_id atau order_id) ke customer_unique_id unik
+
+        Returns: (customer_ids yang ditemukan, id yang tidak ditemukan)
+        """
+        ids = pd.Index(ids)
+        customer_codes = self.customer_index.get_indexer(ids)
+        order_positions = self.order_index.get_indexer(ids)
+
+        resolved = np.where(
+            customer_codes >= 0, customer_codes,
+            np.where(order_positions >= 0, self.row_customer[np.maximum(order_positions, 0)], -1)
+        )
+        found_codes = pd.unique(resolved[resolved >= 0])
+        return self.customer_index[found_codes].tolist(), ids[resolved < 0].tolist()
+
+
+def lookup_rfm(rfm_df, customer_ids):
+    """Ambil baris RFM untuk customer tertentu
+
+    `analyze_rfm` menghasilkan rfm_df terurut berdasarkan customer_unique_id (hasil groupby),
+    sehingga lookup cukup dengan binary search tanpa membangun index setiap rerun.
+    """
+    sorted_ids = rfm_df['customer_unique_id'].to_numpy()
+    customer_ids = np.asarray(customer_ids, dtype=object)
+    if len(sorted_ids) == 0 or len(customer_ids) == 0:
+        return rfm_df.iloc[0:0]
+
+    positions = np.minimum(np.searchsorted(sorted_ids, customer_ids), len(sorted_ids) - 1)
+    found = sorted_ids[positions] == customer_ids
+    return rfm_df.iloc[positions[found]]
@@ -0,0 +1,60 @@
+"""Pola waktu pembelian: heatmap hari dalam minggu x jam (orders dan GMV)
+
+Order dipadatkan sekali menjadi counter per hari pembelian: matriks (hari, 168 sel) dengan
+sel = hari dalam minggu * 24 + jam. Heatmap untuk rentang tanggal mana pun cukup dihitung dengan
+menjumlahkan slice baris counter, tanpa menghitung ulang `.dt.dayofweek` / `.dt.hour` untuk
+setiap order terfilter.
+"""
+import numpy as np
+import pandas as pd
+
+from seller_performance import _day_code, _window_days
+
+DAY_NAMES = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+HOURS_PER_WEEK = 7 * 24
+
+
+class PurchasePatternBase:
+    """Counter orders / GMV per hari pembelian (baris, terurut) x sel hari-jam (168 kolom)"""
+
+    def __init__(self, days, orders, gmv):
+        self.days = days
+        self.orders = orders
+        self.gmv = gmv
+
+    def __len__(self):
+        return len(self.days)
+
+
+def build_purchase_pattern_base(orders_df):
+    """Bangun PurchasePatternBase dari orders (sekali per dataset)"""
+    orders = orders_df.drop_duplicates('order_id')
+    orders = orders[orders['order_purchase_timestamp'].notna()]
+    timestamps = pd.DatetimeIndex(orders['order_purchase_timestamp'])
+    day = _day_code(timestamps)
+    hour = (timestamps.to_numpy(dtype='datetime64[h]').astype(np.int64) - day * 24)
+    # 1970-01-01 adalah hari Kamis: geser agar Senin = 0
+    cell = ((day + 3) % 7) * 24 + hour
+
+    days, day_index = np.unique(day, return_inverse=True)
+    key = day_index * HOURS_PER_WEEK + cell
+    size = len(days) * HOURS_PER_WEEK
+    order_counts = np.bincount(key, minlength=size).reshape(len(days), HOURS_PER_WEEK)
+    gmv = np.bincount(key, weights=orders['order_gmv'].fillna(0).to_numpy(), minlength=size)
+    return PurchasePatternBase(days, order_counts, gmv.reshape(len(days), HOURS_PER_WEEK))
+
+
+def analyze_purchase_pattern(pattern_base, start_date, end_date):
+    """Matriks orders dan GMV (baris: hari Senin-Minggu, kolom: jam 0-23) dalam rentang terpilih
+
+    Bulan masuk rentang jika tanggal awal bulannya berada di antara start_date dan end_date
+    (sama dengan filter `order_date` di sidebar).
+    """
+    first_day, last_day = _window_days(start_date, end_date)
+    lo = np.searchsorted(pattern_base.days, first_day, side='left')
+    hi = max(lo, np.searchsorted(pattern_base.days, last_day, side='right'))
+
+    def as_matrix(counters):
+        return pd.DataFrame(counters[lo:hi].sum(axis=0).reshape(7, 24), index=DAY_NAMES, columns=range(24))
+
+    return as_matrix(pattern_base.orders), as_matrix(pattern_base.gmv)
@@ -0,0 +1,213 @@
+"""Leaderboard performa seller (GMV, orders, freight ratio, hari aktif) untuk rentang tanggal terpilih
+
+Order items dipadatkan sekali menjadi baris unik (seller, hari pembelian) terurut per hari,
+sehingga agregat semua seller untuk rentang tanggal mana pun cukup dihitung dari satu slice
+baris dengan `np.bincount`. Top-k / bottom-k diambil dengan `np.argpartition` (partial sort),
+dan drill-down per seller memakai urutan kedua (per seller lalu hari) tanpa scan order items.
+Urutan kedua yang sama dipakai untuk menghitung seller aktif per rentang (supply gap analysis).
+"""
+import numpy as np
+import pandas as pd
+
+from cohort import _month_code, _month_start
+
+# Metric yang bisa dipakai untuk ranking leaderboard
+SELLER_METRICS = ['gmv', 'orders', 'items', 'freight_ratio', 'active_days']
+EPOCH_DAY = np.datetime64('1970-01-01', 'D')
+
+
+def _day_code(timestamps):
+    """Kode hari integer (hari sejak 1970-01-01) dari Series/DatetimeIndex timestamp"""
+    return pd.DatetimeIndex(timestamps).to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+class SellerDayBase:
+    """Baris unik (seller, hari) terurut per hari, plus urutan per seller untuk drill-down
+
+    `activity_key` = seller * n_days + (hari - day_min) dalam urutan per seller (terurut naik),
+    sehingga aktivitas semua seller dalam satu rentang bisa dicek dengan dua `np.searchsorted`.
+    """
+
+    def __init__(self, sellers, day, seller, gmv, price, freight, orders, items, by_seller, seller_offsets,
+                 activity_key, day_min, n_days):
+        self.sellers = sellers
+        self.day = day
+        self.seller = seller
+        self.gmv = gmv
+        self.price = price
+        self.freight = freight
+        self.orders = orders
+        self.items = items
+        self.by_seller = by_seller
+        self.seller_offsets = seller_offsets
+        self.activity_key = activity_key
+        self.day_min = day_min
+        self.n_days = n_days
+
+    def __len__(self):
+        return len(self.day)
+
+
+def build_seller_day_base(order_items_df, orders_df, sellers_df):
+    """Bangun SellerDayBase dari order items (sekali per dataset)
+
+    Hari diambil dari `order_purchase_timestamp` order; kota/state seller dari sellers_df
+    ('unknown' jika seller tidak ada di sellers_df).
+    """
+    orders = orders_df.drop_duplicates('order_id')
+    order_codes = pd.Index(orders['order_id']).get_indexer(order_items_df['order_id'])
+    located = order_codes >= 0
+    items = order_items_df[located]
+    order_codes = order_codes[located]
+    order_day = _day_code(orders['order_purchase_timestamp'])[order_codes]
+
+    seller_codes, seller_ids = pd.factorize(items['seller_id'], sort=True)
+    sellers = pd.DataFrame({'seller_id': seller_ids})
+    seller_info = sellers_df.drop_duplicates('seller_id').set_index('seller_id')
+    for col in ['seller_city', 'seller_state']:
+        sellers[col] = seller_info[col].reindex(seller_ids).fillna('unknown').to_numpy()
+
+    if len(order_day) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return SellerDayBase(sellers, empty, empty, np.empty(0), np.empty(0), np.empty(0), empty, empty,
+                             empty, np.zeros(len(sellers) + 1, dtype=np.int64), empty, 0, 0)
+
+    day_min = order_day.min()
+    n_days = order_day.max() - day_min + 1
+    key = seller_codes.astype(np.int64) * n_days + (order_day - day_min)
+    unique_keys, inverse = np.unique(key, return_inverse=True)
+    n_rows = len(unique_keys)
+    price = items['price'].fillna(0).to_numpy()
+    freight = items['freight_value'].fillna(0).to_numpy()
+    gmv = np.bincount(inverse, weights=items['item_gmv'].fillna(0).to_numpy(), minlength=n_rows)
+    price = np.bincount(inverse, weights=price, minlength=n_rows)
+    freight = np.bincount(inverse, weights=freight, minlength=n_rows)
+    item_counts = np.bincount(inverse, minlength=n_rows)
+
+    # Jumlah order = order unik per (seller, hari); satu order bisa punya beberapa item dari seller yang sama
+    order_rows = np.unique(inverse.astype(np.int64) * len(orders) + order_codes) // len(orders)
+    order_counts = np.bincount(order_rows, minlength=n_rows)
+
+    seller = unique_keys // n_days
+    day = unique_keys % n_days + day_min
+
+    # unique_keys terurut per (seller, hari): itulah urutan drill-down, offset per seller dari bincount
+    seller_offsets = np.concatenate([[0], np.cumsum(np.bincount(seller, minlength=len(sellers)))])
+    by_day = np.argsort(day, kind='stable')
+    by_seller = np.argsort(by_day, kind='stable')
+
+    return SellerDayBase(sellers, day[by_day], seller[by_day], gmv[by_day], price[by_day], freight[by_day],
+                         order_counts[by_day], item_counts[by_day], by_seller, seller_offsets,
+                         unique_keys, day_min, n_days)
+
+
+def _window_days(start_date, end_date):
+    """Rentang kode hari [lo, hi] yang setara dengan filter `order_date` di sidebar
+
+    `order_date` adalah awal bulan pembelian, jadi bulan masuk rentang jika tanggal awal
+    bulannya berada di antara start_date dan end_date (sama dengan cohort retention).
+    """
+    start_date = pd.Timestamp(start_date)
+    end_date = pd.Timestamp(end_date)
+    first_month = _month_code([start_date])[0] + (0 if start_date.day == 1 else 1)
+    last_month = _month_code([end_date])[0]
+    first_day = _day_code([_month_start(first_month)])[0]
+    last_day = _day_code([_month_start(last_month + 1)])[0] - 1
+    return first_day, last_day
+
+
+def analyze_seller_performance(seller_base, start_date, end_date):
+    """Agregat semua seller (GMV, orders, items, freight ratio, hari aktif) dalam rentang terpilih
+
+    Returns: seller_perf_df dengan satu baris per seller (urut sesuai `seller_base.sellers`,
+    termasuk seller tanpa transaksi dalam rentang).
+    """
+    first_day, last_day = _window_days(start_date, end_date)
+    lo = np.searchsorted(seller_base.day, first_day, side='left')
+    hi = max(lo, np.searchsorted(seller_base.day, last_day, side='right'))
+    seller = seller_base.seller[lo:hi]
+    n_sellers = len(seller_base.sellers)
+
+    seller_perf_df = seller_base.sellers.copy()
+    seller_perf_df['gmv'] = np.bincount(seller, weights=seller_base.gmv[lo:hi], minlength=n_sellers)
+    seller_perf_df['orders'] = np.bincount(seller, weights=seller_base.orders[lo:hi], minlength=n_sellers).astype(np.int64)
+    seller_perf_df['items'] = np.bincount(seller, weights=seller_base.items[lo:hi], minlength=n_sellers).astype(np.int64)
+    price = np.bincount(seller, weights=seller_base.price[lo:hi], minlength=n_sellers)
+    freight = np.bincount(seller, weights=seller_base.freight[lo:hi], minlength=n_sellers)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        seller_perf_df['freight_ratio'] = np.where(price > 0, freight / price, np.nan)
+    seller_perf_df['active_days'] = np.bincount(seller, minlength=n_sellers)
+    return seller_perf_df
+
+
+def analyze_seller_leaderboard(seller_base, start_date, end_date, metric='gmv', k=10, min_orders=5):
+    """Top-k dan bottom-k seller berdasarkan `metric` dalam rentang terpilih
+
+    Hanya seller dengan minimal `min_orders` order dalam rentang yang diranking, agar bottom-k
+    tidak didominasi seller yang hampir tidak aktif.
+    Returns: top_df, bottom_df (masing-masing maksimal k baris, kolom `rank` dimulai dari 1),
+    dan jumlah seller yang diranking.
+    """
+    seller_perf_df = analyze_seller_performance(seller_base, start_date, end_date)
+    values = seller_perf_df[metric].to_numpy(dtype=np.float64)
+    eligible = np.flatnonzero((seller_perf_df['orders'].to_numpy() >= max(1, min_orders)) & ~np.isnan(values))
+    k = min(k, len(eligible))
+    if k == 0:
+        empty = seller_perf_df.iloc[:0].copy()
+        empty.insert(0, 'rank', pd.Series(dtype=np.int64))
+        return empty, empty.copy(), len(eligible)
+
+    eligible_values = values[eligible]
+
+    def ranked(order_values):
+        # Partial sort O(n): hanya k kandidat teratas yang diurutkan penuh
+        candidates = np.argpartition(order_values, k - 1)[:k]
+        candidates = candidates[np.lexsort((eligible[candidates], order_values[candidates]))]
+        ranked_df = seller_perf_df.iloc[eligible[candidates]].reset_index(drop=True)
+        ranked_df.insert(0, 'rank', np.arange(1, k + 1))
+        return ranked_df
+
+    return ranked(-eligible_values), ranked(eligible_values), len(eligible)
+
+
+def analyze_seller_drilldown(seller_base, seller_id, start_date, end_date):
+    """Tren harian satu seller dalam rentang terpilih (kolom order_date, orders, gmv, items, freight_ratio)"""
+    columns = ['order_date', 'orders', 'gmv', 'items', 'freight_ratio']
+    code = seller_base.sellers['seller_id'].searchsorted(seller_id)
+    if code >= len(seller_base.sellers) or seller_base.sellers['seller_id'].iloc[code] != seller_id:
+        return pd.DataFrame(columns=columns)
+
+    rows = seller_base.by_seller[seller_base.seller_offsets[code]:seller_base.seller_offsets[code + 1]]
+    first_day, last_day = _window_days(start_date, end_date)
+    day = seller_base.day[rows]
+    rows = rows[(day >= first_day) & (day <= last_day)]
+
+    price = seller_base.price[rows]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        freight_ratio = np.where(price > 0, seller_base.freight[rows] / price, np.nan)
+    return pd.DataFrame({
+        'order_date': EPOCH_DAY + seller_base.day[rows],
+        'orders': seller_base.orders[rows],
+        'gmv': seller_base.gmv[rows],
+        'items': seller_base.items[rows],
+        'freight_ratio': freight_ratio,
+    }, columns=columns)
+
+
+def analyze_active_sellers(seller_base, start_date, end_date):
+    """seller_id yang menjual minimal satu item dalam rentang terpilih
+
+    Untuk setiap seller, jumlah hari aktif dalam rentang = selisih dua posisi searchsorted pada
+    `activity_key`; biaya O(jumlah seller x log baris), tidak bergantung panjang rentang.
+    """
+    first_day, last_day = _window_days(start_date, end_date)
+    # Clip ke rentang data agar key tidak melewati batas blok seller sebelum/sesudahnya
+    first_offset = max(first_day, seller_base.day_min) - seller_base.day_min
+    last_offset = min(last_day, seller_base.day_min + seller_base.n_days - 1) - seller_base.day_min
+    if first_offset > last_offset:
+        return seller_base.sellers['seller_id'].iloc[:0]
+
+    block = np.arange(len(seller_base.sellers), dtype=np.int64) * seller_base.n_days
+    first = np.searchsorted(seller_base.activity_key, block + first_offset, side='left')
+    last = np.searchsorted(seller_base.activity_key, block + last_offset, side='right')
+    return seller_base.sellers['seller_id'][last > first]
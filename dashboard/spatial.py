@@ -0,0 +1,113 @@
+"""Spatial index (k-d tree) untuk query radius dan nearest-k atas centroid zip code"""
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Bounding box Brasil yang dipakai konsisten di seluruh analisis geospatial
+BRAZIL_LAT_RANGE = (-35, 5)
+BRAZIL_LNG_RANGE = (-75, -30)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Jarak great-circle (km) secara vectorized antara dua kumpulan koordinat (derajat)"""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _to_unit_xyz(lat, lng):
+    """Konversi lat/lng (derajat) ke koordinat 3D di unit sphere"""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lng = np.radians(np.asarray(lng, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)])
+
+
+def _km_to_chord(distance_km):
+    return 2 * np.sin(np.asarray(distance_km) / (2 * EARTH_RADIUS_KM))
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+def build_zip_centroids(geolocation_df):
+    """Centroid (rata-rata lat/lng) per zip code prefix, hanya titik di dalam wilayah Brasil"""
+    geo = geolocation_df[
+        geolocation_df['geolocation_lat'].between(*BRAZIL_LAT_RANGE) &
+        geolocation_df['geolocation_lng'].between(*BRAZIL_LNG_RANGE)
+    ].assign(geolocation_zip_code_prefix=lambda df: df['geolocation_zip_code_prefix'].astype(str))
+    centroids = geo.groupby('geolocation_zip_code_prefix', as_index=False).agg({
+        'geolocation_lat': 'mean',
+        'geolocation_lng': 'mean'
+    })
+    return centroids
+
+
+def zip_coordinates(zip_prefixes, zip_centroids):
+    """Lookup lat/lng centroid untuk array zip prefix (NaN jika tidak ditemukan)"""
+    centroid_lookup = zip_centroids.set_index('geolocation_zip_code_prefix')
+    coords = centroid_lookup.reindex(pd.Index(np.asarray(zip_prefixes).astype(str)))
+    return coords['geolocation_lat'].values, coords['geolocation_lng'].values
+
+
+class SpatialIndex:
+    """k-d tree atas titik (lat, lng)
+
+    Titik disimpan sebagai koordinat 3D di unit sphere sehingga jarak chord di tree
+    berurutan sama dengan jarak great-circle; radius dan hasil jarak dikonversi
+    dari/ke kilometer. Semua query vectorized untuk banyak titik sekaligus.
+    """
+
+    def __init__(self, lat, lng):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self.tree = cKDTree(_to_unit_xyz(self.lat, self.lng))
+
+    def __len__(self):
+        return len(self.lat)
+
+    def query_radius(self, lat, lng, radius_km):
+        """Jumlah titik index dalam radius `radius_km` dari setiap titik query (0 untuk koordinat NaN)"""
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        counts = np.zeros(len(lat), dtype=np.int64)
+        valid = ~(np.isnan(lat) | np.isnan(lng))
+        if len(self) == 0 or not valid.any():
+            return counts
+
+        counts[valid] = self.tree.query_ball_point(
+            _to_unit_xyz(lat[valid], lng[valid]), _km_to_chord(radius_km), return_length=True
+        )
+        return counts
+
+    def query_nearest(self, lat, lng, k=1):
+        """Jarak (km) dan posisi k titik index terdekat untuk setiap titik query, shape (n, k)"""
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        k = min(k, len(self))
+        distances = np.full((len(lat), k), np.nan)
+        indices = np.full((len(lat), k), -1, dtype=np.int64)
+        valid = ~(np.isnan(lat) | np.isnan(lng))
+        if k == 0 or not valid.any():
+            return distances, indices
+
+        chord, idx = self.tree.query(_to_unit_xyz(lat[valid], lng[valid]), k=k)
+        distances[valid] = _chord_to_km(chord).reshape(-1, k)
+        indices[valid] = np.asarray(idx).reshape(-1, k)
+        return distances, indices
+
+
+def build_seller_spatial_index(sellers_df, zip_centroids):
+    """Bangun spatial index dengan satu titik per seller di centroid zip-nya
+
+    Seller tanpa centroid (zip tidak ada di geolocation) tidak dimasukkan.
+    """
+    seller_lat, seller_lng = zip_coordinates(sellers_df['seller_zip_code_prefix'], zip_centroids)
+    located = ~np.isnan(seller_lat)
+    index = SpatialIndex(seller_lat[located], seller_lng[located])
+    index.seller_ids = sellers_df['seller_id'].values[located]
+    return index
@@ -0,0 +1,199 @@
+"""Precompute spekulatif: analisis yang kemungkinan diminta berikutnya dihitung di background
+
+Setelah satu rerun dashboard selesai, kandidat view berikutnya untuk session tersebut dijadwalkan
+ke satu worker thread yang mengisi AnalysisCache (lihat analysis_cache.py):
+1. variasi lain untuk filter aktif (tren harian / mingguan),
+2. semua analisis untuk preset rentang tanggal (1 / 3 / 12 bulan terakhir, seluruh data).
+
+Batasan agar tidak mengganggu request foreground:
+- satu thread, dan hanya berjalan saat tidak ada rerun foreground yang aktif (`foreground()`),
+- duty cycle CPU: setelah task selama t detik, worker tidur t * (1 / cpu_fraction - 1) detik,
+- hasil spekulatif hanya disimpan jika masih muat di budget cache (tidak mengeluarkan entry lain),
+- task untuk versi dataset yang dikeluarkan registry dibatalkan (`cancel_version`),
+- satu antrian per session, dijalankan bergiliran (round-robin) antar session; jadwal baru
+  (filter berubah) hanya membatalkan task lama session yang sama yang belum berjalan. Task yang
+  sedang berjalan (satu analisis) diselesaikan karena tidak bisa dihentikan di tengah operasi pandas.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import date
+
+from analysis_cache import run_analysis, analysis_key
+
+SPECULATIVE_ENABLED = os.environ.get('DASHBOARD_SPECULATIVE', '1') != '0'
+SPECULATIVE_CPU_FRACTION = float(os.environ.get('DASHBOARD_SPECULATIVE_CPU', 0.5))
+
+# Preset rentang tanggal di sidebar: label -> jumlah bulan terakhir (None = seluruh data). Dalam bulan,
+# bukan hari: `order_date` adalah awal bulan dan semua filter memakai aturan "awal bulan dalam rentang"
+DATE_PRESETS = {
+    '1 bulan terakhir': 1,
+    '3 bulan terakhir': 3,
+    '12 bulan terakhir': 12,
+    'Semua data': None,
+}
+
+# Analisis per rentang, urutan sama dengan urutan section di dashboard
+WINDOW_ANALYSES = [
+    'filtered_orders', 'monthly_trends', 'filtered_order_items', 'category_performance',
+    'freight_per_km', 'freight_per_km_state_pair', 'rfm', 'active_sellers', 'geospatial',
+]
+# Variasi widget untuk rentang aktif yang belum tentu sudah dihitung oleh rerun
+CURRENT_WINDOW_ANALYSES = ['trends_day', 'trends_week']
+
+
+def preset_range(months, min_date, max_date):
+    """(start_date, end_date) untuk preset `months` bulan terakhir sampai max_date, dibatasi min_date
+
+    start_date = awal bulan, `months - 1` bulan sebelum bulan max_date (bulan max_date ikut dihitung).
+    """
+    if months is None:
+        return min_date, max_date
+    index = max_date.year * 12 + max_date.month - 1 - (months - 1)
+    return max(min_date, date(index // 12, index % 12 + 1, 1)), max_date
+
+
+def speculative_candidates(start_date, end_date, min_date, max_date, analyses=None):
+    """List (nama analisis, start_date, end_date) urut dari yang paling mungkin diminta berikutnya"""
+    analyses = WINDOW_ANALYSES if analyses is None else analyses
+    candidates = [(name, start_date, end_date) for name in CURRENT_WINDOW_ANALYSES]
+    windows = []
+    for months in DATE_PRESETS.values():
+        window = preset_range(months, min_date, max_date)
+        if window != (start_date, end_date) and window not in windows:
+            windows.append(window)
+    for window_start, window_end in windows:
+        candidates.extend((name, window_start, window_end) for name in analyses)
+    return candidates
+
+
+class SpeculativePrecomputer:
+    """Satu worker thread (daemon) yang menjalankan antrian analisis spekulatif per session ke `cache`"""
+
+    def __init__(self, cache, cpu_fraction=SPECULATIVE_CPU_FRACTION):
+        self.cache = cache
+        self.cpu_fraction = cpu_fraction
+        self._condition = threading.Condition()
+        # session id -> deque task; urutan = giliran berikutnya (round-robin)
+        self._queues = OrderedDict()
+        self._generation = 0
+        self._foreground = 0
+        self._running = False
+        self._thread = None
+        self.completed = 0
+        self.cancelled = 0
+        self.errors = 0
+        self.busy_s = 0.0
+
+    def schedule(self, session_id, data, dataset_version, candidates):
+        """Ganti antrian `session_id` dengan `candidates` (lihat speculative_candidates)
+
+        Hanya task lama session yang sama yang dibatalkan. Kandidat yang sudah ada di cache
+        dilewati. `data` berisi objek dataset yang sudah dimuat (lihat ANALYSES di analysis_cache.py).
+        """
+        tasks = [(data, dataset_version, name, start_date, end_date)
+                 for name, start_date, end_date in candidates
+                 if not self.cache.contains(analysis_key(dataset_version, name, start_date, end_date))]
+        with self._condition:
+            self.cancelled += len(self._queues.pop(session_id, ()))
+            if tasks:
+                self._queues[session_id] = deque(tasks)
+            self._generation += 1
+            self._condition.notify_all()
+            if self._thread is None and tasks:
+                self._thread = threading.Thread(target=self._run, name='speculative-precompute', daemon=True)
+                self._thread.start()
+        return len(tasks)
+
+    def cancel(self, session_id=None):
+        """Batalkan task `session_id` (semua session jika None) yang belum berjalan"""
+        with self._condition:
+            session_ids = list(self._queues) if session_id is None else [session_id]
+            for sid in session_ids:
+                self.cancelled += len(self._queues.pop(sid, ()))
+            self._generation += 1
+
+    def cancel_version(self, dataset_version):
+        """Batalkan task semua session untuk `dataset_version` (dataset dikeluarkan dari registry)
+
+        Task memegang referensi ke DataFrame dataset; tanpa ini memorinya tetap terpakai sampai
+        antrian habis walaupun registry sudah mengeluarkan dataset tersebut.
+        """
+        with self._condition:
+            for session_id, tasks in list(self._queues.items()):
+                kept = deque(task for task in tasks if task[1] != dataset_version)
+                self.cancelled += len(tasks) - len(kept)
+                if kept:
+                    self._queues[session_id] = kept
+                else:
+                    del self._queues[session_id]
+            self._generation += 1
+
+    @contextmanager
+    def foreground(self):
+        """Tandai rerun foreground aktif; worker tidak memulai task baru selama ada yang aktif"""
+        with self._condition:
+            self._foreground += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._foreground -= 1
+                self._condition.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """Tunggu sampai antrian kosong dan tidak ada task berjalan; True jika idle sebelum timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._queues or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queues or self._foreground > 0:
+                    self._condition.wait()
+                # Giliran session terdepan, lalu session tersebut pindah ke belakang
+                session_id, tasks = next(iter(self._queues.items()))
+                data, dataset_version, name, start_date, end_date = tasks.popleft()
+                if tasks:
+                    self._queues.move_to_end(session_id)
+                else:
+                    del self._queues[session_id]
+                generation = self._generation
+                self._running = True
+
+            start = time.perf_counter()
+            try:
+                run_analysis(self.cache, data, dataset_version, name, start_date, end_date, speculative=True)
+                self.completed += 1
+            except Exception:
+                # Precompute bersifat opsional; error akan muncul lagi (dan ditampilkan) di foreground
+                self.errors += 1
+            elapsed = time.perf_counter() - start
+            self.busy_s += elapsed
+
+            with self._condition:
+                self._running = False
+                self._condition.notify_all()
+                # Duty cycle; dibangunkan lebih awal jika ada jadwal baru
+                pause = elapsed * (1 / self.cpu_fraction - 1)
+                if pause > 0 and generation == self._generation:
+                    self._condition.wait(pause)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'sessions': len(self._queues),
+                'queued': sum(len(tasks) for tasks in self._queues.values()),
+                'completed': self.completed,
+                'cancelled': self.cancelled,
+                'errors': self.errors,
+                'busy_s': self.busy_s,
+            }
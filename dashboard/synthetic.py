@@ -0,0 +1,217 @@
+"""Generator dataset sintetis Olist-style (skala bisa diatur) untuk benchmark dan load testing
+
+Struktur kolom mengikuti file hasil export notebook (`orders_enriched.csv`,
+`order_items_products.csv`) dan dataset mentah `geolocation_dataset.csv` / `sellers_dataset.csv`.
+
+Contoh:
+    python dashboard/synthetic.py /tmp/olist_10x 1000000
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils import get_project_root
+
+# Bobot populasi kasar per state + pusat koordinat (lat, lng)
+STATES = {
+    'SP': (0.42, -23.0, -47.5), 'RJ': (0.13, -22.5, -43.0), 'MG': (0.12, -19.5, -44.5),
+    'RS': (0.055, -30.0, -52.5), 'PR': (0.05, -25.0, -51.0), 'SC': (0.037, -27.3, -50.0),
+    'BA': (0.034, -12.5, -41.5), 'DF': (0.021, -15.8, -47.9), 'ES': (0.02, -19.6, -40.6),
+    'GO': (0.02, -16.3, -49.5), 'PE': (0.017, -8.3, -36.5), 'CE': (0.013, -4.5, -39.5),
+    'PA': (0.01, -3.5, -51.5), 'MT': (0.009, -13.0, -56.0), 'MA': (0.007, -5.0, -45.0),
+    'MS': (0.007, -20.5, -54.5), 'PB': (0.005, -7.2, -36.5), 'PI': (0.005, -7.5, -42.5),
+    'RN': (0.005, -5.8, -36.5), 'AL': (0.004, -9.6, -36.5), 'SE': (0.003, -10.6, -37.4),
+    'TO': (0.003, -10.2, -48.3), 'RO': (0.002, -10.9, -62.8), 'AM': (0.0015, -3.4, -62.0),
+    'AC': (0.0008, -9.0, -70.5), 'AP': (0.0007, 1.0, -51.5), 'RR': (0.0005, 2.5, -61.0),
+}
+
+START_DATE = pd.Timestamp('2016-09-01')
+END_DATE = pd.Timestamp('2018-08-31')
+
+
+def _hex_ids(rng, n):
+    """Buat n id heksadesimal 32 karakter (format id dataset Olist)"""
+    high = rng.integers(0, 2**63, size=n, dtype=np.int64)
+    low = rng.integers(0, 2**63, size=n, dtype=np.int64)
+    return np.array([f"{a:016x}{b:016x}" for a, b in zip(high, low)], dtype=object)
+
+
+def _category_names():
+    """Nama kategori (English) dari file translation jika ada"""
+    translation_path = os.path.join(get_project_root(), 'data', 'product_category_name_translation.csv')
+    if os.path.exists(translation_path):
+        translation = pd.read_csv(translation_path, encoding='utf-8-sig')
+        return translation['product_category_name_english'].dropna().unique().tolist()
+    return [f"category_{i:02d}" for i in range(70)]
+
+
+def generate_dataset(n_orders=100_000, n_sellers=3_000, n_zip_prefixes=15_000, seed=42):
+    """Generate dataset sintetis, kembalikan dict nama file -> DataFrame"""
+    rng = np.random.default_rng(seed)
+    state_codes = np.array(list(STATES))
+    state_weights = np.array([v[0] for v in STATES.values()])
+    state_weights = state_weights / state_weights.sum()
+    state_centers = np.array([(v[1], v[2]) for v in STATES.values()])
+
+    # Kota: tiap kota punya pusat di sekitar pusat state-nya
+    n_cities = max(50, n_zip_prefixes // 4)
+    city_state = rng.choice(len(state_codes), size=n_cities, p=state_weights)
+    city_lat = state_centers[city_state, 0] + rng.normal(0, 1.5, n_cities)
+    city_lng = state_centers[city_state, 1] + rng.normal(0, 1.5, n_cities)
+    city_names = np.array([f"cidade {i}" for i in range(n_cities)], dtype=object)
+    # Popularitas kota mengikuti distribusi Zipf (beberapa kota besar, banyak kota kecil)
+    city_weights = 1.0 / np.arange(1, n_cities + 1) ** 0.9
+    city_weights = city_weights / city_weights.sum()
+
+    # Zip prefix: tiap zip berada di dalam satu kota
+    zip_prefixes = np.sort(rng.choice(np.arange(1000, 100_000), size=n_zip_prefixes, replace=False))
+    zip_city = np.concatenate([np.arange(n_cities), rng.choice(n_cities, size=n_zip_prefixes - n_cities, p=city_weights)])
+    rng.shuffle(zip_city)
+    zip_lat = city_lat[zip_city] + rng.normal(0, 0.05, n_zip_prefixes)
+    zip_lng = city_lng[zip_city] + rng.normal(0, 0.05, n_zip_prefixes)
+
+    # Geolocation: beberapa titik per zip prefix (seperti dataset asli)
+    geo_rows = np.repeat(np.arange(n_zip_prefixes), 3)
+    geolocation = pd.DataFrame({
+        'geolocation_zip_code_prefix': zip_prefixes[geo_rows],
+        'geolocation_lat': zip_lat[geo_rows] + rng.normal(0, 0.005, len(geo_rows)),
+        'geolocation_lng': zip_lng[geo_rows] + rng.normal(0, 0.005, len(geo_rows)),
+        'geolocation_city': city_names[zip_city[geo_rows]],
+        'geolocation_state': state_codes[city_state[zip_city[geo_rows]]],
+    })
+
+    zip_weights = city_weights[zip_city]
+    zip_weights = zip_weights / zip_weights.sum()
+
+    # Sellers
+    seller_zip = rng.choice(n_zip_prefixes, size=n_sellers, p=zip_weights)
+    sellers = pd.DataFrame({
+        'seller_id': _hex_ids(rng, n_sellers),
+        'seller_zip_code_prefix': zip_prefixes[seller_zip],
+        'seller_city': city_names[zip_city[seller_zip]],
+        'seller_state': state_codes[city_state[zip_city[seller_zip]]],
+    })
+
+    # Customers: sebagian kecil melakukan repeat order
+    n_customers = max(1, int(n_orders * 0.97))
+    customer_ids = _hex_ids(rng, n_customers)
+    customer_zip = rng.choice(n_zip_prefixes, size=n_customers, p=zip_weights)
+    order_customer = np.concatenate([
+        np.arange(n_customers),
+        rng.integers(0, n_customers, size=n_orders - n_customers)
+    ])[:n_orders]
+
+    # Timestamp pembelian: tren naik, pola mingguan dan jam
+    span_days = (END_DATE - START_DATE).days
+    day = np.floor(span_days * np.sqrt(rng.random(n_orders))).astype(np.int64)
+    hour = rng.choice(24, size=n_orders, p=_hour_weights())
+    seconds = rng.integers(0, 3600, size=n_orders)
+    purchase_ts = START_DATE + pd.to_timedelta(day * 86400 + hour * 3600 + seconds, unit='s')
+
+    approved_ts = purchase_ts + pd.to_timedelta(rng.exponential(0.5, n_orders), unit='D')
+    carrier_ts = approved_ts + pd.to_timedelta(rng.gamma(2.0, 1.5, n_orders), unit='D')
+    delivered_ts = carrier_ts + pd.to_timedelta(rng.gamma(3.0, 3.0, n_orders), unit='D')
+    estimated_ts = (purchase_ts + pd.to_timedelta(rng.integers(15, 35, n_orders), unit='D')).normalize()
+
+    order_ids = _hex_ids(rng, n_orders)
+
+    # Order items: 1-4 item per order
+    items_per_order = rng.choice([1, 2, 3, 4], size=n_orders, p=[0.88, 0.09, 0.02, 0.01])
+    item_order = np.repeat(np.arange(n_orders), items_per_order)
+    n_items = len(item_order)
+    item_seq = np.arange(n_items) - np.repeat(np.cumsum(items_per_order) - items_per_order, items_per_order) + 1
+
+    categories = np.array(_category_names(), dtype=object)
+    category_weights = 1.0 / np.arange(1, len(categories) + 1) ** 1.1
+    category_weights = category_weights / category_weights.sum()
+    n_products = max(100, n_items // 3)
+    product_ids = _hex_ids(rng, n_products)
+    product_category = rng.choice(len(categories), size=n_products, p=category_weights)
+    item_product = rng.integers(0, n_products, size=n_items)
+
+    seller_weights = 1.0 / np.arange(1, n_sellers + 1) ** 0.8
+    seller_weights = seller_weights / seller_weights.sum()
+    item_seller = rng.choice(n_sellers, size=n_items, p=seller_weights)
+
+    # Ongkir kira-kira proporsional dengan jarak seller -> customer
+    item_customer_zip = customer_zip[order_customer[item_order]]
+    item_seller_zip = seller_zip[item_seller]
+    dist_deg = np.hypot(zip_lat[item_customer_zip] - zip_lat[item_seller_zip],
+                        zip_lng[item_customer_zip] - zip_lng[item_seller_zip])
+    price = np.round(rng.lognormal(4.2, 0.9, n_items), 2)
+    freight = np.round(7.0 + 2.2 * dist_deg + 0.02 * price + rng.gamma(2.0, 2.0, n_items), 2)
+
+    order_items_products = pd.DataFrame({
+        'order_id': order_ids[item_order],
+        'order_item_id': item_seq,
+        'product_id': product_ids[item_product],
+        'seller_id': sellers['seller_id'].values[item_seller],
+        'shipping_limit_date': (purchase_ts[item_order] + pd.Timedelta(days=6)).strftime('%Y-%m-%d %H:%M:%S'),
+        'price': price,
+        'freight_value': freight,
+        'item_gmv': price + freight,
+        'product_category_en': categories[product_category[item_product]],
+    })
+
+    order_item_agg = order_items_products.groupby('order_id', sort=False).agg(
+        items_per_order=('order_item_id', 'count'),
+        price=('price', 'sum'),
+        freight_value=('freight_value', 'sum'),
+        order_gmv=('item_gmv', 'sum'),
+    )
+
+    customer_zip_of_order = customer_zip[order_customer]
+    orders_enriched = pd.DataFrame({
+        'order_id': order_ids,
+        'customer_id': _hex_ids(rng, n_orders),
+        'order_status': 'delivered',
+        'order_purchase_timestamp': purchase_ts,
+        'order_approved_at': approved_ts.round('s'),
+        'order_delivered_carrier_date': carrier_ts.round('s'),
+        'order_delivered_customer_date': delivered_ts.round('s'),
+        'order_estimated_delivery_date': estimated_ts,
+    })
+    orders_enriched = orders_enriched.join(order_item_agg, on='order_id')
+    orders_enriched['customer_unique_id'] = customer_ids[order_customer]
+    orders_enriched['customer_city'] = city_names[zip_city[customer_zip_of_order]]
+    orders_enriched['customer_state'] = state_codes[city_state[zip_city[customer_zip_of_order]]]
+    orders_enriched['customer_zip_code_prefix'] = zip_prefixes[customer_zip_of_order]
+    orders_enriched['payment_value'] = orders_enriched['order_gmv']
+    orders_enriched['order_date'] = orders_enriched['order_purchase_timestamp'].dt.to_period('M').dt.to_timestamp()
+
+    return {
+        'orders_enriched': orders_enriched,
+        'order_items_products': order_items_products,
+        'geolocation_dataset': geolocation,
+        'sellers_dataset': sellers,
+    }
+
+
+def _hour_weights():
+    """Distribusi jam pembelian (sepi dini hari, ramai siang-malam)"""
+    weights = np.array([3, 2, 1, 1, 1, 1, 2, 4, 7, 9, 10, 10, 9, 9, 10, 10, 10, 9, 8, 9, 10, 10, 8, 5], dtype=float)
+    return weights / weights.sum()
+
+
+def write_dataset(output_root, **kwargs):
+    """Tulis dataset sintetis dengan layout project (dashboard/*.csv dan data/*.csv)"""
+    dataset = generate_dataset(**kwargs)
+    dashboard_dir = os.path.join(output_root, 'dashboard')
+    data_dir = os.path.join(output_root, 'data')
+    os.makedirs(dashboard_dir, exist_ok=True)
+    os.makedirs(data_dir, exist_ok=True)
+
+    dataset['orders_enriched'].to_csv(os.path.join(dashboard_dir, 'orders_enriched.csv'), index=False)
+    dataset['order_items_products'].to_csv(os.path.join(dashboard_dir, 'order_items_products.csv'), index=False)
+    dataset['geolocation_dataset'].to_csv(os.path.join(data_dir, 'geolocation_dataset.csv'), index=False)
+    dataset['sellers_dataset'].to_csv(os.path.join(data_dir, 'sellers_dataset.csv'), index=False)
+    return dataset
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python dashboard/synthetic.py <output_root> [n_orders]")
+        sys.exit(1)
+    write_dataset(sys.argv[1], n_orders=int(sys.argv[2]) if len(sys.argv) > 2 else 100_000)
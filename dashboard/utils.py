@@ -1,6 +1,10 @@
 """Utility functions untuk dashboard"""
 import pandas as pd
 import os
+import pickle
+
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
 
 
 def get_project_root():
@@ -19,27 +23,188 @@ def get_project_root():
             return os.path.dirname(cwd)
 
 
-def load_orders_data():
-    """Load orders enriched data"""
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    orders_df = pd.read_csv(os.path.join(base_path, 'orders_enriched.csv'))
-    orders_df['order_purchase_timestamp'] = pd.to_datetime(orders_df['order_purchase_timestamp'])
-    orders_df['order_date'] = pd.to_datetime(orders_df['order_date'])
-    return orders_df
+def _dashboard_file(filename):
+    """Path absolut file pre-processed di folder dashboard/"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+
+
+def _data_file(filename):
+    """Path absolut file dataset mentah di folder data/"""
+    return os.path.abspath(os.path.join(get_project_root(), 'data', filename))
+
+
+def _source_fingerprint(source_paths):
+    """Fingerprint file sumber (path, ukuran, mtime) untuk validasi snapshot"""
+    fingerprint = []
+    for path in source_paths:
+        stat = os.stat(path)
+        fingerprint.append((os.path.abspath(path), stat.st_size, stat.st_mtime_ns))
+    return fingerprint
+
+
+DEFAULT_DATASET = 'default'
+# Naikkan jika isi snapshot berubah (kolom enrichment baru), agar snapshot lama di-build ulang
+SNAPSHOT_FORMAT_VERSION = 2
+
+
+class DatasetSnapshot:
+    """Lokasi file sumber satu dataset (snapshot marketplace / freeze akhir bulan) dan folder cache-nya"""
+
+    def __init__(self, name, orders_path, order_items_path, geolocation_path, sellers_path, cache_dir):
+        self.name = name
+        self.orders_path = orders_path
+        self.order_items_path = order_items_path
+        self.geolocation_path = geolocation_path
+        self.sellers_path = sellers_path
+        self.cache_dir = cache_dir
+
+    @property
+    def source_files(self):
+        return [self.orders_path, self.order_items_path, self.geolocation_path, self.sellers_path]
+
 
+def get_snapshots_dir():
+    """Folder berisi snapshot dataset tambahan: satu subfolder per snapshot"""
+    return os.path.join(get_project_root(), 'snapshots')
 
-def load_order_items_data():
-    """Load order items products data"""
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    order_items_df = pd.read_csv(os.path.join(base_path, 'order_items_products.csv'))
-    return order_items_df
 
+def default_dataset():
+    """Dataset bawaan: file pre-processed di dashboard/ dan dataset mentah di data/"""
+    return DatasetSnapshot(
+        DEFAULT_DATASET,
+        _dashboard_file('orders_enriched.csv'),
+        _dashboard_file('order_items_products.csv'),
+        _data_file('geolocation_dataset.csv'),
+        _data_file('sellers_dataset.csv'),
+        CACHE_DIR,
+    )
 
-def load_geolocation_data():
+
+def discover_datasets(snapshots_dir=None):
+    """Semua dataset yang tersedia: dataset bawaan + setiap subfolder `snapshots/<nama>/`
+
+    Subfolder dianggap snapshot jika berisi orders_enriched.csv dan order_items_products.csv.
+    geolocation_dataset.csv / sellers_dataset.csv dicari di subfolder yang sama (atau `data/`
+    di dalamnya), jika tidak ada memakai file dari dataset bawaan.
+    """
+    default = default_dataset()
+    datasets = {default.name: default}
+    snapshots_dir = snapshots_dir or get_snapshots_dir()
+    if not os.path.isdir(snapshots_dir):
+        return datasets
+
+    for name in sorted(os.listdir(snapshots_dir)):
+        folder = os.path.join(snapshots_dir, name)
+        orders_path = os.path.join(folder, 'orders_enriched.csv')
+        order_items_path = os.path.join(folder, 'order_items_products.csv')
+        if name == DEFAULT_DATASET or not (os.path.exists(orders_path) and os.path.exists(order_items_path)):
+            continue
+
+        def locate(filename, fallback):
+            for path in (os.path.join(folder, filename), os.path.join(folder, 'data', filename)):
+                if os.path.exists(path):
+                    return path
+            return fallback
+
+        datasets[name] = DatasetSnapshot(
+            name, orders_path, order_items_path,
+            locate('geolocation_dataset.csv', default.geolocation_path),
+            locate('sellers_dataset.csv', default.sellers_path),
+            os.path.join(CACHE_DIR, 'datasets', name),
+        )
+    return datasets
+
+
+def get_dataset(name=None):
+    """DatasetSnapshot berdasarkan nama (None = dataset bawaan)"""
+    if name is None or name == DEFAULT_DATASET:
+        return default_dataset()
+    datasets = discover_datasets()
+    if name not in datasets:
+        raise ValueError(f"Dataset tidak ditemukan: {name}. Pilihan: {', '.join(datasets)}")
+    return datasets[name]
+
+
+def load_snapshot(name, source_paths, builder, cache_dir=CACHE_DIR, version=None):
+    """Load snapshot pickle dari `cache_dir`, build ulang jika file sumber berubah
+
+    Snapshot menyimpan hasil parsing/pre-aggregate yang mahal (misal CSV yang sudah
+    di-parse ke datetime) sehingga proses baru tidak perlu mengulang pekerjaan tersebut.
+    `version` (opsional) ikut di fingerprint: naikkan saat builder / class objek berubah.
+    """
+    snapshot_path = os.path.join(cache_dir, f"{name}.pkl")
+    fingerprint = [SNAPSHOT_FORMAT_VERSION] + _source_fingerprint(source_paths)
+    if version is not None:
+        fingerprint.append(('version', version))
+
+    if os.path.exists(snapshot_path):
+        try:
+            with open(snapshot_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached['fingerprint'] == fingerprint:
+                return cached['data']
+        except Exception:
+            pass
+
+    data = builder()
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'fingerprint': fingerprint, 'data': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+    return data
+
+
+def load_orders_data(dataset=None):
+    """Load orders enriched data (`dataset`: DatasetSnapshot, default dataset bawaan)
+
+    Jika timestamp tahapan order tersedia, snapshot diperkaya sekali saat build dengan kolom
+    lead time pengiriman (lihat `enrichment.add_delivery_lead_times`).
+    """
+    dataset = dataset or default_dataset()
+    orders_path = dataset.orders_path
+
+    def build():
+        from enrichment import add_delivery_lead_times, DELIVERY_TIMESTAMP_COLUMNS
+
+        orders_df = pd.read_csv(orders_path)
+        orders_df['order_purchase_timestamp'] = pd.to_datetime(orders_df['order_purchase_timestamp'])
+        orders_df['order_date'] = pd.to_datetime(orders_df['order_date'])
+        if all(col in orders_df.columns for col in DELIVERY_TIMESTAMP_COLUMNS):
+            orders_df = add_delivery_lead_times(orders_df)
+        return orders_df
+
+    return load_snapshot('orders_enriched', [orders_path], build, dataset.cache_dir)
+
+
+def load_order_items_data(dataset=None):
+    """Load order items products data
+
+    Jika data sellers dan geolocation tersedia, snapshot diperkaya sekali saat build dengan
+    kolom jarak pengiriman seller -> customer (lihat `enrichment.add_shipping_distance`).
+    """
+    dataset = dataset or default_dataset()
+    order_items_path = dataset.order_items_path
+    enrichment_paths = [dataset.orders_path, dataset.sellers_path, dataset.geolocation_path]
+    can_enrich = all(os.path.exists(path) for path in enrichment_paths)
+
+    def build():
+        order_items_df = pd.read_csv(order_items_path)
+        if can_enrich:
+            from enrichment import add_shipping_distance
+            order_items_df = add_shipping_distance(
+                order_items_df, load_orders_data(dataset), load_sellers_data(dataset), load_zip_centroids(dataset)
+            )
+        return order_items_df
+
+    source_paths = [order_items_path] + (enrichment_paths if can_enrich else [])
+    return load_snapshot('order_items_products', source_paths, build, dataset.cache_dir)
+
+
+def load_geolocation_data(dataset=None):
     """Load geolocation data"""
-    project_root = get_project_root()
-    geolocation_path = os.path.join(project_root, 'data', 'geolocation_dataset.csv')
-    geolocation_path = os.path.abspath(geolocation_path)
+    dataset = dataset or default_dataset()
+    geolocation_path = dataset.geolocation_path
 
     if not os.path.exists(geolocation_path):
         raise FileNotFoundError(
@@ -47,6 +212,12 @@ def load_geolocation_data():
             f"Pastikan file geolocation_dataset.csv ada di folder data/"
         )
 
+    return load_snapshot('geolocation', [geolocation_path], lambda: _read_geolocation_csv(geolocation_path),
+                         dataset.cache_dir)
+
+
+def _read_geolocation_csv(geolocation_path):
+    """Baca dan normalisasi kolom file geolocation"""
     try:
         try:
             geolocation_df = pd.read_csv(
@@ -78,11 +249,19 @@ def load_geolocation_data():
         raise Exception(f"Error membaca file geolocation: {str(e)}")
 
 
-def load_sellers_data():
+def load_zip_centroids(dataset=None):
+    """Load centroid lat/lng per zip code prefix (snapshot turunan dari geolocation)"""
+    from spatial import build_zip_centroids
+
+    dataset = dataset or default_dataset()
+    return load_snapshot('zip_centroids', [dataset.geolocation_path],
+                         lambda: build_zip_centroids(load_geolocation_data(dataset)), dataset.cache_dir)
+
+
+def load_sellers_data(dataset=None):
     """Load sellers data"""
-    project_root = get_project_root()
-    sellers_path = os.path.join(project_root, 'data', 'sellers_dataset.csv')
-    sellers_path = os.path.abspath(sellers_path)
+    dataset = dataset or default_dataset()
+    sellers_path = dataset.sellers_path
 
     if not os.path.exists(sellers_path):
         raise FileNotFoundError(
@@ -90,6 +269,26 @@ def load_sellers_data():
             f"Pastikan file sellers_dataset.csv ada di folder data/"
         )
 
-    sellers_df = pd.read_csv(sellers_path)
-    return sellers_df
+    return load_snapshot('sellers', [sellers_path], lambda: pd.read_csv(sellers_path), dataset.cache_dir)
+
+
+def get_dataset_version(dataset=None):
+    """Versi dataset: hash nama dataset + fingerprint semua file sumber yang ada
+
+    Berubah setiap kali salah satu file sumber diganti, sehingga artifact turunan
+    (misal cache figure) dari dataset lama otomatis tidak terpakai lagi. Nama dataset
+    ikut di-hash agar artifact setiap snapshot tidak tercampur.
+    """
+    import hashlib
+
+    dataset = dataset or default_dataset()
+    existing = [path for path in dataset.source_files if os.path.exists(path)]
+    fingerprint = repr((dataset.name, _source_fingerprint(existing))).encode('utf-8')
+    return hashlib.sha256(fingerprint).hexdigest()[:16]
+
 
+def get_dataset_last_modified(dataset=None):
+    """Waktu modifikasi terakhir (epoch detik) dari file sumber dataset yang ada"""
+    dataset = dataset or default_dataset()
+    mtimes = [os.stat(path).st_mtime for path in dataset.source_files if os.path.exists(path)]
+    return max(mtimes) if mtimes else 0.0
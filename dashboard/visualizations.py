@@ -1,39 +1,73 @@
-"""Visualization functions untuk dashboard"""
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import folium
-from folium.plugins import HeatMap
+"""Visualization functions untuk dashboard
+
+Plotly dan Folium di-import secara lazy di dalam masing-masing fungsi agar biaya
+import library tersebut hanya dibayar saat section yang membutuhkannya di-render.
+"""
 import pandas as pd
 
+from downsampling import downsample
+
+
+# Label granularity tren dan batas jumlah titik yang dikirim ke browser per trace
+GRANULARITY_LABELS = {'day': ('Harian', 'Tanggal'), 'week': ('Mingguan', 'Minggu'), 'month': ('Bulanan', 'Bulan')}
+TREND_MAX_POINTS = 800
+WEBGL_THRESHOLD = 1000
+
+
+def _trend_trace(go, x, y, n_points, max_points, **kwargs):
+    """Buat trace tren: downsample LTTB jika melebihi max_points, Scattergl untuk series besar
+
+    WebGL ditentukan dari jumlah titik setelah downsample (yang benar-benar dikirim ke browser),
+    sehingga hanya dipakai jika max_points dinaikkan di atas WEBGL_THRESHOLD.
+    """
+    if n_points > max_points:
+        x, y = downsample(x, y, max_points)
+    trace_cls = go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter
+    mode = 'lines+markers' if n_points <= 60 else 'lines'
+    return trace_cls(x=x, y=y, mode=mode, **kwargs)
+
+
+def plot_monthly_trends(monthly_df, granularity='month', max_points=TREND_MAX_POINTS, anomalies=None):
+    """Plot tren Orders & GMV (bulanan secara default, atau harian/mingguan)
 
-def plot_monthly_trends(monthly_df):
-    """Plot tren bulanan Orders & GMV"""
+    `anomalies` (opsional): DataFrame dengan kolom order_date (bucket tren) dan metric ('orders'/'gmv');
+    bucket tersebut ditandai marker merah.
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    period_label, axis_label = GRANULARITY_LABELS[granularity]
+    n_points = len(monthly_df)
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     fig.add_trace(
-        go.Scatter(
-            x=monthly_df['order_date'],
-            y=monthly_df['orders'],
+        _trend_trace(
+            go, monthly_df['order_date'].values, monthly_df['orders'].values, n_points, max_points,
             name="Orders",
-            line=dict(color='#72BCD4', width=3),
-            mode='lines+markers'
+            line=dict(color='#72BCD4', width=3 if n_points <= 60 else 1.5)
         ),
         secondary_y=False,
     )
     fig.add_trace(
-        go.Scatter(
-            x=monthly_df['order_date'],
-            y=monthly_df['gmv'],
+        _trend_trace(
+            go, monthly_df['order_date'].values, monthly_df['gmv'].values, n_points, max_points,
             name="GMV (R$)",
-            line=dict(color='#4C9A2A', width=3),
-            mode='lines+markers'
+            line=dict(color='#4C9A2A', width=3 if n_points <= 60 else 1.5)
         ),
         secondary_y=True,
     )
-    fig.update_xaxes(title_text="Bulan")
+    if anomalies is not None and len(anomalies) > 0:
+        for metric, name, secondary_y in [('orders', "Anomali Orders", False), ('gmv', "Anomali GMV", True)]:
+            flagged_dates = anomalies.loc[anomalies['metric'] == metric, 'order_date']
+            flagged = monthly_df[monthly_df['order_date'].isin(flagged_dates)]
+            if len(flagged) > 0:
+                fig.add_trace(go.Scatter(
+                    x=flagged['order_date'], y=flagged[metric], mode='markers', name=name,
+                    marker=dict(color='#D62728', size=9, symbol='x')
+                ), secondary_y=secondary_y)
+    fig.update_xaxes(title_text=axis_label)
     fig.update_yaxes(title_text="Jumlah Orders", secondary_y=False)
     fig.update_yaxes(title_text="GMV (R$)", secondary_y=True)
     fig.update_layout(
-        title="Tren Bulanan: Orders & GMV",
+        title=f"Tren {period_label}: Orders & GMV",
         height=400,
         hovermode='x unified',
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
@@ -41,16 +75,17 @@ def plot_monthly_trends(monthly_df):
     return fig
 
 
-def plot_aov_trend(monthly_df):
-    """Plot tren AOV bulanan"""
+def plot_aov_trend(monthly_df, granularity='month', max_points=TREND_MAX_POINTS):
+    """Plot tren AOV (bulanan secara default, atau harian/mingguan)"""
+    import plotly.graph_objects as go
+    period_label, axis_label = GRANULARITY_LABELS[granularity]
+    n_points = len(monthly_df)
     fig = go.Figure()
     fig.add_trace(
-        go.Scatter(
-            x=monthly_df['order_date'],
-            y=monthly_df['aov'],
+        _trend_trace(
+            go, monthly_df['order_date'].values, monthly_df['aov'].values, n_points, max_points,
             name="AOV",
-            line=dict(color='#D36C6C', width=3),
-            mode='lines+markers',
+            line=dict(color='#D36C6C', width=3 if n_points <= 60 else 1.5),
             fill='tonexty',
             fillcolor='rgba(211, 108, 108, 0.1)'
         )
@@ -63,8 +98,8 @@ def plot_aov_trend(monthly_df):
         annotation_text=f"Rata-rata: R$ {avg_aov:.2f}"
     )
     fig.update_layout(
-        title="Tren Bulanan: Average Order Value (AOV)",
-        xaxis_title="Bulan",
+        title=f"Tren {period_label}: Average Order Value (AOV)",
+        xaxis_title=axis_label,
         yaxis_title="AOV (R$)",
         height=400,
         hovermode='x unified'
@@ -74,6 +109,7 @@ def plot_aov_trend(monthly_df):
 
 def plot_top_categories_bar(data, x_col, y_col, title, x_title, color='#72BCD4'):
     """Plot horizontal bar chart untuk top categories"""
+    import plotly.graph_objects as go
     fig = go.Figure()
     fig.add_trace(go.Bar(
         x=data[x_col],
@@ -95,6 +131,7 @@ def plot_top_categories_bar(data, x_col, y_col, title, x_title, color='#72BCD4')
 
 def plot_freight_ratio(data, title, threshold=20):
     """Plot freight ratio dengan threshold"""
+    import plotly.graph_objects as go
     fig = go.Figure()
     colors = ['#FF6B6B' if x > threshold else '#95E1D3' for x in data['freight_ratio_pct']]
     fig.add_trace(go.Bar(
@@ -118,10 +155,12 @@ def plot_freight_ratio(data, title, threshold=20):
 
 def plot_rfm_top_customers(data, metric_col, title, x_title, color):
     """Plot top 5 customers untuk RFM metrics"""
+    import plotly.graph_objects as go
     fig = go.Figure()
     fig.add_trace(go.Bar(
         x=data[metric_col],
         y=data['customer_unique_id'].str[:8],
+        hovertext=data['customer_unique_id'],
         orientation='h',
         marker=dict(color=color),
         text=[f"{x:.0f}" if metric_col == 'recency' else f"{x:.0f}x" if metric_col == 'frequency' else f"R$ {x:,.0f}" for x in data[metric_col]],
@@ -139,6 +178,7 @@ def plot_rfm_top_customers(data, metric_col, title, x_title, color):
 
 def plot_segment_distribution(segment_df):
     """Plot distribusi customer segment"""
+    import plotly.graph_objects as go
     fig = go.Figure()
     colors = ['#72BCD4' if x in ['Top customers', 'High value customer'] else '#D3D3D3'
               for x in segment_df['customer_segment']]
@@ -162,6 +202,7 @@ def plot_segment_distribution(segment_df):
 
 def plot_segment_pie(segment_df):
     """Plot pie chart untuk proporsi customer segment"""
+    import plotly.graph_objects as go
     fig = go.Figure()
     fig.add_trace(go.Pie(
         labels=segment_df['customer_segment'],
@@ -178,6 +219,8 @@ def plot_segment_pie(segment_df):
 
 def create_customer_heatmap(customer_geo, customer_by_city):
     """Buat peta heatmap untuk customer transactions"""
+    import folium
+    from folium.plugins import HeatMap
     sample_size = min(5000, len(customer_geo))
     customer_sample = customer_geo.sample(n=sample_size, random_state=42)
 
@@ -218,6 +261,8 @@ def create_customer_heatmap(customer_geo, customer_by_city):
 
 def create_seller_heatmap(seller_by_city):
     """Buat peta heatmap untuk seller locations"""
+    import folium
+    from folium.plugins import HeatMap
     sample_size_seller = min(2000, len(seller_by_city))
     seller_sample = seller_by_city.sample(n=sample_size_seller, random_state=42)
 
@@ -252,6 +297,7 @@ def create_seller_heatmap(seller_by_city):
 
 def plot_gap_top_cities(gap_with_sellers, top_n=20):
     """Plot Top N kota dengan gap supply-demand tertinggi"""
+    import plotly.graph_objects as go
     if len(gap_with_sellers) == 0:
         fig = go.Figure()
         fig.add_annotation(
@@ -289,6 +335,7 @@ def plot_gap_top_cities(gap_with_sellers, top_n=20):
 
 def plot_gap_no_seller_cities(gap_without_sellers, top_n=10):
     """Plot Top N kota tanpa seller (peluang first-mover)"""
+    import plotly.graph_objects as go
     gap_no_seller = gap_without_sellers.head(top_n).copy()
     gap_no_seller['city_label'] = gap_no_seller['customer_city'].str.title() + ', ' + gap_no_seller['customer_state']
 
@@ -313,6 +360,7 @@ def plot_gap_no_seller_cities(gap_without_sellers, top_n=10):
 
 def plot_gap_comparison(gap_with_sellers, top_n=10):
     """Plot perbandingan Orders vs Sellers untuk top N kota dengan gap tertinggi"""
+    import plotly.graph_objects as go
     if len(gap_with_sellers) == 0:
         fig = go.Figure()
         fig.add_annotation(
@@ -366,6 +414,7 @@ def plot_gap_comparison(gap_with_sellers, top_n=10):
 
 def plot_gap_categories_distribution(gap_plot):
     """Plot distribusi kategori gap supply-demand"""
+    import plotly.graph_objects as go
     if len(gap_plot) == 0 or 'gap_category' not in gap_plot.columns:
         # Return empty figure jika tidak ada data
         fig = go.Figure()
@@ -414,3 +463,286 @@ def plot_gap_categories_distribution(gap_plot):
     )
     return fig
 
+
+
+def plot_coverage_top_cities(coverage_df, radius_km, top_n=20):
+    """Plot Top N kota dengan orders per seller (dalam radius) tertinggi"""
+    import plotly.graph_objects as go
+    coverage_top = coverage_df[coverage_df['sellers_within_radius'] > 0].nlargest(top_n, 'orders_per_seller_within_radius').copy()
+    coverage_top['city_label'] = coverage_top['customer_city'].str.title() + ', ' + coverage_top['customer_state']
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=coverage_top['orders_per_seller_within_radius'],
+        y=coverage_top['city_label'],
+        orientation='h',
+        marker=dict(color='#F38181'),
+        text=[f"{x:.1f}" for x in coverage_top['orders_per_seller_within_radius']],
+        textposition='outside'
+    ))
+    fig.update_layout(
+        title=f'Top {top_n} Kota: Orders per Seller dalam Radius {radius_km} km',
+        xaxis_title='Orders per Seller (radius)',
+        yaxis_title='Kota',
+        height=max(400, top_n * 30),
+        yaxis={'categoryorder': 'total ascending'}
+    )
+    return fig
+
+
+def plot_nearest_seller_distance(coverage_df, radius_km, top_n=10):
+    """Plot kota dengan demand terbesar yang tidak punya seller dalam radius (jarak ke seller terdekat)"""
+    import plotly.graph_objects as go
+    uncovered = coverage_df[coverage_df['sellers_within_radius'] == 0].nlargest(top_n, 'order_count').copy()
+    uncovered['city_label'] = uncovered['customer_city'].str.title() + ', ' + uncovered['customer_state']
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=uncovered['nearest_seller_km'],
+        y=uncovered['city_label'],
+        orientation='h',
+        marker=dict(color='#AA96DA'),
+        text=[f"{km:,.0f} km ({orders:,.0f} orders)" for km, orders in zip(uncovered['nearest_seller_km'], uncovered['order_count'])],
+        textposition='outside'
+    ))
+    fig.update_layout(
+        title=f'Top {top_n} Kota Tanpa Seller dalam {radius_km} km (Jarak ke Seller Terdekat)',
+        xaxis_title='Jarak ke Seller Terdekat (km)',
+        yaxis_title='Kota',
+        height=max(400, top_n * 40),
+        yaxis={'categoryorder': 'array', 'categoryarray': uncovered['city_label'].tolist()[::-1]}
+    )
+    return fig
+
+
+def plot_state_pair_heatmap(state_pair_km, value_col='freight_per_km', title="Freight per km: State Seller → State Customer"):
+    """Plot heatmap metric per pasangan state seller (baris) dan state customer (kolom)"""
+    import plotly.graph_objects as go
+    matrix = state_pair_km.pivot(index='seller_state', columns='customer_state', values=value_col)
+
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        z=matrix.values,
+        x=[str(col) for col in matrix.columns],
+        y=[str(idx) for idx in matrix.index],
+        colorscale='Reds',
+        colorbar=dict(title='R$/km'),
+        hovertemplate='Seller %{y} → Customer %{x}<br>%{z:.4f} R$/km<extra></extra>'
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title='State Customer',
+        yaxis_title='State Seller',
+        height=500
+    )
+    return fig
+
+
+def plot_cohort_heatmap(matrix_df, title, colorbar_title, value_format=".1f"):
+    """Plot heatmap cohort (baris: bulan cohort, kolom: bulan sejak pembelian pertama)"""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        z=matrix_df.values,
+        x=[f"M+{col}" for col in matrix_df.columns],
+        y=[idx.strftime('%b %Y') for idx in matrix_df.index],
+        colorscale='Blues',
+        colorbar=dict(title=colorbar_title),
+        texttemplate=f"%{{z:{value_format}}}" if len(matrix_df) <= 24 else None,
+        hovertemplate=f"Cohort %{{y}}<br>%{{x}}<br>%{{z:{value_format}}}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title='Bulan sejak Pembelian Pertama',
+        yaxis_title='Cohort (Bulan Pembelian Pertama)',
+        height=max(400, len(matrix_df) * 25),
+        yaxis={'autorange': 'reversed'}
+    )
+    return fig
+
+
+def plot_purchase_heatmap(matrix_df, title, colorbar_title, value_format=",.0f"):
+    """Plot heatmap pola pembelian (baris: hari Senin-Minggu, kolom: jam 0-23)"""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        z=matrix_df.values,
+        x=[f"{hour:02d}:00" for hour in matrix_df.columns],
+        y=list(matrix_df.index),
+        colorscale='Blues',
+        colorbar=dict(title=colorbar_title),
+        hovertemplate=f"%{{y}} %{{x}}<br>%{{z:{value_format}}}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title='Jam Pembelian',
+        yaxis_title='Hari',
+        height=400,
+        yaxis={'autorange': 'reversed'}
+    )
+    return fig
+
+
+def plot_forecast_movers(forecast_df, value_label, top_n=10):
+    """Plot top movers forecast: series dengan kenaikan dan penurunan terbesar vs periode terakhir"""
+    import plotly.graph_objects as go
+    gainers = forecast_df[forecast_df['change'] > 0].nlargest(top_n, 'change')
+    decliners = forecast_df[forecast_df['change'] < 0].nsmallest(top_n, 'change')
+    movers = pd.concat([gainers, decliners]).sort_values('change')
+    labels = movers['product_category_en'] + ' · ' + movers['customer_state']
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=movers['change'],
+        y=labels,
+        orientation='h',
+        marker=dict(color=['#4C9A2A' if change > 0 else '#D36C6C' for change in movers['change']]),
+        # Interval prediksi forecast, dinyatakan relatif terhadap periode terakhir
+        error_x=dict(
+            type='data', symmetric=False,
+            array=movers['forecast_upper'] - movers['forecast'],
+            arrayminus=movers['forecast'] - movers['forecast_lower'],
+            color='#555555'
+        ),
+        customdata=movers[['last_period', 'forecast', 'forecast_lower', 'forecast_upper']].values,
+        hovertemplate=('%{y}<br>Perubahan: %{x:,.0f}<br>Periode terakhir: %{customdata[0]:,.0f}'
+                       '<br>Forecast: %{customdata[1]:,.0f} (%{customdata[2]:,.0f} - %{customdata[3]:,.0f})<extra></extra>')
+    ))
+    fig.update_layout(
+        title=f'Top Movers Forecast Kuartal Berikutnya ({value_label})',
+        xaxis_title=f'Perubahan {value_label} vs 3 Bulan Terakhir',
+        yaxis_title='Kategori · State Customer',
+        height=max(400, len(movers) * 28)
+    )
+    return fig
+
+
+def plot_top_category_pairs(pairs_df, sort_col='lift', top_n=15):
+    """Plot Top N pasangan kategori yang sering dibeli bersama"""
+    import plotly.graph_objects as go
+    top_pairs = pairs_df.nlargest(top_n, sort_col).copy()
+    top_pairs['pair_label'] = top_pairs['category_a'] + ' + ' + top_pairs['category_b']
+    value_label = 'Lift' if sort_col == 'lift' else 'Jumlah Order Bersama'
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=top_pairs[sort_col],
+        y=top_pairs['pair_label'],
+        orientation='h',
+        marker=dict(color='#72BCD4'),
+        text=[f"{value:.2f}" if sort_col == 'lift' else f"{value:,.0f}" for value in top_pairs[sort_col]],
+        textposition='outside',
+        customdata=top_pairs[['orders_together', 'support', 'confidence_a_to_b', 'confidence_b_to_a', 'lift']].values,
+        hovertemplate=('%{y}<br>Order bersama: %{customdata[0]:,.0f}<br>Support: %{customdata[1]:.4%}'
+                       '<br>Confidence A→B: %{customdata[2]:.2%}<br>Confidence B→A: %{customdata[3]:.2%}'
+                       '<br>Lift: %{customdata[4]:.2f}<extra></extra>')
+    ))
+    fig.update_layout(
+        title=f'Top {top_n} Pasangan Kategori berdasarkan {value_label}',
+        xaxis_title=value_label,
+        yaxis_title='Pasangan Kategori',
+        height=max(400, top_n * 30),
+        yaxis={'categoryorder': 'total ascending'}
+    )
+    return fig
+
+
+def plot_lift_heatmap(lift_df, top_n=20):
+    """Plot heatmap lift antar kategori (top N kategori dengan order terbanyak)"""
+    import plotly.graph_objects as go
+    matrix = lift_df.iloc[:top_n, :top_n]
+
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        z=matrix.values,
+        x=list(matrix.columns),
+        y=list(matrix.index),
+        colorscale='RdBu',
+        zmid=1,
+        colorbar=dict(title='Lift'),
+        hovertemplate='%{y} + %{x}<br>Lift: %{z:.2f}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f'Lift Co-purchase antar Top {len(matrix)} Kategori',
+        height=600,
+        yaxis={'autorange': 'reversed'}
+    )
+    return fig
+
+
+def plot_seller_leaderboard(ranked_df, metric_col, title, x_title, color='#72BCD4'):
+    """Plot horizontal bar chart leaderboard seller (label: peringkat, id singkat, dan kota seller)"""
+    import plotly.graph_objects as go
+    labels = [f"#{rank} {seller_id[:8]} ({city})"
+              for rank, seller_id, city in zip(ranked_df['rank'], ranked_df['seller_id'], ranked_df['seller_city'])]
+    is_ratio = metric_col == 'freight_ratio'
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=ranked_df[metric_col] * 100 if is_ratio else ranked_df[metric_col],
+        y=labels,
+        orientation='h',
+        marker=dict(color=color),
+        text=[f"{x:.2%}" if is_ratio else f"{x:,.0f}" for x in ranked_df[metric_col]],
+        textposition='outside',
+        customdata=ranked_df[['seller_id', 'seller_state', 'orders', 'gmv', 'active_days']].values,
+        hovertemplate=('%{customdata[0]} (%{customdata[1]})<br>Orders: %{customdata[2]:,}'
+                       '<br>GMV: R$ %{customdata[3]:,.2f}<br>Hari aktif: %{customdata[4]:,}<extra></extra>')
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title="Seller",
+        height=max(400, len(ranked_df) * 35),
+        yaxis={'autorange': 'reversed'}
+    )
+    return fig
+
+
+def plot_delivery_distribution(distribution_df, title, x_title, percentiles=(), color='#72BCD4'):
+    """Plot histogram lead time (bin tetap) dengan garis vertikal untuk persentil (label, nilai)"""
+    import plotly.graph_objects as go
+    width = float(distribution_df['days'].diff().min()) if len(distribution_df) > 1 else 1.0
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=distribution_df['days'] + width / 2,
+        y=distribution_df['orders'],
+        width=width,
+        marker=dict(color=color),
+        hovertemplate='%{x:.2f} hari<br>Orders: %{y:,}<extra></extra>'
+    ))
+    for label, value in percentiles:
+        fig.add_vline(x=value, line_dash='dash', line_color='#FF6B6B',
+                      annotation_text=f"{label}: {value:.1f}", annotation_position='top right')
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title="Jumlah Orders",
+        height=400,
+        bargap=0
+    )
+    return fig
+
+
+def plot_delivery_late_rate(ranking_df, title, y_title, color='#FF6B6B'):
+    """Plot horizontal bar rasio order terlambat per kelompok (hover: order terkirim, median & P90 lead time)"""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=ranking_df['late_rate'] * 100,
+        y=ranking_df['group'],
+        orientation='h',
+        marker=dict(color=color),
+        text=[f"{rate:.1%}" for rate in ranking_df['late_rate']],
+        textposition='outside',
+        customdata=ranking_df[['orders', 'delivery_days_p50', 'delivery_days_p90']].values,
+        hovertemplate=('%{y}<br>Order terkirim: %{customdata[0]:,}<br>Median lead time: %{customdata[1]:.1f} hari'
+                       '<br>P90 lead time: %{customdata[2]:.1f} hari<extra></extra>')
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title="Order Terlambat (%)",
+        yaxis_title=y_title,
+        height=max(400, len(ranking_df) * 30),
+        yaxis={'autorange': 'reversed'}
+    )
+    return fig